@@ -1,7 +1,9 @@
 import gradio as gr
+import html
 import json
 import os
 import asyncio
+import atexit
 import re
 import sys
 from typing import List, Dict, Any, Optional, Tuple
@@ -14,14 +16,30 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')
 sys.path.append(project_root)
 
 
-# Global cache for all MCP tools
-all_tools_cache = None
-mcp_servers = []
-mcp_loaded = False
-
-from agentmaster import getADKAgent
 from constants import ALL_MODELS, GEMINI_API_KEY, OPENAI_API_KEY
-from mcp_client import MCPCLient
+from tool_catalog import get_tool_catalog, selection_keys
+from log_sink import LogSink, SegmentedJsonlWriter
+from log_store import formatLog
+from tracing import get_tracer, render_waterfall_html
+from profiling import PROFILE_MODES, get_profiler, profiled
+
+# MCP servers and tools, shared with the Agent Builder and MCP Tester tabs
+tool_catalog = get_tool_catalog()
+
+LOG_TYPES = ["guardrail", "tool_start", "tool_complete", "model_response", "agent_response", "error"]
+LOG_COLORS = {
+    "error": "#dc3545",  # Red
+    "guardrail": "#fd7e14",  # Orange
+    "tool_start": "#0d6efd",  # Blue
+    "tool_complete": "#198754",  # Green
+    "model_response": "#6f42c1",  # Purple
+}
+
+# Streaming log export settings
+EXPORT_DIR = os.environ.get("AGENTX_EXPORT_DIR", "exports")
+EXPORT_MAX_BYTES = int(os.environ.get("AGENTX_EXPORT_MAX_BYTES", 50 * 1024 * 1024))
+EXPORT_MAX_AGE_SECONDS = float(os.environ.get("AGENTX_EXPORT_MAX_AGE_SECONDS", 3600))
+EXPORT_GZIP = os.environ.get("AGENTX_EXPORT_GZIP", "0") == "1"
 
 class AgentTester:
     def __init__(self):
@@ -43,9 +61,12 @@ class AgentTester:
             "temperature": 1.0,
             "max_tokens": 2000,
         }
+        # Empty lists mean "no filter"; event_types are callback log types, log_types are levels
         self.filter_logs = {
-            "event_types": ["start", "end", "handoff", "tool"],
-            "log_types": ["info", "warning", "error"],
+            "event_types": [],
+            "log_types": [],
+            "agents": [],
+            "tools": [],
             "search_term": "",
         }
         self.token_metrics = {
@@ -53,8 +74,80 @@ class AgentTester:
             "output_tokens": 0,
             "total_tokens": 0,
             "requests": 0,
+            "cost": 0.0,
         }
         self.is_processing = False
+        self.log_exporter = None
+        self._export_listener = None  # (callback, listener) feeding log_exporter
+        self.tracer = get_tracer()
+        # Finish the last (possibly gzipped) export segment on exit
+        atexit.register(self.stop_log_export)
+
+    def start_log_export(self):
+        """Stream every callback log entry to rotating JSONL files for this session"""
+        self.stop_log_export()
+        session_name = f"agent_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        writer = SegmentedJsonlWriter(
+            os.path.join(EXPORT_DIR, session_name),
+            session_name,
+            max_bytes=EXPORT_MAX_BYTES,
+            max_age_seconds=EXPORT_MAX_AGE_SECONDS,
+            compress=EXPORT_GZIP,
+        )
+        self.log_exporter = LogSink(writer, level="debug")
+        self.log_exporter.submit({
+            "type": "session_start",
+            "timestamp": datetime.now().isoformat(),
+            "agent_name": self.config_content.get("name", "Unknown"),
+            "model": self.selected_model,
+            "config": self.selected_config,
+        })
+        # Bound to this session's sink, so the listener never writes into a later agent's export
+        exporter = self.log_exporter
+        listener = lambda record: exporter.submit(record.to_dict())
+        self.callback.addLogListener(listener)
+        self._export_listener = (self.callback, listener)
+
+    def stop_log_export(self):
+        if self._export_listener:
+            callback, listener = self._export_listener
+            if listener in callback.log_listeners:
+                callback.log_listeners.remove(listener)
+            self._export_listener = None
+        if self.log_exporter:
+            self.log_exporter.close()
+            self.log_exporter = None
+
+    def query_logs(self, page: int = 1, page_size: int = 100):
+        """Apply filter_logs to the callback's indexed log store, returns (total, entries)"""
+        if not self.callback:
+            return 0, []
+        filters = self.filter_logs
+        return self.callback.queryLogs(
+            types=filters.get("event_types") or None,
+            levels=filters.get("log_types") or None,
+            agents=filters.get("agents") or None,
+            tools=filters.get("tools") or None,
+            search=filters.get("search_term", ""),
+            offset=(max(page, 1) - 1) * page_size,
+            limit=page_size,
+        )
+
+    def recent_logs(self, types=None, limit: int = 20):
+        """Most recent log entries in chronological order"""
+        if not self.callback:
+            return []
+        _, entries = self.callback.queryLogs(types=types, limit=limit)
+        return entries[::-1]
+
+    def update_token_metrics(self):
+        """Refresh token_metrics from the callback's usage tracker"""
+        if not self.callback:
+            return self.token_metrics
+        totals = self.callback.usage.getTotals()
+        for key in self.token_metrics:
+            self.token_metrics[key] = totals.get(key, 0)
+        return self.token_metrics
 
     def list_config_files(self, config_dir="agent_config"):
         if not os.path.exists(config_dir):
@@ -105,6 +198,8 @@ class AgentTester:
                 "OPENAI_API_KEY": OPENAI_API_KEY
             }
             
+            # google.adk and LiteLLM are only loaded once an agent is actually built
+            from agentmaster import getADKAgent
             self.callback ,self.adk_agent = await getADKAgent(
                 self.config_content,
                 self.selected_model,
@@ -116,6 +211,8 @@ class AgentTester:
             # Clear any existing logs from the callback
             if self.callback:
                 self.callback.agent_logs.clear()
+                self.start_log_export()
+            self.update_token_metrics()
             
             self.welcome_message = (
                 self.config_content.get("welcome_message", "Hello! I'm ready to assist you.")
@@ -143,8 +240,7 @@ class AgentTester:
         
         try:
             async for chunk in self.adk_agent.send_query(query):
-                # Get updated logs from callback
-                self.callback_logs = await self.adk_agent.getLogs()
+                self.update_token_metrics()
                 full_response += chunk
                 yield full_response
         except Exception as e:
@@ -154,6 +250,7 @@ class AgentTester:
         finally:
             # Get final logs after processing
             self.callback_logs = await self.adk_agent.getLogs()
+            self.update_token_metrics()
             self.is_processing = False
 
 def create_agent_tester_interface():
@@ -559,6 +656,11 @@ def create_agent_tester_interface():
                                             choices=[],
                                             interactive=True
                                         )
+                                        tool_search = gr.Textbox(
+                                            label="🔍 Search Tools",
+                                            placeholder="Keywords from names, descriptions or parameters (all servers)",
+                                            max_lines=1
+                                        )
                                         
                                         available_tools_df = gr.Dataframe(
                                             headers=["🔧 Tool", "⚡ Action"],
@@ -611,6 +713,68 @@ def create_agent_tester_interface():
                                     "📥 Export"
                                 )
                             
+                            # Log Filters
+                            with gr.Accordion("🔎 **Filter & Search**", open=False):
+                                with gr.Row():
+                                    log_type_filter = gr.CheckboxGroup(
+                                        choices=LOG_TYPES,
+                                        label="Event Types"
+                                    )
+                                    log_level_filter = gr.CheckboxGroup(
+                                        choices=["info", "warning", "error"],
+                                        label="Levels"
+                                    )
+                                with gr.Row():
+                                    log_agent_filter = gr.Textbox(
+                                        label="Agent",
+                                        placeholder="Any agent"
+                                    )
+                                    log_tool_filter = gr.Textbox(
+                                        label="Tool",
+                                        placeholder="Any tool"
+                                    )
+                                    log_search = gr.Textbox(
+                                        label="Search",
+                                        placeholder="Words in the message"
+                                    )
+                                with gr.Row():
+                                    log_page = gr.Number(
+                                        value=1,
+                                        label="Page",
+                                        precision=0,
+                                        minimum=1
+                                    )
+                                    log_page_size = gr.Dropdown(
+                                        choices=[50, 100, 250, 500],
+                                        value=100,
+                                        label="Page Size"
+                                    )
+                                    apply_filters_btn = gr.Button(
+                                        "🔎 Apply"
+                                    )
+                            
+                            log_page_info = gr.Markdown("")
+                            
+                            # Latency breakdown of the last turn
+                            with gr.Accordion("⏱️ **Turn Waterfall**", open=False):
+                                waterfall_display = gr.HTML(
+                                    value="<div>Send a message to see its latency breakdown...</div>",
+                                    elem_id="waterfall_display"
+                                )
+                                export_trace_btn = gr.Button(
+                                    "📤 Export Chrome Trace"
+                                )
+                            
+                            # Per-request profiling of chat turns, log rendering and MCP calls
+                            with gr.Accordion("🔬 **Profiling**", open=False):
+                                profile_mode = gr.Radio(
+                                    choices=list(PROFILE_MODES),
+                                    value=get_profiler().mode,
+                                    label="Profiler",
+                                    info="cprofile writes .prof files (snakeviz, flameprof); sample writes collapsed stacks for flamegraph.pl or speedscope. Async handlers are only profiled while they run, not while they await"
+                                )
+                                profile_status = gr.Markdown("")
+                            
                             # Logs Display
                             logs = gr.Textbox(
                                 label="📋 System Logs",
@@ -622,23 +786,9 @@ def create_agent_tester_interface():
 
             # Helper functions for MCP tools (keeping the existing logic)
             def load_mcp_servers():
-                global mcp_servers, all_tools_cache, mcp_loaded
-                if mcp_loaded:
-                    return mcp_servers
-                
-                try:
-                    mcp_client = MCPCLient()
-                    mcp_client.load_servers("mcp/mcp_config.json")
-                    mcp_servers = [server.name for server in mcp_client.servers]
-                    all_tools_cache = asyncio.run(mcp_client.load_all_tools())
-                    mcp_loaded = True
-                    print(f"Loaded {len(mcp_servers)} MCP servers: {mcp_servers}")
-                    return mcp_servers
-                except Exception as e:
-                    print(f"Error loading MCP servers: {e}")
-                    all_tools_cache = {}
-                    mcp_loaded = True
-                    return []
+                # Listed once per process and shared with the other tabs
+                tool_catalog.ensure_loaded()
+                return tool_catalog.servers()
             
             def generate_chat_header(agent_name="", tools_list=None):
                 """Generate dynamic chat header with agent name and tools"""
@@ -666,10 +816,15 @@ def create_agent_tester_interface():
                 
                 return f"<div>💬 {agent_display}{tools_display}</div>"
             
-            def get_available_tools(server_name, selected_tools):
-                """Get list of available tools for a server, excluding already selected ones"""
+            def get_available_tools(server_name, selected_tools, query=""):
+                """Get list of available tools for a server, or matching a keyword search
+                across all servers, excluding already selected ones"""
                 try:
-                    if not server_name or not all_tools_cache or server_name not in all_tools_cache:
+                    if query and query.strip():
+                        tool_keys = tool_catalog.search(query)
+                    elif server_name:
+                        tool_keys = [(server_name, tool["name"]) for tool in tool_catalog.get_tools(server_name)]
+                    else:
                         return []
                     
                     # Ensure selected_tools is a list and properly formatted
@@ -677,19 +832,10 @@ def create_agent_tester_interface():
                         selected_tools = []
                     
                     # Create set of selected tools for efficient lookup
-                    selected_set = set()
-                    for tool in selected_tools:
-                        if isinstance(tool, dict) and 'server' in tool and 'tool' in tool:
-                            selected_set.add((tool['server'], tool['tool']))
-                    
-                    tool_rows = []
-                    for tool in all_tools_cache[server_name]:
-                        if isinstance(tool, dict) and "name" in tool:
-                            tool_name = tool["name"]
-                            if (server_name, tool_name) not in selected_set:
-                                tool_rows.append([f"{server_name}: {tool_name}", "➕ Add"])
+                    selected_set = selection_keys(selected_tools)
                     
-                    return tool_rows
+                    return [[f"{server}: {tool_name}", "➕ Add"] for server, tool_name in tool_keys
+                            if (server, tool_name) not in selected_set]
                 except Exception as e:
                     print(f"Error in get_available_tools: {e}")
                     return []
@@ -756,29 +902,29 @@ def create_agent_tester_interface():
                         "<div style='text-align: center; color: #dc3545; font-size: 12px; padding: 4px;'>❌ Error loading MCP tools</div>"
                     )
             
-            def update_available_tools_with_status(server_name, selected_tools):
+            def update_available_tools_with_status(server_name, selected_tools, query=""):
                 """Update available tools when server selection changes with status reset"""
                 try:
-                    available_tools = get_available_tools(server_name, selected_tools)
+                    available_tools = get_available_tools(server_name, selected_tools, query)
                     status_msg = reset_tools_status()
                     return available_tools, status_msg
                 except Exception as e:
                     print(f"Error in update_available_tools_with_status: {e}")
                     return [], "<div style='text-align: center; color: #dc3545; font-size: 12px; padding: 4px;'>❌ Error loading tools</div>"
             
-            def add_tool(evt: gr.SelectData, selected_tools, server_name):
+            def add_tool(evt: gr.SelectData, selected_tools, server_name, query=""):
                 """Add a tool to the selected tools list"""
                 try:
                     # Validate inputs
-                    if evt is None or evt.index is None or not all_tools_cache or not server_name:
-                        return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools), selected_tools
+                    if evt is None or evt.index is None or not (server_name or query):
+                        return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools, query), selected_tools
                     
                     # Ensure selected_tools is a proper list
                     if not isinstance(selected_tools, list):
                         selected_tools = []
                     
                     # Get current available tools
-                    available_tools = get_available_tools(server_name, selected_tools)
+                    available_tools = get_available_tools(server_name, selected_tools, query)
                     
                     # Validate row index
                     row_index = evt.index[0] if isinstance(evt.index, list) else evt.index
@@ -794,11 +940,8 @@ def create_agent_tester_interface():
                         return get_selected_tools_display(selected_tools), available_tools, selected_tools
                     
                     # Check if tool is already selected (double-click protection)
-                    for existing_tool in selected_tools:
-                        if (isinstance(existing_tool, dict) and 
-                            existing_tool.get("server") == server and 
-                            existing_tool.get("tool") == tool):
-                            return get_selected_tools_display(selected_tools), available_tools, selected_tools
+                    if (server, tool) in selection_keys(selected_tools):
+                        return get_selected_tools_display(selected_tools), available_tools, selected_tools
                     
                     # Add the new tool
                     new_tool = {"server": server, "tool": tool}
@@ -807,20 +950,20 @@ def create_agent_tester_interface():
                     
                     return (
                         get_selected_tools_display(new_selected),
-                        get_available_tools(server_name, new_selected),
+                        get_available_tools(server_name, new_selected, query),
                         new_selected
                     )
                     
                 except Exception as e:
                     print(f"Error in add_tool: {e}")
-                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools), selected_tools
+                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools, query), selected_tools
             
-            def remove_tool(evt: gr.SelectData, selected_tools, server_name):
+            def remove_tool(evt: gr.SelectData, selected_tools, server_name, query=""):
                 """Remove a tool from the selected tools list"""
                 try:
                     # Validate inputs
                     if evt is None or evt.index is None:
-                        return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools), selected_tools
+                        return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools, query), selected_tools
                     
                     # Ensure selected_tools is a proper list
                     if not isinstance(selected_tools, list):
@@ -832,7 +975,7 @@ def create_agent_tester_interface():
                     # Validate row index
                     row_index = evt.index[0] if isinstance(evt.index, list) else evt.index
                     if row_index < 0 or row_index >= len(selected_display):
-                        return selected_display, get_available_tools(server_name, selected_tools), selected_tools
+                        return selected_display, get_available_tools(server_name, selected_tools, query), selected_tools
                     
                     # Extract tool information
                     tool_label = selected_display[row_index][0]
@@ -840,7 +983,7 @@ def create_agent_tester_interface():
                         server, tool = tool_label.split(": ", 1)
                     except ValueError:
                         print(f"Invalid tool label format: {tool_label}")
-                        return selected_display, get_available_tools(server_name, selected_tools), selected_tools
+                        return selected_display, get_available_tools(server_name, selected_tools, query), selected_tools
                     
                     # Remove the tool
                     new_selected = []
@@ -853,22 +996,22 @@ def create_agent_tester_interface():
                     
                     return (
                         get_selected_tools_display(new_selected),
-                        get_available_tools(server_name, new_selected),
+                        get_available_tools(server_name, new_selected, query),
                         new_selected
                     )
                     
                 except Exception as e:
                     print(f"Error in remove_tool: {e}")
-                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools), selected_tools
+                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools, query), selected_tools
             
             def reset_tools_status():
                 """Reset tools status to default message"""
                 return "<div style='text-align: center; color: #6c757d; font-size: 12px; padding: 4px;'>Click on tools to add/remove them</div>"
             
-            def add_tool_with_feedback(evt: gr.SelectData, selected_tools, server_name):
+            def add_tool_with_feedback(evt: gr.SelectData, selected_tools, server_name, query=""):
                 """Add a tool with user feedback"""
                 try:
-                    result = add_tool(evt, selected_tools, server_name)
+                    result = add_tool(evt, selected_tools, server_name, query)
                     # Check if a tool was actually added
                     if len(result[2]) > len(selected_tools):
                         status_msg = "<div style='text-align: center; color: #28a745; font-size: 12px; padding: 4px;'>✅ Tool added successfully!</div>"
@@ -879,12 +1022,12 @@ def create_agent_tester_interface():
                 except Exception as e:
                     print(f"❌ Error adding tool: {e}")
                     status_msg = "<div style='text-align: center; color: #dc3545; font-size: 12px; padding: 4px;'>❌ Error adding tool</div>"
-                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools), selected_tools, status_msg
+                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools, query), selected_tools, status_msg
             
-            def remove_tool_with_feedback(evt: gr.SelectData, selected_tools, server_name):
+            def remove_tool_with_feedback(evt: gr.SelectData, selected_tools, server_name, query=""):
                 """Remove a tool with user feedback"""
                 try:
-                    result = remove_tool(evt, selected_tools, server_name)
+                    result = remove_tool(evt, selected_tools, server_name, query)
                     # Check if a tool was actually removed
                     if len(result[2]) < len(selected_tools):
                         status_msg = "<div style='text-align: center; color: #28a745; font-size: 12px; padding: 4px;'>✅ Tool removed successfully!</div>"
@@ -895,7 +1038,7 @@ def create_agent_tester_interface():
                 except Exception as e:
                     print(f"❌ Error removing tool: {e}")
                     status_msg = "<div style='text-align: center; color: #dc3545; font-size: 12px; padding: 4px;'>❌ Error removing tool</div>"
-                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools), selected_tools, status_msg
+                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools, query), selected_tools, status_msg
             
             # Connect MCP events with improved debouncing
             init_btn.click(
@@ -905,10 +1048,24 @@ def create_agent_tester_interface():
                 show_progress=False
             )
             
+            def format_metrics_html():
+                """Render the quick metrics panel including prompt cache savings"""
+                cache_stats = agent_tester.callback.getCacheStats() if agent_tester.callback else {}
+                return f"""
+                    <div>
+                        <div>Requests: {agent_tester.token_metrics['requests']}</div>
+                        <div>Tokens: {agent_tester.token_metrics['total_tokens']} (in {agent_tester.token_metrics['input_tokens']} / out {agent_tester.token_metrics['output_tokens']})</div>
+                        <div>Est. cost: ${agent_tester.token_metrics['cost']:.4f}</div>
+                        <div>Cache hits: {cache_stats.get('cache_hits', 0)}/{cache_stats.get('requests', 0)} ({cache_stats.get('hit_rate', 0.0):.0%})</div>
+                        <div>Cached tokens: {cache_stats.get('cached_tokens', 0)} (saved ≈ {cache_stats.get('saved_tokens', 0)})</div>
+                    </div>
+                """
+            
             # Event Handlers
+            @profiled("process_message")
             async def process_message(message, history):
                 if not message:
-                    yield history, "", "", ""
+                    yield history, "", "", "", format_metrics_html()
                     return
                 
                 # Add user message
@@ -956,73 +1113,41 @@ def create_agent_tester_interface():
 </style>"""
                 
                 history.append({"role": "assistant", "content": processing_content})
-                yield history, "", "", ""
+                yield history, "", "", "", format_metrics_html()
                 
                 full_response = ""
                 tool_activities = []
                 logs_content = []
+                tracer = agent_tester.tracer
+                tracer.start_turn(f"turn: {message[:40]}")
                 
                 try:
                     async for response in agent_tester.process_query(message):
                         full_response = response
                         
-                        # Replace the processing message with the actual response
-                        history[-1] = {"role": "assistant", "content": full_response}
-                        
-                        # Extract tool activities from callback logs
-                        current_logs = agent_tester.callback_logs
-                        tool_activities = []
-                        for log in current_logs:
-                            if "TOOL_START" in log.upper() or "TOOL_COMPLETE" in log.upper():
-                                tool_activities.append(log)
-                        
-                        # Format tool activity display
-                        tool_html = ""
-                        if tool_activities:
-                            tool_html = "<div style='font-family: monospace; font-size: 12px;'>"
-                            for activity in tool_activities[-10:]:  # Show last 10 tool activities
-                                if "TOOL_START" in activity.upper():
-                                    color = "#0d6efd"  # Blue
-                                elif "TOOL_COMPLETE" in activity.upper():
-                                    color = "#198754"  # Green
-                                else:
-                                    color = "#6c757d"  # Gray
-                                tool_html += f"<div style='color: {color}; margin-bottom: 4px; padding: 2px;'>🔧 {activity}</div>"
-                            tool_html += "</div>"
-                        else:
-                            tool_html = "<div>Tool activities will appear here...</div>"
-                        
-                        # Format logs display
-                        logs_html = ""
-                        if current_logs:
-                            logs_html = "<div style='font-family: monospace; font-size: 12px;'>"
-                            for log in current_logs[-20:]:  # Show last 20 logs
-                                # Add color coding based on log type
-                                if "ERROR" in log.upper():
-                                    color = "#dc3545"  # Red
-                                elif "GUARDRAIL" in log.upper():
-                                    color = "#fd7e14"  # Orange
-                                elif "TOOL_START" in log.upper():
-                                    color = "#0d6efd"  # Blue
-                                elif "TOOL_COMPLETE" in log.upper():
-                                    color = "#198754"  # Green
-                                elif "MODEL_RESPONSE" in log.upper():
-                                    color = "#6f42c1"  # Purple
-                                else:
-                                    color = "#6c757d"  # Gray
-                                
-                                logs_html += f"<div style='color: {color}; margin-bottom: 4px; padding: 2px;'>{log}</div>"
-                            logs_html += "</div>"
-                        else:
-                            logs_html = "<div>System logs will appear here...</div>"
-                        
-                        yield history, "", tool_html, logs_html
+                        # Rendering and handing the update to Gradio is traced as UI time
+                        with tracer.span("ui update", "ui", chars=len(full_response)):
+                            # Replace the processing message with the actual response
+                            history[-1] = {"role": "assistant", "content": full_response}
+                            
+                            # Tool activities and recent logs come straight from the indexed log store
+                            tool_activities = agent_tester.recent_logs(types=["tool_start", "tool_complete"], limit=10)
+                            if tool_activities:
+                                tool_html = render_logs_html(tool_activities, prefix="🔧 ")
+                            else:
+                                tool_html = "<div>Tool activities will appear here...</div>"
+                            
+                            logs_html = render_logs_html(agent_tester.recent_logs(limit=20))
+                            
+                            yield history, "", tool_html, logs_html, format_metrics_html()
                     
                 except Exception as e:
                     error_msg = f"Error: {str(e)}"
                     history[-1] = {"role": "assistant", "content": error_msg}
                     logs_html = f"<div>Error: {str(e)}</div>"
-                    yield history, "", "", logs_html
+                    yield history, "", "", logs_html, format_metrics_html()
+                finally:
+                    tracer.end_turn()
 
             def initialize_agent(model, config):
                 if not model or not config:
@@ -1103,31 +1228,55 @@ def create_agent_tester_interface():
                     gr.update(visible=False)  # chat_interface
                 ]
             
-            def update_logs():
-                logs_html = ""
-                if agent_tester.callback_logs:
-                    logs_html = "<div style='font-family: monospace; font-size: 12px;'>"
-                    for log in agent_tester.callback_logs[-20:]:  # Show last 20 logs
-                        # Add color coding based on log type
-                        if "ERROR" in log.upper():
-                            color = "#dc3545"  # Red
-                        elif "GUARDRAIL" in log.upper():
-                            color = "#fd7e14"  # Orange
-                        elif "TOOL_START" in log.upper():
-                            color = "#0d6efd"  # Blue
-                        elif "TOOL_COMPLETE" in log.upper():
-                            color = "#198754"  # Green
-                        elif "MODEL_RESPONSE" in log.upper():
-                            color = "#6f42c1"  # Purple
-                        else:
-                            color = "#6c757d"  # Gray
-                        
-                        logs_html += f"<div style='color: {color}; margin-bottom: 4px; padding: 2px;'>{log}</div>"
-                    logs_html += "</div>"
-                else:
-                    logs_html = "<div>System logs will appear here...</div>"
-                
-                return "\n".join(agent_tester.callback_logs), logs_html
+            def render_logs_html(entries, prefix=""):
+                """Color-code log entries by their type"""
+                if not entries:
+                    return "<div>System logs will appear here...</div>"
+                logs_html = "<div style='font-family: monospace; font-size: 12px;'>"
+                for entry in entries:
+                    color = LOG_COLORS.get(entry.get("type"), "#6c757d")
+                    logs_html += f"<div style='color: {color}; margin-bottom: 4px; padding: 2px;'>{prefix}{html.escape(formatLog(entry))}</div>"
+                logs_html += "</div>"
+                return logs_html
+            
+            def update_logs(event_types, log_types, agent, tool, search_term, page, page_size):
+                """Apply the logs panel filters and return one page of matching entries"""
+                agent_tester.filter_logs = {
+                    "event_types": event_types or [],
+                    "log_types": log_types or [],
+                    "agents": [agent.strip()] if agent and agent.strip() else [],
+                    "tools": [tool.strip()] if tool and tool.strip() else [],
+                    "search_term": search_term or "",
+                }
+                page = max(int(page or 1), 1)
+                page_size = int(page_size or 100)
+                total, entries = agent_tester.query_logs(page, page_size)
+                pages = max((total + page_size - 1) // page_size, 1)
+                page_info = f"**{total}** matching entries • page {min(page, pages)} of {pages}"
+                logs_text = "\n".join(formatLog(entry) for entry in reversed(entries))
+                return logs_text, render_logs_html(agent_tester.recent_logs(limit=20)), page_info
+            
+            def render_waterfall():
+                """Latency breakdown of the most recent turn"""
+                return render_waterfall_html(agent_tester.tracer.last_turn())
+            
+            def export_trace():
+                """Write recorded turns as Chrome trace-event JSON"""
+                turns = len(agent_tester.tracer.turns)
+                if not turns:
+                    return "❌ No turns traced yet"
+                directory = agent_tester.log_exporter.writer.directory if agent_tester.log_exporter else EXPORT_DIR
+                path = os.path.join(directory, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+                agent_tester.tracer.export_chrome_trace(path)
+                return f"✅ Trace of {turns} turn(s) written to {path} (open in chrome://tracing or ui.perfetto.dev)"
+            
+            def set_profile_mode(mode):
+                """Switch the profiler and list the most recent profiles"""
+                profiler = get_profiler()
+                profiler.set_mode(mode)
+                recent = "\n".join(f"- `{path}`" for path in profiler.written[-10:][::-1])
+                state = "off" if not profiler.enabled else f"**{profiler.mode}**, writing to `{profiler.directory}/`"
+                return f"Profiling {state}" + (f"\n\nRecent profiles:\n{recent}" if recent else "")
             
             def clear_logs():
                 if agent_tester.callback:
@@ -1139,24 +1288,27 @@ def create_agent_tester_interface():
                 return "", logs_html, tool_html
             
             def export_logs():
-                """Export logs as JSON file"""
-                if agent_tester.callback:
-                    import json
-                    from datetime import datetime
-                    
-                    logs_data = {
+                """Report the streaming export files and write a small summary next to them"""
+                if agent_tester.callback and agent_tester.log_exporter:
+                    # Wait for queued entries to reach the files before listing them
+                    agent_tester.log_exporter.flush()
+                    writer = agent_tester.log_exporter.writer
+                    summary = {
                         "export_timestamp": datetime.now().isoformat(),
                         "agent_name": agent_tester.config_content.get("name", "Unknown"),
                         "model": agent_tester.selected_model,
-                        "logs": agent_tester.callback.getLogsAsJson(),
-                        "stats": agent_tester.callback.getLogStats()
+                        "log_files": writer.files(),
+                        "dropped_entries": agent_tester.log_exporter.dropped,
+                        "stats": {k: v for k, v in agent_tester.callback.getLogStats().items() if k != "recent_activity"},
+                        "usage": agent_tester.callback.getUsageSummary()
                     }
                     
-                    filename = f"agent_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                    with open(filename, 'w') as f:
-                        json.dump(logs_data, f, indent=2)
+                    summary_path = os.path.join(writer.directory, "summary.json")
+                    with open(summary_path, 'w') as f:
+                        json.dump(summary, f, indent=2)
+                    usage_filename = agent_tester.callback.usage.export_csv(os.path.join(writer.directory, "usage.csv"))
                     
-                    return f"✅ Logs exported to {filename}"
+                    return f"✅ Logs are streaming to {writer.directory} ({len(summary['log_files'])} file(s)); summary in {summary_path}, token usage in {usage_filename}"
                 else:
                     return "❌ No agent initialized"
             
@@ -1177,7 +1329,14 @@ def create_agent_tester_interface():
             # MCP Tools event connections
             server_selector.change(
                 fn=update_available_tools_with_status,
-                inputs=[server_selector, selected_tools_state],
+                inputs=[server_selector, selected_tools_state, tool_search],
+                outputs=[available_tools_df, tools_status],
+                show_progress=False
+            )
+            
+            tool_search.change(
+                fn=update_available_tools_with_status,
+                inputs=[server_selector, selected_tools_state, tool_search],
                 outputs=[available_tools_df, tools_status],
                 show_progress=False
             )
@@ -1185,7 +1344,7 @@ def create_agent_tester_interface():
             # Add tool with debouncing and feedback
             available_tools_df.select(
                 fn=add_tool_with_feedback,
-                inputs=[selected_tools_state, server_selector],
+                inputs=[selected_tools_state, server_selector, tool_search],
                 outputs=[selected_tools_df, available_tools_df, selected_tools_state, tools_status],
                 show_progress=False
             )
@@ -1193,7 +1352,7 @@ def create_agent_tester_interface():
             # Remove tool with debouncing and feedback
             selected_tools_df.select(
                 fn=remove_tool_with_feedback,
-                inputs=[selected_tools_state, server_selector],
+                inputs=[selected_tools_state, server_selector, tool_search],
                 outputs=[selected_tools_df, available_tools_df, selected_tools_state, tools_status],
                 show_progress=False
             )
@@ -1367,13 +1526,19 @@ def create_agent_tester_interface():
             submit_btn.click(
                 fn=process_message,
                 inputs=[msg, chatbot],
-                outputs=[chatbot, msg, tool_activity, logs_display]
+                outputs=[chatbot, msg, tool_activity, logs_display, metrics_display]
+            ).then(
+                fn=render_waterfall,
+                outputs=[waterfall_display]
             )
             
             msg.submit(
                 fn=process_message,
                 inputs=[msg, chatbot],
-                outputs=[chatbot, msg, tool_activity, logs_display]
+                outputs=[chatbot, msg, tool_activity, logs_display, metrics_display]
+            ).then(
+                fn=render_waterfall,
+                outputs=[waterfall_display]
             )
             
             save_config_btn.click(
@@ -1392,9 +1557,23 @@ def create_agent_tester_interface():
                 outputs=[logs, logs_display, tool_activity]
             )
             
+            log_filter_inputs = [log_type_filter, log_level_filter, log_agent_filter, log_tool_filter, log_search, log_page, log_page_size]
             refresh_logs_btn.click(
                 fn=update_logs,
-                outputs=[logs, logs_display]
+                inputs=log_filter_inputs,
+                outputs=[logs, logs_display, log_page_info]
+            )
+            
+            apply_filters_btn.click(
+                fn=update_logs,
+                inputs=log_filter_inputs,
+                outputs=[logs, logs_display, log_page_info]
+            )
+            
+            log_search.submit(
+                fn=update_logs,
+                inputs=log_filter_inputs,
+                outputs=[logs, logs_display, log_page_info]
             )
             
             export_logs_btn.click(
@@ -1402,6 +1581,27 @@ def create_agent_tester_interface():
                 outputs=[logs]
             )
             
+            refresh_logs_btn.click(
+                fn=render_waterfall,
+                outputs=[waterfall_display]
+            )
+            
+            export_trace_btn.click(
+                fn=export_trace,
+                outputs=[logs]
+            )
+            
+            profile_mode.change(
+                fn=set_profile_mode,
+                inputs=[profile_mode],
+                outputs=[profile_status]
+            )
+            
+            refresh_logs_btn.click(
+                fn=lambda: set_profile_mode(get_profiler().mode),
+                outputs=[profile_status]
+            )
+            
             refresh_config_btn.click(
                 fn=refresh_config_files,
                 outputs=[config_selector, agent_status]
@@ -12,14 +12,11 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')
 sys.path.append(project_root)
 print("Project root", project_root)
 
-# Global cache for all MCP tools
-all_tools_cache = None
-mcp_servers = []
-mcp_loaded = False
-
-from agentmaster import getADKAgent
 from constants import ALL_MODELS, GEMINI_API_KEY, OPENAI_API_KEY
-from mcp_client import MCPCLient
+from tool_catalog import get_tool_catalog, selection_keys
+
+# MCP servers and tools, shared with the Agent Tester and MCP Tester tabs
+tool_catalog = get_tool_catalog()
 
 class AgentBuilder:
     def __init__(self):
@@ -80,6 +77,8 @@ class AgentBuilder:
                 "OPENAI_API_KEY": OPENAI_API_KEY
             }
             
+            # google.adk and LiteLLM are only loaded once an agent is actually built
+            from agentmaster import getADKAgent
             self.callback,self.adk_agent = await getADKAgent(
                 self.config_content,
                 self.selected_model,
@@ -464,6 +463,11 @@ def create_agent_builder_interface():
                                             choices=[],
                                             interactive=True
                                         )
+                                        tool_search = gr.Textbox(
+                                            label="🔍 Search Tools",
+                                            placeholder="Keywords from names, descriptions or parameters (all servers)",
+                                            max_lines=1
+                                        )
                                         
                                         available_tools_df = gr.Dataframe(
                                             headers=["🔧 Tool", "⚡ Action"],
@@ -503,34 +507,20 @@ def create_agent_builder_interface():
 
             # Helper functions for MCP tools (keeping the existing logic)
             def load_mcp_servers():
-                global mcp_servers, all_tools_cache, mcp_loaded
-                if mcp_loaded:
-                    return mcp_servers
-                
-                try:
-                    mcp_client = MCPCLient()
-                    mcp_client.load_servers("mcp/mcp_config.json")
-                    mcp_servers = [server.name for server in mcp_client.servers]
-                    all_tools_cache = asyncio.run(mcp_client.load_all_tools())
-                    mcp_loaded = True
-                    print(f"Loaded {len(mcp_servers)} MCP servers: {mcp_servers}")
-                    return mcp_servers
-                except Exception as e:
-                    print(f"Error loading MCP servers: {e}")
-                    all_tools_cache = {}
-                    mcp_loaded = True
-                    return []
+                # Listed once per process and shared with the other tabs
+                tool_catalog.ensure_loaded()
+                return tool_catalog.servers()
             
-            def get_available_tools(server_name, selected_tools):
-                if not server_name or not all_tools_cache or server_name not in all_tools_cache:
+            def get_available_tools(server_name, selected_tools, query=""):
+                if query and query.strip():
+                    tool_keys = tool_catalog.search(query)
+                elif server_name:
+                    tool_keys = [(server_name, tool["name"]) for tool in tool_catalog.get_tools(server_name)]
+                else:
                     return []
-                selected_set = {(t['server'], t['tool']) for t in selected_tools}
-                tool_rows = []
-                for tool in all_tools_cache[server_name]:
-                    tool_name = tool["name"]
-                    if (server_name, tool_name) not in selected_set:
-                        tool_rows.append([f"{server_name}: {tool_name}", "➕ Add"])
-                return tool_rows
+                selected_set = selection_keys(selected_tools)
+                return [[f"{server}: {tool_name}", "➕ Add"] for server, tool_name in tool_keys
+                        if (server, tool_name) not in selected_set]
             
             def get_selected_tools_display(selected_tools):
                 if not selected_tools:
@@ -556,15 +546,15 @@ def create_agent_builder_interface():
                     selected_tools
                 )
             
-            def update_available_tools(server_name, selected_tools):
-                available_tools = get_available_tools(server_name, selected_tools)
+            def update_available_tools(server_name, selected_tools, query=""):
+                available_tools = get_available_tools(server_name, selected_tools, query)
                 return available_tools
             
-            def add_tool(evt: gr.SelectData, selected_tools, server_name):
-                if evt is None or evt.index is None or not all_tools_cache:
-                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools), selected_tools
+            def add_tool(evt: gr.SelectData, selected_tools, server_name, query=""):
+                if evt is None or evt.index is None or not (server_name or query):
+                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools, query), selected_tools
                 
-                available_tools = get_available_tools(server_name, selected_tools)
+                available_tools = get_available_tools(server_name, selected_tools, query)
                 row_index = evt.index[0] if isinstance(evt.index, list) else evt.index
                 if row_index >= len(available_tools):
                     return get_selected_tools_display(selected_tools), available_tools, selected_tools
@@ -575,36 +565,35 @@ def create_agent_builder_interface():
                 except:
                     return get_selected_tools_display(selected_tools), available_tools, selected_tools
                 
-                for t in selected_tools:
-                    if t.get("server") == server and t.get("tool") == tool:
-                        return get_selected_tools_display(selected_tools), available_tools, selected_tools
+                if (server, tool) in selection_keys(selected_tools):
+                    return get_selected_tools_display(selected_tools), available_tools, selected_tools
                 
                 new_selected = selected_tools + [{"server": server, "tool": tool}]
                 return (
                     get_selected_tools_display(new_selected),
-                    get_available_tools(server_name, new_selected),
+                    get_available_tools(server_name, new_selected, query),
                     new_selected
                 )
             
-            def remove_tool(evt: gr.SelectData, selected_tools, server_name):
+            def remove_tool(evt: gr.SelectData, selected_tools, server_name, query=""):
                 if evt is None or evt.index is None:
-                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools), selected_tools
+                    return get_selected_tools_display(selected_tools), get_available_tools(server_name, selected_tools, query), selected_tools
                 
                 selected_display = get_selected_tools_display(selected_tools)
                 row_index = evt.index[0] if isinstance(evt.index, list) else evt.index
                 if row_index >= len(selected_display):
-                    return selected_display, get_available_tools(server_name, selected_tools), selected_tools
+                    return selected_display, get_available_tools(server_name, selected_tools, query), selected_tools
                 
                 tool_label = selected_display[row_index][0]
                 try:
                     server, tool = tool_label.split(": ", 1)
                 except:
-                    return selected_display, get_available_tools(server_name, selected_tools), selected_tools
+                    return selected_display, get_available_tools(server_name, selected_tools, query), selected_tools
                 
                 new_selected = [t for t in selected_tools if not (t.get("server") == server and t.get("tool") == tool)]
                 return (
                     get_selected_tools_display(new_selected),
-                    get_available_tools(server_name, new_selected),
+                    get_available_tools(server_name, new_selected, query),
                     new_selected
                 )
             
@@ -616,19 +605,25 @@ def create_agent_builder_interface():
             
             server_selector.change(
                 fn=update_available_tools,
-                inputs=[server_selector, selected_tools_state],
+                inputs=[server_selector, selected_tools_state, tool_search],
+                outputs=[available_tools_df]
+            )
+            
+            tool_search.change(
+                fn=update_available_tools,
+                inputs=[server_selector, selected_tools_state, tool_search],
                 outputs=[available_tools_df]
             )
             
             available_tools_df.select(
                 fn=add_tool,
-                inputs=[selected_tools_state, server_selector],
+                inputs=[selected_tools_state, server_selector, tool_search],
                 outputs=[selected_tools_df, available_tools_df, selected_tools_state]
             )
             
             selected_tools_df.select(
                 fn=remove_tool,
-                inputs=[selected_tools_state, server_selector],
+                inputs=[selected_tools_state, server_selector, tool_search],
                 outputs=[selected_tools_df, available_tools_df, selected_tools_state]
             )
             
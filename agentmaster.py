@@ -1,4 +1,4 @@
-from contextlib import AsyncExitStack
+import asyncio
 from datetime import date
 import json
 import random
@@ -9,11 +9,13 @@ from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.agents.run_config import RunConfig
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters, SseServerParams
 from google.adk.agents.callback_context import CallbackContext
 
-from callback import Callback
+from callback import SESSION_ID_STATE_KEY, Callback
 from constants import LM_STUDIO_BASE_URL
+from prompt_cache import get_cache_params
+from shared_mcp_tool import load_shared_tools
+from telemetry import get_telemetry
 
 
 
@@ -24,10 +26,13 @@ class ADKAGENT:
         session_service = InMemorySessionService()
         self.USER_ID = f"user_{random.randint(1000, 9999)}"
         self.SESSION_ID = f"session_{random.randint(10000, 99999)}"
-        session_service.create_session(app_name=self.adkagent.name, user_id=self.USER_ID, session_id=self.SESSION_ID)
+        session_service.create_session(app_name=self.adkagent.name, user_id=self.USER_ID, session_id=self.SESSION_ID,
+                                       state={SESSION_ID_STATE_KEY: self.SESSION_ID})
 
         self.runner = Runner(agent=self.adkagent, app_name=self.adkagent.name, session_service=session_service)
         self.run_config = RunConfig(streaming_mode="sse" if is_stream else None)
+        self.telemetry = get_telemetry()
+        self.telemetry.session_started(self.adkagent.name)
 
         
 
@@ -37,25 +42,34 @@ class ADKAGENT:
         return []
     
     async def send_query(self, query: str) -> AsyncGenerator[str, None]:
+        """Yield the response as text chunks whose concatenation is the full reply.
+        With streaming enabled these are the model's partial deltas, otherwise one final chunk."""
         final_response_text = "Agent did not produce a final response."
         content = types.Content(role='user', parts=[types.Part(text=query)])
-
-        async for event in self.runner.run_async(user_id=self.USER_ID, session_id=self.SESSION_ID, new_message=content, run_config=self.run_config):
-            if hasattr(event, 'content_part_delta') and event.content_part_delta:
-                delta = event.content_part_delta
-                if delta.text:
-                    yield delta.text
-            # try:
-            #     if event.content.parts[0].function_call:
-            #         yield str(event.content.parts[0].function_call)
-            # except Exception as e:
-            #     # logger.error(f"Error during send_query: {e}")
-            #     continue
-
-            if event.is_final_response():
-                final_response_text = event.content.parts[0].text if event.content and event.content.parts else final_response_text
-                break
-        yield final_response_text
+        streamed = False
+
+        with self.telemetry.span("agent.turn", agent=self.adkagent.name, session=self.SESSION_ID):
+            async for event in self.runner.run_async(user_id=self.USER_ID, session_id=self.SESSION_ID, new_message=content, run_config=self.run_config):
+                if event.partial:
+                    self.telemetry.record("counter", "agentx.stream.chunks", agent=self.adkagent.name)
+                    delta = "".join(part.text or "" for part in event.content.parts) if event.content and event.content.parts else ""
+                    if delta:
+                        streamed = True
+                        yield delta
+                    continue
+                # try:
+                #     if event.content.parts[0].function_call:
+                #         yield str(event.content.parts[0].function_call)
+                # except Exception as e:
+                #     # logger.error(f"Error during send_query: {e}")
+                #     continue
+
+                if event.is_final_response():
+                    final_response_text = event.content.parts[0].text if event.content and event.content.parts else final_response_text
+                    break
+        self.telemetry.record("counter", "agentx.queries", agent=self.adkagent.name)
+        if not streamed:
+            yield final_response_text
     
 
 
@@ -63,14 +77,16 @@ class ADKAGENT:
 MCP_CONFIG_PATH = "mcp/mcp_config.json"
 
 
-def getModelClient(model_input,api_keys):
+def getModelClient(model_input,api_keys,instructions=None):
         model_client = None
         provider, model_name = model_input.split(":")
         model_str = f"{provider}/{model_name}"
+        # Long static instructions are marked cacheable so they are not re-processed every turn
+        cache_params = get_cache_params(provider, instructions) if instructions else {}
         if provider == "openai":
-            model_client = LiteLlm(api_key=api_keys["OPENAI_API_KEY"], model=model_str)
+            model_client = LiteLlm(api_key=api_keys["OPENAI_API_KEY"], model=model_str, **cache_params)
         elif provider == "gemini":
-            model_client = LiteLlm(api_key=api_keys["GEMINI_API_KEY"], model=model_str)
+            model_client = LiteLlm(api_key=api_keys["GEMINI_API_KEY"], model=model_str, **cache_params)
         elif provider == "lm_studio":
             model_client = LiteLlm(api_key="lm_studio", model=model_str,base_url=LM_STUDIO_BASE_URL)
         
@@ -81,45 +97,11 @@ async def load_mcp_servers_config(MCP_CONFIG_PATH):
 
 
 async def loadmcp_tools(mcp_tool_configs,mcp_servers_config):
-    all_tools = []
-    tools_by_server = {}
-    for tool in mcp_tool_configs:
-        tools_by_server.setdefault(tool["server"], []).append(tool["tool"])
-
-    try:
-        async with AsyncExitStack() as stack:
+    # One shared session per server for all agents, instead of a toolset connection per agent
+    return await load_shared_tools(mcp_tool_configs, mcp_servers_config)
 
-            for server_name, tool_list in tools_by_server.items():
-                server_config = mcp_servers_config.get("mcpServers", {}).get(server_name)
-                if not server_config:
-                    continue
-
-                command = server_config.get("command")
-                if command in ["uvx","uv", "npx"]:
-                    conn_params = StdioServerParameters(command=command, args=server_config.get("args", []), env=server_config.get("env"))
-                elif command == "remote":
-                    conn_params = SseServerParams(url=server_config.get("end_point"))
-                else:
-                    continue
-
-                tools, _exit_stack = await MCPToolset.from_server(connection_params=conn_params, async_exit_stack=stack)
-                print("Reached in get_agent 8.5 .......",tool_list)
-                for t in tools:
-                    if t.name in tool_list:
-                        print(t.auth_scheme)
-                        print(t.mcp_tool)
-                        print("Reached in get_agent 8.6 .......",t.name)
-                        all_tools.append(t)
-
-    except Exception as e:
-        await stack.aclose()
-    finally:
-        await _exit_stack.aclose()
-
-    return all_tools
-
-async def getADKAgent(prompt_config,model_str,temperature,max_tokens,api_keys):
-    callback = Callback()
+async def getADKAgent(prompt_config,model_str,temperature,max_tokens,api_keys,is_stream=False):
+    callback = Callback(model_name=model_str)
     mcp_servers_config = None
     with open(MCP_CONFIG_PATH, 'r') as f:
         mcp_servers_config =  json.load(f)
@@ -138,11 +120,12 @@ async def getADKAgent(prompt_config,model_str,temperature,max_tokens,api_keys):
     <output_format_for_response>"{output_format}\n\n
     <current_context>:Todays date is {today}\n\n
     """
-    model_client = getModelClient(model_str,api_keys)
-
-    mcp_tools_to_add = []
+    # Build the model client while the MCP tools load instead of one after the other
+    model_task = asyncio.to_thread(getModelClient, model_str, api_keys, instructions)
     if mcp_tools_configured:
-        mcp_tools_to_add = await loadmcp_tools(mcp_tools_configured,mcp_servers_config)
+        model_client, mcp_tools_to_add = await asyncio.gather(model_task, loadmcp_tools(mcp_tools_configured,mcp_servers_config))
+    else:
+        model_client, mcp_tools_to_add = await model_task, []
 
     generate_content_config = types.GenerateContentConfig(temperature=temperature, max_output_tokens=max_tokens)
     adk_agent=LlmAgent(
@@ -160,7 +143,7 @@ async def getADKAgent(prompt_config,model_str,temperature,max_tokens,api_keys):
         )
     
   
-    adk_agent_object = ADKAGENT(adkagent=adk_agent, callback=callback)
+    adk_agent_object = ADKAGENT(adkagent=adk_agent, callback=callback, is_stream=is_stream)
     return callback,adk_agent_object
 
 
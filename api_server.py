@@ -0,0 +1,255 @@
+"""Headless HTTP API for serving Agent X agents.
+
+    python api_server.py            # or: uvicorn api_server:app --workers 1
+
+Endpoints:
+    GET    /agents                         agent configs in agent_config/
+    POST   /sessions                       {"agent": "file.json", "model": "openai:gpt-4.1-mini", ...}
+    GET    /sessions/{id}                  session info and token usage
+    POST   /sessions/{id}/messages         {"message": "..."}; SSE when "stream": true or Accept: text/event-stream
+    WS     /sessions/{id}/ws               send {"message": "..."}, receive chunk/done/error frames
+    DELETE /sessions/{id}
+    GET    /metrics                        Prometheus metrics
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from agentmaster import ADKAGENT, getADKAgent
+from constants import ALL_MODELS, GEMINI_API_KEY, OPENAI_API_KEY
+from mcp_supervisor import get_mcp_supervisor
+from metrics import CONTENT_TYPE, get_metrics_registry, monitor_event_loop_lag
+
+AGENT_CONFIG_DIR = os.environ.get("AGENTX_AGENT_CONFIG_DIR", "agent_config")
+API_HOST = os.environ.get("AGENTX_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("AGENTX_API_PORT", 8000))
+MAX_SESSIONS = int(os.environ.get("AGENTX_API_MAX_SESSIONS", 1000))
+SESSION_TTL_SECONDS = float(os.environ.get("AGENTX_API_SESSION_TTL", 3600))
+
+
+class CreateSessionRequest(BaseModel):
+    agent: str
+    model: Optional[str] = None
+    temperature: float = 0.2
+    max_tokens: int = 2000
+    stream: bool = True
+
+
+class MessageRequest(BaseModel):
+    message: str
+    stream: Optional[bool] = None
+
+
+class AgentSession:
+    """One agent conversation; turns on the same session are serialized by its lock"""
+
+    def __init__(self, session_id: str, agent_file: str, model: str, callback, agent: ADKAGENT):
+        self.id = session_id
+        self.agent_file = agent_file
+        self.model = model
+        self.callback = callback
+        self.agent = agent
+        self.lock = asyncio.Lock()
+        self.created = time.time()
+        self.last_used = time.monotonic()
+        self.turns = 0
+
+    def info(self) -> Dict:
+        return {
+            "session_id": self.id,
+            "agent": self.agent_file,
+            "model": self.model,
+            "turns": self.turns,
+            "busy": self.lock.locked(),
+            "created": self.created,
+            "usage": self.callback.usage.getTotals() if self.callback else {},
+        }
+
+
+class SessionManager:
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL_SECONDS):
+        self.sessions: Dict[str, AgentSession] = {}
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        # Sessions whose agent is still being built; they count toward max_sessions
+        self.pending = 0
+
+    async def create(self, request: CreateSessionRequest) -> AgentSession:
+        config = load_agent_config(request.agent)
+        self.evict_idle()
+        # The slot is reserved before building the agent, so concurrent creates cannot overshoot
+        if len(self.sessions) + self.pending >= self.max_sessions:
+            raise HTTPException(status_code=503, detail="Too many active sessions")
+        self.pending += 1
+        try:
+            model = request.model or config.get("model") or ALL_MODELS[0]
+            api_keys = {"GEMINI_API_KEY": GEMINI_API_KEY, "OPENAI_API_KEY": OPENAI_API_KEY}
+            callback, agent = await getADKAgent(config, model, request.temperature, request.max_tokens,
+                                                api_keys=api_keys, is_stream=request.stream)
+            session = AgentSession(uuid.uuid4().hex, request.agent, model, callback, agent)
+            self.sessions[session.id] = session
+        finally:
+            self.pending -= 1
+        return session
+
+    def get(self, session_id: str) -> AgentSession:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        session.last_used = time.monotonic()
+        return session
+
+    def delete(self, session_id: str):
+        if self.sessions.pop(session_id, None) is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.ttl
+        for session_id, session in list(self.sessions.items()):
+            if session.last_used < cutoff and not session.lock.locked():
+                del self.sessions[session_id]
+
+    async def evict_idle_periodically(self):
+        """Drop idle sessions even when no new sessions are being created"""
+        interval = min(max(self.ttl / 4, 1), 60)
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+
+def list_agent_configs():
+    if not os.path.isdir(AGENT_CONFIG_DIR):
+        return []
+    agents = []
+    for file_name in sorted(f for f in os.listdir(AGENT_CONFIG_DIR) if f.endswith(".json")):
+        try:
+            with open(os.path.join(AGENT_CONFIG_DIR, file_name)) as f:
+                config = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        agents.append({
+            "agent": file_name,
+            "name": config.get("name", file_name),
+            "description": config.get("background", ""),
+            "tools": [f"{tool['server']}/{tool['tool']}" for tool in config.get("mcp_tools", [])],
+        })
+    return agents
+
+
+def load_agent_config(file_name: str) -> Dict:
+    if os.path.basename(file_name) != file_name or not file_name.endswith(".json"):
+        raise HTTPException(status_code=400, detail="Invalid agent config name")
+    path = os.path.join(AGENT_CONFIG_DIR, file_name)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Agent config not found")
+    with open(path) as f:
+        return json.load(f)
+
+
+async def run_turn(session: AgentSession, message: str):
+    """Stream one turn's text chunks; waits for any turn already running on the session"""
+    async with session.lock:
+        session.turns += 1
+        async for chunk in session.agent.send_query(message):
+            yield chunk
+    session.last_used = time.monotonic()
+
+
+def sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+manager = SessionManager()
+registry = get_metrics_registry()
+app = FastAPI(title="Agent X API")
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.lag_monitor = asyncio.create_task(monitor_event_loop_lag(registry))
+    app.state.session_evictor = asyncio.create_task(manager.evict_idle_periodically())
+    get_mcp_supervisor().start()
+
+
+@app.get("/agents")
+def get_agents():
+    return {"agents": list_agent_configs(), "models": ALL_MODELS}
+
+
+@app.post("/sessions", status_code=201)
+async def create_session(request: CreateSessionRequest):
+    session = await manager.create(request)
+    return session.info()
+
+
+@app.get("/sessions/{session_id}")
+def get_session(session_id: str):
+    return manager.get(session_id).info()
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+def delete_session(session_id: str):
+    manager.delete(session_id)
+
+
+@app.post("/sessions/{session_id}/messages")
+async def send_message(session_id: str, body: MessageRequest, request: Request):
+    session = manager.get(session_id)
+    stream = body.stream if body.stream is not None else "text/event-stream" in request.headers.get("accept", "")
+
+    if not stream:
+        response = "".join([chunk async for chunk in run_turn(session, body.message)])
+        return JSONResponse({"session_id": session.id, "response": response})
+
+    async def events():
+        try:
+            async for chunk in run_turn(session, body.message):
+                yield sse("chunk", {"text": chunk})
+            yield sse("done", {"usage": session.callback.usage.getTotals()})
+        except Exception as e:
+            yield sse("error", {"error": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.websocket("/sessions/{session_id}/ws")
+async def session_socket(websocket: WebSocket, session_id: str):
+    session = manager.sessions.get(session_id)
+    if session is None:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            message = payload.get("message", "")
+            if not message:
+                await websocket.send_json({"type": "error", "error": "message is required"})
+                continue
+            session.last_used = time.monotonic()
+            try:
+                async for chunk in run_turn(session, message):
+                    await websocket.send_json({"type": "chunk", "text": chunk})
+                await websocket.send_json({"type": "done", "usage": session.callback.usage.getTotals()})
+            except Exception as e:
+                await websocket.send_json({"type": "error", "error": str(e)})
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=API_HOST, port=API_PORT)
@@ -0,0 +1,139 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions endpoint with deterministic, timed output"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply_text(self, request):
+        last = request.get("messages", [{}])[-1].get("content") or ""
+        if isinstance(last, list):
+            last = " ".join(part.get("text", "") for part in last if isinstance(part, dict))
+        words = self.server.response_words
+        return " ".join(f"token{i}" for i in range(words)) + f" (echo: {last[:40]})"
+
+    def _usage(self, request, text):
+        prompt_chars = sum(len(json.dumps(m.get("content", ""))) for m in request.get("messages", []))
+        prompt_tokens = max(prompt_chars // 4, 1)
+        completion_tokens = max(len(text) // 4, 1)
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            body = json.dumps({"object": "list", "data": [{"id": "bench-model", "object": "model"}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests += 1
+        text = self._reply_text(request)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = request.get("model", "bench-model")
+
+        time.sleep(self.server.first_token_delay)
+        if not request.get("stream"):
+            time.sleep(self.server.token_delay * len(text.split()))
+            body = json.dumps({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": self._usage(request, text),
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(chunk):
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+        send({**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})
+        for word in text.split(" "):
+            send({**base, "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]})
+            time.sleep(self.server.token_delay)
+        send({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": self._usage(request, text)})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """Local stand-in for a model provider so benchmarks measure the runtime, not the network"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, first_token_delay: float = 0.05,
+                 token_delay: float = 0.002, response_words: int = 50):
+        super().__init__((host, port), FakeLLMHandler)
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.response_words = response_words
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible model server")
+    parser.add_argument("--port", type=int, default=8911)
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--token-ms", type=float, default=2)
+    parser.add_argument("--words", type=int, default=50)
+    args = parser.parse_args()
+    server = FakeLLMServer(port=args.port, first_token_delay=args.first_token_ms / 1000,
+                           token_delay=args.token_ms / 1000, response_words=args.words)
+    print(f"Fake model server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
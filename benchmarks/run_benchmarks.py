@@ -0,0 +1,309 @@
+"""Agent X runtime benchmarks.
+
+Runs the agent runtime against a local fake model server and the bundled MCP server, so
+results reflect our own overhead rather than provider latency:
+
+    python benchmarks/run_benchmarks.py                  # run and compare with baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline  # record a new baseline
+
+Exits with status 1 when a metric regresses past the tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_llm_server import FakeLLMServer
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+BENCH_MODEL = "openai:gpt-4.1-mini"
+BENCH_API_KEYS = {"OPENAI_API_KEY": "benchmark", "GEMINI_API_KEY": "benchmark"}
+BENCH_PROMPT = {
+    "name": "Bench Agent",
+    "background": "You are a benchmark agent. " * 40,
+    "input_values": "short questions",
+    "task_details": "answer briefly",
+    "output_format": "plain text",
+}
+MCP_SERVER_CONFIG = {"command": "python3", "args": [os.path.join(REPO_ROOT, "mcp", "server.py")]}
+
+
+def summarize(samples, prefix):
+    """Median, p95 and mean of timing samples (seconds) as millisecond metrics"""
+    # Imported here, like the other repo modules, so configure_environment runs first
+    from mcp_loadtest import percentile
+
+    ordered = sorted(samples)
+    p95 = percentile(ordered, 95)
+    return {
+        f"{prefix}_p50_ms": round(statistics.median(ordered) * 1000, 2),
+        f"{prefix}_p95_ms": round(p95 * 1000, 2),
+        f"{prefix}_mean_ms": round(statistics.mean(ordered) * 1000, 2),
+    }
+
+
+def configure_environment(base_url, work_dir):
+    """Point the runtime at the fake model server and keep logs/payloads out of the repo"""
+    os.environ["OPENAI_API_BASE"] = base_url
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["AGENTX_LOG_DIR"] = os.path.join(work_dir, "logs")
+    os.environ["AGENTX_PAYLOAD_DIR"] = os.path.join(work_dir, "payloads")
+    config_path = os.path.join(work_dir, "mcp_config.json")
+    with open(config_path, "w") as f:
+        json.dump({"mcpServers": {"agentx": MCP_SERVER_CONFIG}}, f)
+    return config_path
+
+
+async def _cold_start_child(config_path):
+    start = time.perf_counter()
+    import agentmaster
+    imported = time.perf_counter()
+    agentmaster.MCP_CONFIG_PATH = config_path
+    await agentmaster.getADKAgent(BENCH_PROMPT, BENCH_MODEL, 0.2, 256, BENCH_API_KEYS)
+    built = time.perf_counter()
+    print(json.dumps({"import_s": imported - start, "agent_s": built - imported}))
+
+
+def bench_cold_start(config_path, runs):
+    """Import + first agent construction in a fresh interpreter each run"""
+    import_samples, agent_samples, total_samples = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, __file__, "--cold-start-child", config_path],
+            capture_output=True, text=True, check=True, env=os.environ.copy(), cwd=REPO_ROOT
+        ).stdout
+        total_samples.append(time.perf_counter() - start)
+        child = json.loads(output.strip().splitlines()[-1])
+        import_samples.append(child["import_s"])
+        agent_samples.append(child["agent_s"])
+    metrics = {}
+    metrics.update(summarize(import_samples, "cold_start_import"))
+    metrics.update(summarize(agent_samples, "cold_start_agent"))
+    metrics.update(summarize(total_samples, "cold_start_process"))
+    return metrics
+
+
+async def bench_agent_turns(config_path, turns, warmup):
+    """Time-to-first-token and full turn latency through getADKAgent / ADKAGENT.send_query"""
+    import agentmaster
+    agentmaster.MCP_CONFIG_PATH = config_path
+
+    callback, streaming_agent = await agentmaster.getADKAgent(BENCH_PROMPT, BENCH_MODEL, 0.2, 256, BENCH_API_KEYS,
+                                                              is_stream=True)
+
+    first_model_event = []
+    callback.addLogListener(
+        lambda record: first_model_event.append(time.perf_counter()) if record.type == "model_response" else None
+    )
+
+    ttft_samples, turn_samples = [], []
+    tracemalloc.start()
+    for i in range(warmup + turns):
+        first_model_event.clear()
+        start = time.perf_counter()
+        async for _ in streaming_agent.send_query(f"benchmark question {i}"):
+            pass
+        end = time.perf_counter()
+        if i >= warmup:
+            ttft_samples.append((first_model_event[0] if first_model_event else end) - start)
+            turn_samples.append(end - start)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metrics = {}
+    metrics.update(summarize(ttft_samples, "agent_ttft"))
+    metrics.update(summarize(turn_samples, "agent_turn"))
+    metrics["agent_turn_memory_peak_kb"] = round(peak / 1024, 1)
+    metrics["agent_retained_memory_kb"] = round(current / 1024, 1)
+    return metrics
+
+
+async def bench_mcp(iterations):
+    """Tool listing and call latency against mcp/server.py, compared with calling the tool in-process"""
+    from mcp_client import MCPCLient
+    sys.path.insert(0, os.path.join(REPO_ROOT, "mcp"))
+    from tools.sample_tool import SampleTool
+
+    client = MCPCLient()
+    client.load_single_server("agentx", MCP_SERVER_CONFIG)
+
+    list_samples = []
+    for _ in range(max(iterations // 4, 1)):
+        start = time.perf_counter()
+        await client.load_all_tools()
+        list_samples.append(time.perf_counter() - start)
+
+    call_samples, direct_samples = [], []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await client.call_tool("agentx", "string_reverser_tool", {"text": f"benchmark {i}"})
+        call_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        SampleTool().execute(text=f"benchmark {i}")
+        direct_samples.append(time.perf_counter() - start)
+
+    metrics = {}
+    metrics.update(summarize(list_samples, "mcp_list_tools"))
+    metrics.update(summarize(call_samples, "mcp_call_tool"))
+    metrics["mcp_call_overhead_ms"] = round((statistics.median(call_samples) - statistics.median(direct_samples)) * 1000, 2)
+    return metrics
+
+
+def bench_callback_logging(entries, response_bytes):
+    """Cost of the Callback hooks per tool call and model response, and memory kept per log entry"""
+    from callback import Callback
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+
+    callback = Callback(model_name=BENCH_MODEL)
+    tool = SimpleNamespace(name="string_reverser_tool")
+    tool_context = SimpleNamespace(agent_name="Bench_Agent")
+    callback_context = SimpleNamespace(agent_name="Bench_Agent", invocation_id="bench", state={})
+    response = {"data": "x" * response_bytes}
+    llm_response = LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text="benchmark answer " * 20)]),
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=1200, candidates_token_count=80, cached_content_token_count=1024, total_token_count=1280
+        ),
+    )
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for i in range(entries):
+        args = {"text": f"benchmark {i}"}
+        callback.before_tool_callback(tool, args, tool_context)
+        callback.after_tool_callback(tool, args, tool_context, response)
+        callback.after_model_callback(callback_context, llm_response)
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    callback.queryLogs(types=["tool_complete"], search="string", limit=100)
+    query_elapsed = time.perf_counter() - start
+    callback.log_sink.flush()
+
+    log_count = len(callback.agent_logs)
+    return {
+        "callback_hook_us": round(elapsed / (entries * 3) * 1e6, 2),
+        "callback_logs_per_s": round(log_count / elapsed, 1),
+        "callback_bytes_per_log": round(retained / log_count, 1),
+        "callback_query_ms": round(query_elapsed * 1000, 3),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return (report_lines, regressions) comparing results with a baseline.
+
+    Metrics ending in _per_s are better when higher, everything else when lower.
+    """
+    lines, regressions = [], []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if not isinstance(base, (int, float)) or not base:
+            lines.append(f"  {name:<34} {value:>12}")
+            continue
+        change = (value - base) / base
+        worse = -change if name.endswith("_per_s") else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif worse < -tolerance:
+            flag = "  improved"
+        lines.append(f"  {name:<34} {value:>12} (baseline {base}, {change:+.1%}){flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Agent X runtime benchmarks")
+    parser.add_argument("--only", nargs="*", choices=["cold_start", "agent", "mcp", "callback"],
+                        help="Run only these benchmarks")
+    parser.add_argument("--turns", type=int, default=10, help="Measured agent turns")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured warmup turns")
+    parser.add_argument("--cold-starts", type=int, default=3, help="Fresh interpreter runs for cold start")
+    parser.add_argument("--mcp-iterations", type=int, default=10, help="MCP tool calls to time")
+    parser.add_argument("--log-entries", type=int, default=2000, help="Tool/model callback rounds to time")
+    parser.add_argument("--response-bytes", type=int, default=16 * 1024, help="Size of the fake tool response")
+    parser.add_argument("--first-token-ms", type=float, default=50, help="Fake model delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=2, help="Fake model delay per streamed token")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before failing")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--output", help="Also write results to this JSON file")
+    parser.add_argument("--cold-start-child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_child:
+        asyncio.run(_cold_start_child(args.cold_start_child))
+        return
+
+    selected = set(args.only or ["cold_start", "agent", "mcp", "callback"])
+    server = FakeLLMServer(first_token_delay=args.first_token_ms / 1000, token_delay=args.token_ms / 1000).start()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="agentx-bench-") as work_dir:
+        config_path = configure_environment(server.base_url, work_dir)
+        try:
+            if "cold_start" in selected:
+                print("Running cold start benchmark...")
+                results.update(bench_cold_start(config_path, args.cold_starts))
+            if "agent" in selected:
+                print("Running agent turn benchmark...")
+                results.update(asyncio.run(bench_agent_turns(config_path, args.turns, args.warmup)))
+            if "mcp" in selected:
+                print("Running MCP benchmark...")
+                results.update(asyncio.run(bench_mcp(args.mcp_iterations)))
+            if "callback" in selected:
+                print("Running callback logging benchmark...")
+                results.update(bench_callback_logging(args.log_entries, args.response_bytes))
+        finally:
+            server.stop()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("metrics", {})
+
+    lines, regressions = compare(results, baseline, args.tolerance)
+    print("\nResults:")
+    print("\n".join(lines))
+
+    record = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(record, f, indent=2)
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                record["metrics"] = {**json.load(f).get("metrics", {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump(record, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} metric(s) regressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
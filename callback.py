@@ -9,74 +9,127 @@ from google.adk.tools.base_tool import BaseTool
 import re
 from datetime import datetime
 
+from prompt_cache import PromptCacheStats, estimate_tokens
+from token_usage import TokenUsageTracker
+from log_sink import get_log_sink
+from log_store import LogRecord, LogStore, formatLog
+from payload_store import PayloadRef, get_payload_store
+from tracing import get_tracer
+from telemetry import get_telemetry
+from profiling import profiled
+import time
+
+# Session state key holding the session id, set when ADKAGENT creates the session
+SESSION_ID_STATE_KEY = "agentx_session_id"
+
+
+def _get_session_id(callback_context: CallbackContext) -> str:
+    """Session id for usage accounting, read from the session state"""
+    return callback_context.state.get(SESSION_ID_STATE_KEY, "") or ""
+
+
+def _estimate_request_tokens(llm_request: LlmRequest) -> int:
+    """Estimate prompt tokens of a request from its system instruction and contents"""
+    texts = []
+    system_instruction = llm_request.config.system_instruction if llm_request.config else None
+    if isinstance(system_instruction, str):
+        texts.append(system_instruction)
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            if part.text:
+                texts.append(part.text)
+            elif part.function_response:
+                texts.append(str(part.function_response.response))
+    return estimate_tokens("\n".join(texts))
+
+
+def _tool_error(tool_response: Any) -> Optional[str]:
+    """Error message of a failed tool call, or None.
+
+    Handles MCP CallToolResult objects (isError), their dict form, and the {"error": ...}
+    dicts SharedMCPTool returns when the call itself fails.
+    """
+    if isinstance(tool_response, dict):
+        if tool_response.get("error"):
+            return str(tool_response["error"])
+        is_error = tool_response.get("isError")
+    else:
+        is_error = getattr(tool_response, "isError", None)
+    return "tool returned an error" if is_error else None
+
+
 class Callback:
 #                     "description": tool.description,
-    def __init__(self):
+    def __init__(self, model_name: str = ""):
         self.agent_logs = []
+        self.model_name = model_name
+        self.cache_stats = PromptCacheStats(model_name.split(":")[0])
+        self.usage = TokenUsageTracker()
+        # Local input token estimates per invocation, used when the provider reports no usage
+        self._pending_input_tokens = {}
+        self.log_sink = get_log_sink()
+        # Functions called with every new log entry, e.g. streaming exporters
+        self.log_listeners = []
+        self.log_store = LogStore()
+        self.payload_store = get_payload_store()
+        self.tracer = get_tracer()
+        self.telemetry = get_telemetry()
+        # perf_counter start of open model and tool calls, for telemetry durations
+        self._call_started = {}
 
-    def _add_log(self, log_type: str, message: str, agent_name: str = "", extra_data: Dict = None):
-        """Add a formatted log entry with timestamp"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = {
-            "timestamp": timestamp,
-            "type": log_type,
-            "agent": agent_name,
-            "message": message,
-            "data": extra_data or {}
-        }
+    def _add_log(self, log_type: str, message: str, agent_name: str = "", extra_data: Dict = None, level: str = "info"):
+        """Add a compact log record; large payloads in extra_data are spilled to disk by reference"""
+        data = {key: self.payload_store.maybe_spill(value) for key, value in (extra_data or {}).items()}
+        log_entry = LogRecord(log_type, message, agent_name, data, level)
         self.agent_logs.append(log_entry)
+        self.log_store.add(log_entry)
+        for listener in self.log_listeners:
+            listener(log_entry)
 
+    def addLogListener(self, listener):
+        """Register a function to receive each log entry as it is added"""
+        self.log_listeners.append(listener)
+
+    @profiled("callback_getLogs")
     def getLogs(self):
         """Return formatted logs for display"""
-        formatted_logs = []
-        for log in self.agent_logs:
-            timestamp = log.get("timestamp", "")
-            log_type = log.get("type", "").upper()
-            agent = log.get("agent", "")
-            message = log.get("message", "")
-            
-            # Create a formatted log string
-            if agent:
-                formatted_log = f"[{timestamp}] {log_type} | {agent} | {message}"
-            else:
-                formatted_log = f"[{timestamp}] {log_type} | {message}"
-            
-            formatted_logs.append(formatted_log)
-        
-        print("SENDING FORMATTED LOGS ::::::::::::::::", formatted_logs)
-        return formatted_logs
+        return [formatLog(log) for log in self.agent_logs]
+
+    def queryLogs(self, **filters):
+        """Filter logs through the indexed store, returns (total_matches, entries)"""
+        return self.log_store.query(**filters)
     
     def getLogStats(self):
         """Return statistics about the logs"""
         stats = {
             "total_logs": len(self.agent_logs),
-            "by_type": {},
-            "by_agent": {},
+            "by_type": self.log_store.counts("type"),
+            "by_agent": self.log_store.counts("agent"),
+            "by_level": self.log_store.counts("level"),
             "recent_activity": []
         }
         
-        for log in self.agent_logs:
-            log_type = log.get("type", "unknown")
-            agent = log.get("agent", "unknown")
-            
-            # Count by type
-            stats["by_type"][log_type] = stats["by_type"].get(log_type, 0) + 1
-            
-            # Count by agent
-            stats["by_agent"][agent] = stats["by_agent"].get(agent, 0) + 1
-        
         # Get recent activity (last 5 logs)
-        stats["recent_activity"] = self.agent_logs[-5:] if len(self.agent_logs) > 5 else self.agent_logs
+        stats["recent_activity"] = [log.to_dict() for log in self.agent_logs[-5:]]
         
         return stats
     
+    def getUsageSummary(self):
+        """Return token and cost totals by model, agent, session and tool turn"""
+        return self.usage.getSummary()
+
+    def getCacheStats(self):
+        """Return prompt cache hit statistics"""
+        return self.cache_stats.getStats()
+
     def clearLogs(self):
         """Clear all logs"""
         self.agent_logs.clear()
+        self.log_store.clear()
         
     def getLogsAsJson(self):
         """Return logs as JSON for export"""
-        return self.agent_logs
+        return [log.to_dict() for log in self.agent_logs]
     
     def guardrail_callback(self,callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
             """
@@ -86,7 +139,7 @@ class Callback:
 
             agent_name = callback_context.agent_name
             self._add_log("guardrail", f"Checking request for inappropriate content", agent_name)
-            print(f"Calling guardrail_callback for agent '{agent_name}' {callback_context}")
+            self.log_sink.emit("debug", "guardrail_check", agent=agent_name, invocation_id=callback_context.invocation_id)
             # Inspect the last user message in the request contents
             last_user_message = ""
             if llm_request.contents and llm_request.contents[-1].role == 'user':
@@ -95,7 +148,7 @@ class Callback:
             try:
                 if "FUCKING" in last_user_message.upper():
                 # Return an LlmResponse to skip the actual LLM call
-                    self._add_log("guardrail", "Request blocked due to inappropriate language", agent_name)
+                    self._add_log("guardrail", "Request blocked due to inappropriate language", agent_name, level="warning")
                     return LlmResponse(
                         content=types.Content(
                             role="model",
@@ -105,11 +158,15 @@ class Callback:
                 else:
                     self._add_log("guardrail", "Request passed content filter", agent_name)
             except Exception as e:
-                self._add_log("error", f"Error in guardrail_callback: {e}", agent_name)
-                print(f"[Callback] Error in guardrail_callback: {e}")
-                # Return None to allow the (modified) request to go to the LLM
-                return None
+                self._add_log("error", f"Error in guardrail_callback: {e}", agent_name, level="error")
+                self.log_sink.emit("error", "guardrail_error", agent=agent_name, error=str(e))
             
+            # Only a request that goes on to the LLM gets a model span; a blocked one never
+            # reaches after_model_callback to close it
+            self._pending_input_tokens[callback_context.invocation_id] = _estimate_request_tokens(llm_request)
+            self.tracer.begin(("model", callback_context.invocation_id), f"model: {agent_name}", "model", model=self.model_name)
+            self._call_started[("model", callback_context.invocation_id)] = time.perf_counter()
+            # Return None to allow the (modified) request to go to the LLM
             return None
 
 
@@ -119,37 +176,71 @@ class Callback:
         tool_name = tool.name
         args_str = str(args)[:100] + "..." if len(str(args)) > 100 else str(args)
         self._add_log("tool_start", f"Starting tool '{tool_name}' with args: {args_str}", agent_name, {"tool": tool_name, "args": args})
-        print(f"Before tool call for tool '{tool_name}' in agent '{agent_name}' with args: {args}")
+        self.log_sink.emit("info", "tool_start", agent=agent_name, tool=tool_name, args=args)
+        self.tracer.begin(("tool", getattr(tool_context, "function_call_id", None) or tool_name), f"tool: {tool_name}", "tool")
+        self._call_started[("tool", getattr(tool_context, "function_call_id", None) or tool_name)] = time.perf_counter()
         return None
     
     def after_tool_callback(self,tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Dict) -> Optional[Dict]:
         """Inspects/modifies tool args or skips the tool call."""
         agent_name = tool_context.agent_name
         tool_name = tool.name
-        response_str = str(tool_response)[:100] + "..." if len(str(tool_response)) > 100 else str(tool_response)
-        self._add_log("tool_complete", f"Tool '{tool_name}' completed with response: {response_str}", agent_name, {"tool": tool_name, "response": tool_response})
+        self.tracer.end(("tool", getattr(tool_context, "function_call_id", None) or tool_name))
+        started = self._call_started.pop(("tool", getattr(tool_context, "function_call_id", None) or tool_name), None)
+        if started is not None:
+            self.telemetry.record_tool_call(getattr(tool, "server_name", ""), tool_name, time.perf_counter() - started,
+                                            _tool_error(tool_response))
+        # Large responses go to the payload store once; the log only keeps the reference
+        response = self.payload_store.maybe_spill(tool_response)
+        if isinstance(response, PayloadRef):
+            response_str = f"{response.preview}... [{response.size} bytes, payload {response.digest[:12]}]"
+        else:
+            response_str = str(response)[:100] + "..." if len(str(response)) > 100 else str(response)
+        self._add_log("tool_complete", f"Tool '{tool_name}' completed with response: {response_str}", agent_name, {"tool": tool_name, "response": response})
 
-        print(f"Tool call completed for '{tool_name}' in agent '{agent_name}' with response: {tool_response}")
+        self.log_sink.emit("info", "tool_complete", agent=agent_name, tool=tool_name, response=response_str)
         return None
     
 
     def after_model_callback(self,callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
         """Inspects/modifies tool args or skips the tool call."""
         agent_name = callback_context.agent_name
+        model_span = ("model", callback_context.invocation_id)
+        if llm_response.partial:
+            if self.tracer.is_open(model_span) and not self.tracer.is_open(("first_token", callback_context.invocation_id)):
+                self.tracer.mark("first token", "model", agent=agent_name)
+                self.tracer.begin(("first_token", callback_context.invocation_id), "streaming", "model")
+        else:
+            self.tracer.end(("first_token", callback_context.invocation_id))
         
         # Safely get token usage
         token_usage = 0
+        cached_tokens = 0
         try:
-            print("LLM RESPONSE ::::::::::::::::",llm_response)
-            if hasattr(llm_response, 'token_usage') and llm_response.token_usage:
-                if hasattr(llm_response.token_usage, 'total_tokens'):
-                    token_usage = llm_response.token_usage.total_tokens
-                elif hasattr(llm_response.token_usage, 'total'):
-                    token_usage = llm_response.token_usage.total
-                else:
-                    token_usage = str(llm_response.token_usage)
+            usage = getattr(llm_response, 'usage_metadata', None)
+            parts = llm_response.content.parts if llm_response.content and llm_response.content.parts else []
+            tool_call = any(part.function_call for part in parts)
+            if usage and usage.total_token_count:
+                input_tokens = usage.prompt_token_count or 0
+                output_tokens = usage.candidates_token_count or 0
+                cached_tokens = usage.cached_content_token_count or 0
+                self.cache_stats.record(input_tokens, cached_tokens)
+                entry = self.usage.record(self.model_name, agent_name, _get_session_id(callback_context),
+                                          input_tokens, output_tokens, cached_tokens, tool_call)
+                token_usage = entry["total_tokens"]
+                self.telemetry.record_tokens(self.model_name, agent_name, input_tokens, output_tokens, cached_tokens)
+                self.telemetry.record("counter", "agentx.prompt_cache.requests", model=self.model_name)
+                if cached_tokens:
+                    self.telemetry.record("counter", "agentx.prompt_cache.hits", model=self.model_name)
+            elif not llm_response.partial:
+                # Provider reported nothing, fall back to a local tokenizer estimate
+                input_tokens = self._pending_input_tokens.get(callback_context.invocation_id, 0)
+                output_tokens = estimate_tokens("".join(part.text or "" for part in parts))
+                entry = self.usage.record(self.model_name, agent_name, _get_session_id(callback_context),
+                                          input_tokens, output_tokens, 0, tool_call, estimated=True)
+                token_usage = entry["total_tokens"]
         except Exception as e:
-            print(f"Could not get token usage: {e}")
+            self.log_sink.emit("warning", "token_usage_error", agent=agent_name, error=str(e))
             token_usage = "unknown"
         
         # Get response content preview
@@ -161,8 +252,15 @@ class Callback:
         except Exception as e:
             response_preview = "Could not extract response content"
         
-        self._add_log("model_response", f"Model response received (tokens: {token_usage}): {response_preview}", agent_name, {"tokens": token_usage})
-        print(f"After model call for agent '{agent_name}' with response: {llm_response}\n Token usage: {token_usage}")
+        self._add_log("model_response", f"Model response received (tokens: {token_usage}, cached: {cached_tokens}): {response_preview}", agent_name, {"tokens": token_usage, "cached_tokens": cached_tokens})
+        if not llm_response.partial:
+            self.tracer.end(model_span, tokens=token_usage, cached_tokens=cached_tokens)
+            started = self._call_started.pop(model_span, None)
+            if started is not None:
+                self.telemetry.record_model_call(self.model_name, agent_name, time.perf_counter() - started,
+                                                 getattr(llm_response, "error_message", None) or None)
+        self.log_sink.emit("debug" if llm_response.partial else "info", "model_response", agent=agent_name, model=self.model_name, tokens=token_usage,
+                           cached_tokens=cached_tokens, partial=bool(llm_response.partial), preview=response_preview)
         return None
     
 
@@ -172,5 +270,7 @@ class Callback:
         invocation_id = callback_context.invocation_id
         current_state = callback_context.state.to_dict()
 
+        self._pending_input_tokens.pop(invocation_id, None)
+        self._call_started.pop(("model", invocation_id), None)
         self._add_log("agent_response", f"\n[Callback] Exiting agent: {agent_name} (Inv: {invocation_id})")
         return None
\ No newline at end of file
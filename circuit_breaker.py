@@ -0,0 +1,94 @@
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+# Consecutive failed or timed-out calls that open a server's circuit
+BREAKER_FAILURES = int(os.environ.get("AGENTX_MCP_BREAKER_FAILURES", 5))
+# Seconds an open circuit fails calls at once before one probe is let through
+BREAKER_RESET = float(os.environ.get("AGENTX_MCP_BREAKER_RESET", 30))
+# Bounds of the latency-based tool call timeout, in seconds
+CALL_TIMEOUT_MIN = float(os.environ.get("AGENTX_MCP_CALL_TIMEOUT_MIN", 15))
+CALL_TIMEOUT_MAX = float(os.environ.get("AGENTX_MCP_CALL_TIMEOUT_MAX", 120))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a server whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Failure tracking and call timeouts for one MCP server.
+
+    - closed: calls go through; failure_threshold consecutive failures open the circuit
+    - open: calls fail at once with CircuitOpenError for reset_after seconds
+    - half_open: the next caller probes the server first; success closes the circuit,
+      failure opens it again, and other callers keep failing fast meanwhile
+
+    The call timeout of each tool follows that tool's observed latency the way TCP sets its
+    retransmission timeout: smoothed latency plus four times its mean deviation, doubled
+    after each consecutive timeout and kept within [min_timeout, max_timeout]. Tools are
+    tracked separately so a fast tool on the server does not shrink a slow tool's limit.
+    Before a tool has completed a call its timeout is max_timeout.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, reset_after: float = BREAKER_RESET,
+                 min_timeout: float = CALL_TIMEOUT_MIN, max_timeout: float = CALL_TIMEOUT_MAX):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        # Per tool: (smoothed latency, mean deviation) and consecutive timeouts
+        self.latency: Dict[str, Tuple[float, float]] = {}
+        self.timeouts: Dict[str, int] = {}
+
+    def timeout(self, tool: str) -> float:
+        if tool not in self.latency:
+            return self.max_timeout
+        latency, deviation = self.latency[tool]
+        timeout = max(latency + 4 * deviation, self.min_timeout) * 2 ** self.timeouts.get(tool, 0)
+        return min(timeout, self.max_timeout)
+
+    def before_call(self) -> bool:
+        """True when this caller must probe the server before calling; raises CircuitOpenError while open"""
+        if self.state == CLOSED:
+            return False
+        waited = time.monotonic() - self.opened_at
+        if self.state == OPEN and waited >= self.reset_after:
+            self.state = HALF_OPEN
+            return True
+        retry_in = max(self.reset_after - waited, 0)
+        raise CircuitOpenError(f"MCP server {self.name} is unavailable after {self.failures} failed calls; "
+                               f"retrying in {retry_in:.0f}s")
+
+    def record_success(self, tool: Optional[str] = None, latency: Optional[float] = None):
+        """Count a completed call of tool (or a probe, with no tool) and close the circuit"""
+        if tool is not None:
+            if latency is not None:
+                if tool not in self.latency:
+                    self.latency[tool] = (latency, latency / 2)
+                else:
+                    smoothed, deviation = self.latency[tool]
+                    self.latency[tool] = (0.875 * smoothed + 0.125 * latency,
+                                          0.75 * deviation + 0.25 * abs(latency - smoothed))
+            self.timeouts.pop(tool, None)
+        self.failures = 0
+        self.state = CLOSED
+
+    def record_failure(self, timed_out: bool = False, tool: Optional[str] = None) -> bool:
+        """Count a failed call or probe; True when it opened the circuit"""
+        self.failures += 1
+        if timed_out and tool is not None:
+            self.timeouts[tool] = self.timeouts.get(tool, 0) + 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            opened = self.state != OPEN
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            return opened
+        return False
@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+# Seconds between checks of mcp_config.json; 0 turns the background watcher off
+WATCH_INTERVAL = float(os.environ.get("AGENTX_MCP_WATCH_INTERVAL", 2))
+
+
+def diff_servers(old: Dict[str, dict], new: Dict[str, dict]) -> Dict[str, List[str]]:
+    """Compare two mcpServers sections by server name and config"""
+    return {
+        "added": [name for name in new if name not in old],
+        "changed": [name for name in new if name in old and new[name] != old[name]],
+        "removed": [name for name in old if name not in new],
+    }
+
+
+class ConfigWatcher:
+    """Polls an MCP config file and reports which servers were added, changed or removed.
+
+    on_change(config, changes) is called with the new config and the diff against the last
+    applied one; unchanged servers are never reported, so callers only touch what moved.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[dict, Dict[str, List[str]]], None],
+                 servers: Optional[Dict[str, dict]] = None, mtime: Optional[float] = None,
+                 interval: float = WATCH_INTERVAL):
+        self.path = path
+        self.on_change = on_change
+        self.servers = dict(servers or {})
+        self.mtime = mtime
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="agentx-config-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error reloading {self.path}: {e}")
+
+    def check(self, force: bool = False) -> Optional[Dict[str, List[str]]]:
+        """Apply the config if the file changed since the last check; returns the diff"""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return None
+            if mtime == self.mtime and not force:
+                return None
+            self.mtime = mtime
+            try:
+                with open(self.path, "r") as f:
+                    config = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                # Usually a half-written file; the next write changes the mtime again
+                print(f"Skipping reload of {self.path}: {e}")
+                return None
+
+            servers = config.get("mcpServers", {})
+            changes = diff_servers(self.servers, servers)
+            if any(changes.values()):
+                print(f"MCP config changed: {changes}")
+                self.on_change(config, changes)
+            self.servers = servers
+            return changes
@@ -1,24 +1,145 @@
+import time
+
+_process_start = time.perf_counter()
+
+import asyncio
+import importlib
+import os
+import threading
+
 import gradio as gr
-from agentbuilder import create_agent_builder_interface
-from agent_tester import create_agent_tester_interface
-from mcptester import create_mcp_tester_interface
+from metrics import CONTENT_TYPE, get_metrics_registry, monitor_event_loop_lag
+
+# Set AGENTX_METRICS=1 to serve the UI from a FastAPI app with /metrics next to it;
+# by default the UI starts with a plain demo.launch()
+METRICS_ENABLED = os.environ.get("AGENTX_METRICS", "0") == "1"
+SERVER_HOST = os.environ.get("GRADIO_SERVER_NAME", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("GRADIO_SERVER_PORT", 7860))
+
+# Fast start: import each tab's module (google.adk, LiteLLM, MCP SDK) and build its UI only
+# when the tab is first opened, instead of before the server starts
+FAST_START = os.environ.get("AGENTX_FAST_START", "0") == "1"
+
+# (tab title, module, interface factory)
+TABS = [
+    ("Agent Tester", "agent_tester", "create_agent_tester_interface"),
+    ("Agent Builder", "agentbuilder", "create_agent_builder_interface"),
+    ("MCP Tester", "mcptester", "create_mcp_tester_interface"),
+]
+
+# Factory arguments for tabs built lazily. Gradio fires load events only when the page first
+# mounts, so a tab rendered later has to do its on-load setup while it is being built
+LAZY_TAB_OPTIONS = {
+    "mcptester": {"initialize_now": True},
+}
+
+# Seconds spent on each startup step, reported once the UI is ready
+STARTUP_TIMES = {"import gradio": time.perf_counter() - _process_start}
+
+
+def timed_import(module_name: str):
+    """Import a module, recording how long it took the first time"""
+    key = f"import {module_name}"
+    if key not in STARTUP_TIMES:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        STARTUP_TIMES[key] = time.perf_counter() - start
+        print(f"[startup] {key}: {STARTUP_TIMES[key]:.2f}s")
+        return module
+    return importlib.import_module(module_name)
+
+
+def build_tab(module_name: str, factory: str, **options):
+    start = time.perf_counter()
+    interface = getattr(timed_import(module_name), factory)(**options)
+    STARTUP_TIMES[f"build {module_name}"] = time.perf_counter() - start - STARTUP_TIMES.get(f"import {module_name}", 0)
+    return interface
+
+
+def startup_report() -> str:
+    lines = [f"  {step:<28} {seconds:6.2f}s" for step, seconds in STARTUP_TIMES.items()]
+    lines.append(f"  {'ready after':<28} {time.perf_counter() - _process_start:6.2f}s")
+    return "Startup time" + (" (fast start)" if FAST_START else "") + ":\n" + "\n".join(lines)
+
+
+def start_mcp_supervisor():
+    """Prewarm the configured MCP servers and keep them running until exit"""
+    from mcp_supervisor import get_mcp_supervisor
+    get_mcp_supervisor().start()
+
+
+def add_lazy_tab(title: str, module_name: str, factory: str):
+    """A tab whose contents are imported and built the first time it is selected"""
+    with gr.TabItem(title) as tab:
+        opened = gr.State(False)
+
+        @gr.render(inputs=[opened])
+        def render_tab(is_open):
+            if is_open:
+                build_tab(module_name, factory, **LAZY_TAB_OPTIONS.get(module_name, {}))
+            else:
+                gr.Markdown(f"⏳ Loading {title}...")
+
+        tab.select(fn=lambda: True, outputs=[opened])
+    return opened
+
+
+def create_app(demo):
+    """Mount the Gradio UI into a FastAPI app that also exposes Prometheus metrics"""
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse
+
+    registry = get_metrics_registry()
+    app = FastAPI()
+
+    @app.on_event("startup")
+    async def start_lag_monitor():
+        app.state.lag_monitor = asyncio.create_task(monitor_event_loop_lag(registry))
+
+    @app.get("/metrics")
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+    return gr.mount_gradio_app(app, demo, path="/")
+
+
 def main():
+    if METRICS_ENABLED:
+        # Subscribe to telemetry before any agent or MCP client records into it
+        get_metrics_registry()
+
+    start = time.perf_counter()
     with gr.Blocks(title="Agent X") as demo:
         gr.Markdown("# Agent X \n\n A complete tool for building and testing agents")
-        
+
         with gr.Tabs() as tabs:
-            
-            
-            with gr.TabItem("Agent Tester"):
-                create_agent_tester_interface()
-
-            with gr.TabItem("Agent Builder"):
-                create_agent_builder_interface()
-            
-            with gr.TabItem("MCP Tester"):
-                create_mcp_tester_interface()
-    
-    demo.launch()
+            if FAST_START:
+                opened_states = [add_lazy_tab(title, module_name, factory) for title, module_name, factory in TABS]
+                # The first tab is visible on load, so build it as soon as the page connects
+                demo.load(fn=lambda: True, outputs=[opened_states[0]])
+            else:
+                for title, module_name, factory in TABS:
+                    with gr.TabItem(title):
+                        build_tab(module_name, factory)
+    STARTUP_TIMES["build layout"] = time.perf_counter() - start
+    print(startup_report())
+
+    if FAST_START:
+        # Warm the tab modules and MCP servers in the background while the server is already accepting requests
+        def prewarm():
+            for _, module_name, _ in TABS:
+                timed_import(module_name)
+            start_mcp_supervisor()
+        threading.Thread(target=prewarm, name="agentx-prewarm", daemon=True).start()
+    else:
+        start_mcp_supervisor()
+
+    if METRICS_ENABLED:
+        import uvicorn
+        print(f"Agent X running on http://{SERVER_HOST}:{SERVER_PORT} (metrics at /metrics)")
+        uvicorn.run(create_app(demo), host=SERVER_HOST, port=SERVER_PORT)
+    else:
+        demo.launch()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,251 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# Longest string kept for a single field; callbacks see whole tool responses and LLM payloads
+MAX_FIELD_CHARS = 2000
+
+
+def compact(value: Any, limit: int = MAX_FIELD_CHARS) -> Any:
+    """Make a value JSON-safe and bounded in size"""
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {str(k): compact(v, limit) for k, v in list(value.items())[:50]}
+    if isinstance(value, (list, tuple)):
+        return [compact(v, limit) for v in value[:50]]
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > limit:
+        return text[:limit] + f"... [{len(text) - limit} more chars]"
+    return text
+
+
+class RotatingJsonlWriter:
+    """Append JSON lines to a file, rotating it once it grows past max_bytes"""
+
+    def __init__(self, directory: str, prefix: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.path = os.path.join(directory, f"{prefix}.jsonl")
+        self._file = None
+        self._size = 0
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self._open()
+
+    def write(self, record: Dict[str, Any]):
+        if self._file is None:
+            self._open()
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        line_size = len(line.encode("utf-8"))
+        if self._size and self._size + line_size > self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+        self._size += line_size
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class SegmentedJsonlWriter:
+    """Write JSON lines into numbered segment files, starting a new segment by size or age.
+
+    Finished segments are optionally gzipped, so a long session exports as
+    prefix_0001.jsonl.gz, prefix_0002.jsonl.gz, ... plus the segment still being written.
+    """
+
+    def __init__(self, directory: str, prefix: str, max_bytes: int = 50 * 1024 * 1024,
+                 max_age_seconds: Optional[float] = None, compress: bool = False):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.compress = compress
+        self.segments = []
+        self.path = None
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{self.prefix}_{len(self.segments) + 1:04d}.jsonl")
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+        self._opened_at = time.monotonic()
+
+    def _finish_segment(self):
+        self._file.close()
+        self._file = None
+        path = self.path
+        if self.compress:
+            with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+                while True:
+                    chunk = src.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            os.remove(path)
+            path += ".gz"
+        self.segments.append(path)
+
+    def _should_rotate(self, line_size: int) -> bool:
+        if not self._size:
+            return False
+        if self._size + line_size > self.max_bytes:
+            return True
+        return bool(self.max_age_seconds) and time.monotonic() - self._opened_at > self.max_age_seconds
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        line_size = len(line.encode("utf-8"))
+        if self._file is not None and self._should_rotate(line_size):
+            self._finish_segment()
+        if self._file is None:
+            self._open()
+        self._file.write(line)
+        self._size += line_size
+
+    def files(self):
+        """Finished segments followed by the one currently open"""
+        return self.segments + ([self.path] if self._file is not None else [])
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._finish_segment()
+
+
+class LogSink:
+    """Non-blocking structured logger: callers enqueue, a background thread writes JSONL.
+
+    Records below `level` are dropped, records of a sampled event type are kept with
+    probability `sample_rates[event]` (or `sample_rate`), and warnings/errors are never sampled.
+    When the queue is full new records are dropped and counted instead of blocking the caller.
+    A record the writer fails on is dropped too; the first such failure is printed.
+    """
+
+    def __init__(self, writer: RotatingJsonlWriter, level: str = "info", sample_rate: float = 1.0,
+                 sample_rates: Optional[Dict[str, float]] = None, max_queue: int = 10000):
+        self.writer = writer
+        self.level = LEVELS.get(level, LEVELS["info"])
+        self.sample_rate = sample_rate
+        self.sample_rates = sample_rates or {}
+        self.dropped = 0
+        self.write_errors = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="agentx-log-sink", daemon=True)
+        self._thread.start()
+
+    def enabled(self, level: str) -> bool:
+        return LEVELS.get(level, 0) >= self.level
+
+    def emit(self, level: str, event: str, **fields):
+        """Queue a structured record; never blocks"""
+        if not self.enabled(level):
+            return
+        if LEVELS.get(level, 0) < LEVELS["warning"]:
+            rate = self.sample_rates.get(event, self.sample_rate)
+            if rate < 1.0 and random.random() >= rate:
+                return
+        record = {"ts": time.time(), "level": level, "event": event}
+        record.update({k: compact(v) for k, v in fields.items()})
+        self.submit(record)
+
+    def submit(self, record: Dict[str, Any]):
+        """Queue a ready-made record as-is, bypassing level filtering and sampling"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    self.writer.flush()
+                    return
+                self.writer.write(record)
+                if self._queue.empty():
+                    self.writer.flush()
+            except Exception as e:
+                if not self.write_errors:
+                    print(f"Log sink could not write to {getattr(self.writer, 'path', None) or 'its output'}: {e}; "
+                          f"further write failures are only counted")
+                self.write_errors += 1
+                self.dropped += 1
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until everything queued so far is on disk"""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self.writer.close()
+
+
+_log_sink = None
+_log_sink_lock = threading.Lock()
+
+
+def get_log_sink() -> LogSink:
+    """Process-wide sink configured from AGENTX_LOG_* environment variables"""
+    global _log_sink
+    if _log_sink is None:
+        with _log_sink_lock:
+            if _log_sink is None:
+                sample_rates = {}
+                for item in os.environ.get("AGENTX_LOG_SAMPLE_EVENTS", "").split(","):
+                    if "=" in item:
+                        event, rate = item.split("=", 1)
+                        sample_rates[event.strip()] = float(rate)
+                writer = RotatingJsonlWriter(
+                    os.environ.get("AGENTX_LOG_DIR", "logs"),
+                    "agentx",
+                    max_bytes=int(os.environ.get("AGENTX_LOG_MAX_BYTES", 10 * 1024 * 1024)),
+                    backup_count=int(os.environ.get("AGENTX_LOG_BACKUPS", 5)),
+                )
+                _log_sink = LogSink(
+                    writer,
+                    level=os.environ.get("AGENTX_LOG_LEVEL", "info").lower(),
+                    sample_rate=float(os.environ.get("AGENTX_LOG_SAMPLE", 1.0)),
+                    sample_rates=sample_rates,
+                )
+                atexit.register(_log_sink.close)
+    return _log_sink
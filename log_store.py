@@ -0,0 +1,186 @@
+import bisect
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _intersect(lists: List[List[int]]) -> List[int]:
+    """Intersect sorted position lists, smallest first"""
+    lists = sorted(lists, key=len)
+    result = lists[0]
+    for other in lists[1:]:
+        other_set = set(other)
+        result = [pos for pos in result if pos in other_set]
+        if not result:
+            break
+    return result
+
+
+def _union(lists: Iterable[List[int]]) -> List[int]:
+    lists = list(lists)
+    if len(lists) == 1:
+        return lists[0]
+    merged = set()
+    for positions in lists:
+        merged.update(positions)
+    return sorted(merged)
+
+
+class LogRecord:
+    """Compact callback log entry.
+
+    Slots instead of a per-entry dict, interned type/level/agent strings, wall and monotonic
+    timestamps as floats (the display string is derived on demand) and a data dict whose
+    large values have already been replaced by PayloadRefs.
+    """
+
+    __slots__ = ("ts", "mono", "type", "level", "agent", "message", "data")
+
+    def __init__(self, log_type: str, message: str, agent: str = "", data: Optional[Dict[str, Any]] = None,
+                 level: str = "info"):
+        self.ts = time.time()
+        self.mono = time.monotonic()
+        self.type = sys.intern(log_type)
+        self.level = sys.intern(level)
+        self.agent = sys.intern(agent or "")
+        self.message = message
+        self.data = data or {}
+
+    @property
+    def timestamp(self) -> str:
+        return time.strftime("%H:%M:%S", time.localtime(self.ts))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access so records work wherever log dicts were used"""
+        if key == "timestamp":
+            return self.timestamp
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "ts": self.ts,
+            "type": self.type,
+            "level": self.level,
+            "agent": self.agent,
+            "message": self.message,
+            "data": {k: v.to_dict() if hasattr(v, "to_dict") else v for k, v in self.data.items()},
+        }
+
+
+def formatLog(log: LogRecord) -> str:
+    """Format a log entry as a single display line"""
+    timestamp = log.get("timestamp", "")
+    log_type = log.get("type", "").upper()
+    agent = log.get("agent", "")
+    message = log.get("message", "")
+    if agent:
+        return f"[{timestamp}] {log_type} | {agent} | {message}"
+    return f"[{timestamp}] {log_type} | {message}"
+
+
+class LogStore:
+    """Append-only log entries with indexes by type, level, agent, tool, time and words.
+
+    Each index maps a key to the ascending positions of matching entries, so filters are
+    list intersections instead of scans over every entry, and results come back paginated.
+    """
+
+    def __init__(self):
+        self.entries: List[LogRecord] = []
+        self._times: List[float] = []
+        self._by_type = defaultdict(list)
+        self._by_level = defaultdict(list)
+        self._by_agent = defaultdict(list)
+        self._by_tool = defaultdict(list)
+        self._by_word = defaultdict(list)
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, entry: LogRecord):
+        pos = len(self.entries)
+        self.entries.append(entry)
+        self._times.append(entry.ts)
+        self._by_type[entry.type].append(pos)
+        self._by_level[entry.level].append(pos)
+        self._by_agent[entry.agent].append(pos)
+        tool = entry.data.get("tool")
+        if tool:
+            self._by_tool[tool].append(pos)
+        for word in set(_tokenize(entry.message)):
+            if word not in self._by_word:
+                self._vocabulary_dirty = True
+            self._by_word[word].append(pos)
+
+    def clear(self):
+        self.__init__()
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Number of entries per type, level or agent"""
+        index = {"type": self._by_type, "level": self._by_level, "agent": self._by_agent}[field]
+        return {key: len(positions) for key, positions in index.items()}
+
+    def types(self) -> List[str]:
+        return sorted(self._by_type)
+
+    def agents(self) -> List[str]:
+        return sorted(a for a in self._by_agent if a)
+
+    def tools(self) -> List[str]:
+        return sorted(self._by_tool)
+
+    def _word_positions(self, term: str) -> List[int]:
+        """Positions of entries containing a word that starts with term"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._by_word)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, term)
+        matches = []
+        for word in self._vocabulary[start:]:
+            if not word.startswith(term):
+                break
+            matches.append(self._by_word[word])
+        return _union(matches)
+
+    def query(self, types: Optional[List[str]] = None, levels: Optional[List[str]] = None,
+              agents: Optional[List[str]] = None, tools: Optional[List[str]] = None,
+              since: Optional[float] = None, until: Optional[float] = None, search: str = "",
+              offset: int = 0, limit: int = 100, newest_first: bool = True) -> Tuple[int, List[LogRecord]]:
+        """Filter entries and return (total_matches, page_of_entries)"""
+        candidates = []
+        for index, keys in ((self._by_type, types), (self._by_level, levels),
+                            (self._by_agent, agents), (self._by_tool, tools)):
+            if keys:
+                candidates.append(_union(index.get(key, []) for key in keys))
+        for term in _tokenize(search or ""):
+            candidates.append(self._word_positions(term))
+
+        lo = bisect.bisect_left(self._times, since) if since is not None else 0
+        hi = bisect.bisect_right(self._times, until) if until is not None else len(self.entries)
+
+        if candidates:
+            positions = _intersect(candidates)
+            positions = positions[bisect.bisect_left(positions, lo):bisect.bisect_left(positions, hi)]
+        else:
+            positions = range(lo, hi)
+
+        total = len(positions)
+        if newest_first:
+            end = total - offset
+            page = positions[max(0, end - limit):max(0, end)]
+            page = list(page)[::-1]
+        else:
+            page = positions[offset:offset + limit]
+        return total, [self.entries[pos] for pos in page]
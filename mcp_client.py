@@ -2,13 +2,27 @@ from mcp.client.stdio import stdio_client
 from mcp.types import Tool as MCPTool
 from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters,Tool,CallToolRequest
-from typing import Any, List
+from mcp import types
+from typing import Any, Callable, Dict, List, Optional
 import asyncio
+import atexit
+import httpx
 import logging
 import shutil
 import json
 import os
+import threading
 from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+
+import time
+
+from circuit_breaker import CircuitBreaker
+from mcp_launcher import wrap_command
+from profiling import profiled
+from telemetry import get_telemetry
+from tracing import get_tracer
 
 
 
@@ -17,18 +31,478 @@ logging.basicConfig(
     level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+STDIO_COMMANDS = ["npx", "uvx", "uv", "python3"]
+# Seconds to wait for a server to start and finish the MCP handshake
+MCP_CONNECT_TIMEOUT = float(os.environ.get("AGENTX_MCP_CONNECT_TIMEOUT", 60))
+# Idle sessions are pinged this often (seconds) so dead or hung servers are noticed
+MCP_HEALTH_INTERVAL = float(os.environ.get("AGENTX_MCP_HEALTH_INTERVAL", 30))
+MCP_PING_TIMEOUT = float(os.environ.get("AGENTX_MCP_PING_TIMEOUT", 10))
+# Calls in flight per server across all agents; a server's "max_concurrency" config overrides it
+MCP_SERVER_CONCURRENCY = int(os.environ.get("AGENTX_MCP_SERVER_CONCURRENCY", 8))
+
+# Tool calls in flight across all clients, exported as a gauge
+_active_calls = 0
+get_telemetry().register_gauge("agentx.mcp.active_calls", lambda: _active_calls)
+
 class MCPServer:
     def __init__(self, name: str, config: dict[str, Any]) -> None:
         self.name = name
         self.config = config
 
 
-class MCPCLient:
+class SessionExpiredError(ConnectionError):
+    """A streamable HTTP server (or the replica a load balancer picked) no longer knows our session"""
+
+
+def root_error(error: BaseException) -> BaseException:
+    """First underlying error, unwrapping anyio task group exception groups"""
+    while getattr(error, "exceptions", None):
+        error = error.exceptions[0]
+    return error
+
+
+def error_text(error: BaseException) -> str:
+    error = root_error(error)
+    return str(error) or type(error).__name__
+
+
+def session_expired(error: BaseException) -> bool:
+    return isinstance(error, SessionExpiredError) or (
+        isinstance(error, McpError) and error.error.message == "Session terminated")
+
+
+def tool_to_dict(tool: MCPTool) -> dict:
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "input_schema": tool.inputSchema
+    }
+
+
+async def open_transport(stack: AsyncExitStack, config: dict[str, Any]):
+    """Enter the transport for a server config on the stack; returns (read, write) streams,
+    followed by a session id getter for streamable HTTP servers"""
+    command = config["command"]
+    if command == "remote":
+        # "transport": "streamable_http" selects the newer single-endpoint HTTP transport;
+        # the default stays the legacy SSE transport existing remote servers use
+        if config.get("transport") == "streamable_http":
+            return await stack.enter_async_context(
+                streamablehttp_client(config["end_point"], headers=config.get("headers")))
+        return await stack.enter_async_context(sse_client(config["end_point"], headers=config.get("headers")))
+    if command in STDIO_COMMANDS:
+        # Resource limits, when configured, are applied by a launcher that execs the server
+        command, args = wrap_command(command, config.get("args", []), config)
+        server_params = StdioServerParameters(command=command, args=args, env=config.get("env"))
+        return await stack.enter_async_context(stdio_client(server_params))
+    raise ValueError(f"Unsupported server command: {command}")
+
+
+class MCPSession:
+    """A long-lived connection to one server.
+
+    The transport and ClientSession are entered and exited inside a single task on the
+    pool's event loop, as the MCP SDK's anyio contexts require. While open, the session
+    pings the server every MCP_HEALTH_INTERVAL seconds (or right away after a failed call);
+    a failed ping closes it as crashed and on_closed(session) is called.
+    """
+
+    def __init__(self, server: MCPServer, on_notification: Callable[[str, Any], None],
+                 on_closed: Optional[Callable[["MCPSession"], None]] = None):
+        self.name = server.name
+        self.config = server.config
+        self.started = time.time()
+        self.session: Optional[ClientSession] = None
+        self._get_session_id: Optional[Callable[[], Optional[str]]] = None
+        self.error = None
+        self.crashed = False
+        self._on_notification = on_notification
+        self._on_closed = on_closed
+        self._ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=f"mcp-session-{self.name}")
+
+    @property
+    def session_id(self) -> Optional[str]:
+        """Mcp-Session-Id a streamable HTTP server assigned to this connection"""
+        return self._get_session_id() if self._get_session_id else None
+
+    @property
+    def closed(self) -> bool:
+        return self._task.done() or self._stop.is_set()
+
+    async def wait_ready(self, timeout: float = MCP_CONNECT_TIMEOUT) -> ClientSession:
+        try:
+            # Shielded so one caller timing out does not fail the others waiting on the same start
+            return await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+        except asyncio.TimeoutError:
+            await self.stop()
+            raise TimeoutError(f"MCP server {self.name} did not start within {timeout:.0f}s")
+
+    async def _run(self):
+        try:
+            async with AsyncExitStack() as stack:
+                streams = await open_transport(stack, self.config)
+                read, write = streams[:2]
+                if len(streams) > 2:
+                    self._get_session_id = streams[2]
+                self.session = await stack.enter_async_context(
+                    ClientSession(read, write, message_handler=self._handle_message))
+                await self.session.initialize()
+                self._ready.set_result(self.session)
+                await self._watch()
+        except Exception as e:
+            self.error = e
+            if self._ready.done():
+                self.crashed = not self._stop.is_set()
+                print(f"MCP session {self.name} closed: {error_text(e)}")
+            else:
+                self._ready.set_exception(e)
+        finally:
+            self.session = None
+            self._stop.set()
+            if self.crashed and self._on_closed:
+                self._on_closed(self)
+
+    async def _watch(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), MCP_HEALTH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            if self._stop.is_set():
+                return
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self.session.send_ping(), MCP_PING_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"no ping response within {MCP_PING_TIMEOUT:.0f}s")
+
+    async def request(self, coro):
+        """Await a request on this session, failing it at once if the connection closes meanwhile"""
+        request = asyncio.ensure_future(coro)
+        try:
+            await asyncio.wait({request, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            request.cancel()
+            raise
+        if request.done():
+            return request.result()
+        request.cancel()
+        error = root_error(self.error) if self.error else None
+        # Servers answer 404 (400 in older SDKs) for a session id they do not know; the request never ran
+        if self.session_id and isinstance(error, httpx.HTTPStatusError) and error.response.status_code in (400, 404):
+            raise SessionExpiredError(f"MCP server {self.name} expired session {self.session_id}")
+        raise ConnectionError(f"Connection to MCP server {self.name} closed: {error_text(error) if error else 'stopped'}")
+
+    def check_health(self):
+        """Ping the server now instead of at the next interval, e.g. after a call failed"""
+        self._wake.set()
+
+    async def _handle_message(self, message):
+        if isinstance(message, types.ServerNotification):
+            self._on_notification(self.name, message.root)
+
+    async def stop(self, timeout: float = 5):
+        self._stop.set()
+        self._wake.set()
+        _, pending = await asyncio.wait({self._task}, timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+
+class MCPSessionPool:
+    """Persistent sessions, one per server, on a dedicated event-loop thread.
+
+    Clients on any thread or event loop share them; concurrent calls are multiplexed over
+    each server's single connection, at most MCP_SERVER_CONCURRENCY at a time. Every server
+    has a circuit breaker: calls time out after a latency-based limit (or the server's
+    "call_timeout"), and a server that keeps failing is failed fast until a ping succeeds.
+    A session is restarted when its server's config changes or the connection has closed.
+    Servers that send notifications/tools/list_changed have their tools_changed listeners
+    called with the server name; crash listeners are called with the server name when an
+    open session dies.
+    """
 
     def __init__(self):
-        """Initialize the MCP client"""
+        self.sessions: Dict[str, MCPSession] = {}
+        self.tools_changed_listeners: List[Callable] = []
+        self.crash_listeners: List[Callable] = []
+        self.in_flight = 0
+        self.draining = False
+        self._limits: Dict[str, tuple] = {}
+        self._breakers: Dict[str, tuple] = {}
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.close_all)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="agentx-mcp-sessions", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _run(self, coro):
+        """Run a coroutine on the pool's loop and await it from the caller's loop"""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def add_tools_changed_listener(self, listener: Callable):
+        """listener(server_name) may be a coroutine function; it runs on the pool's loop"""
+        self.tools_changed_listeners.append(listener)
+
+    def add_crash_listener(self, listener: Callable):
+        """listener(server_name, uptime_seconds) may be a coroutine function; it runs on the pool's loop"""
+        self.crash_listeners.append(listener)
+
+    def live_sessions(self) -> int:
+        return sum(1 for session in list(self.sessions.values()) if not session.closed)
+
+    def is_connected(self, server: MCPServer) -> bool:
+        session = self.sessions.get(server.name)
+        return session is not None and session.session is not None and not session.closed and session.config == server.config
+
+    async def connect(self, server: MCPServer) -> ClientSession:
+        return await self._run(self._get(server))
+
+    async def list_tools(self, server: MCPServer) -> List[dict]:
+        async def list_on_loop(resume: bool = True):
+            breaker = self.breaker(server)
+            session = await self._admit(server, breaker)
+            try:
+                response = await asyncio.wait_for(self._request(server, session.list_tools()), breaker.max_timeout)
+            except asyncio.TimeoutError:
+                self._failed(server, breaker, timed_out=True)
+                raise TimeoutError(f"MCP server {server.name} did not list its tools within {breaker.max_timeout:.0f}s")
+            except Exception as e:
+                if resume and session_expired(e):
+                    await self._renew(server, session)
+                    return await list_on_loop(resume=False)
+                self._failed(server, breaker)
+                raise
+            return [tool_to_dict(tool) for tool in response.tools]
+        return await self._run(list_on_loop())
+
+    async def call_tool(self, server: MCPServer, tool_name: str, input_data: dict[str, Any], progress_callback=None):
+        if progress_callback:
+            progress_callback = self._relay(progress_callback)
+
+        async def call_on_loop(resume: bool = True):
+            breaker = self.breaker(server)
+            session = await self._admit(server, breaker)
+            call_kwargs = {"progress_callback": progress_callback} if progress_callback else {}
+            timeout = float(server.config.get("call_timeout") or breaker.timeout(tool_name))
+            self.in_flight += 1
+            try:
+                async with self._limit(server):
+                    started = time.monotonic()
+                    result = await asyncio.wait_for(
+                        self._request(server, session.call_tool(tool_name, input_data, **call_kwargs)), timeout)
+                # Tool errors come back as results and still show the server is responding
+                breaker.record_success(tool_name, time.monotonic() - started)
+                return result
+            except asyncio.TimeoutError:
+                self._failed(server, breaker, timed_out=True, tool=tool_name)
+                raise TimeoutError(f"MCP tool {tool_name} on server {server.name} did not respond within {timeout:.1f}s")
+            except Exception as e:
+                if resume and session_expired(e):
+                    # The server rejected the call without running it, so it is safe to send again
+                    await self._renew(server, session)
+                    return await call_on_loop(resume=False)
+                self._failed(server, breaker)
+                raise
+            finally:
+                self.in_flight -= 1
+        return await self._run(call_on_loop())
+
+    def breaker(self, server: MCPServer) -> CircuitBreaker:
+        """The server's circuit breaker; a changed config starts with a fresh one"""
+        current = self._breakers.get(server.name)
+        if current is None or current[0] != server.config:
+            current = self._breakers[server.name] = (server.config, CircuitBreaker(server.name))
+        return current[1]
+
+    async def _admit(self, server: MCPServer, breaker: CircuitBreaker) -> ClientSession:
+        """Session for a call, failing fast while the circuit is open and pinging the server to close it"""
+        probe = breaker.before_call()
+        try:
+            if self.is_connected(server):
+                session = await self._get(server)
+            else:
+                with get_tracer().span(f"mcp connect: {server.name}", "mcp", command=server.config.get("command")):
+                    session = await self._get(server)
+            if probe:
+                await asyncio.wait_for(session.send_ping(), MCP_PING_TIMEOUT)
+                breaker.record_success()
+                print(f"Circuit closed for MCP server {server.name}")
+            return session
+        except asyncio.CancelledError:
+            # An abandoned probe must not leave the circuit half open
+            if probe:
+                self._failed(server, breaker)
+            raise
+        except Exception as e:
+            self._failed(server, breaker, timed_out=isinstance(e, asyncio.TimeoutError))
+            raise
+
+    def _failed(self, server: MCPServer, breaker: CircuitBreaker, timed_out: bool = False, tool: Optional[str] = None):
+        if breaker.record_failure(timed_out, tool):
+            print(f"Circuit opened for MCP server {server.name} after {breaker.failures} failures")
+            get_telemetry().record("counter", "agentx.mcp.circuit_opened", server=server.name)
+        # An exception may mean the server died or hung; check now instead of at the next ping
+        current = self.sessions.get(server.name)
+        if current is not None:
+            current.check_health()
+
+    def _limit(self, server: MCPServer) -> asyncio.Semaphore:
+        limit = int(server.config.get("max_concurrency", MCP_SERVER_CONCURRENCY))
+        current = self._limits.get(server.name)
+        if current is None or current[0] != limit:
+            current = self._limits[server.name] = (limit, asyncio.Semaphore(limit))
+        return current[1]
+
+    async def _request(self, server: MCPServer, coro):
+        connection = self.sessions.get(server.name)
+        return await (connection.request(coro) if connection is not None else coro)
+
+    async def _renew(self, server: MCPServer, expired: ClientSession):
+        """Replace a session the server has expired, e.g. after it restarted or a load balancer
+        moved us to a replica without it; the next _get opens and initializes a new one"""
+        current = self.sessions.get(server.name)
+        # Concurrent calls on the expired session must not stop the one that replaced it
+        if current is not None and current.session is expired:
+            del self.sessions[server.name]
+            await current.stop()
+        print(f"MCP server {server.name} expired our session; starting a new one")
+
+    async def close(self, server_name: str):
+        async def close_on_loop():
+            self._breakers.pop(server_name, None)
+            session = self.sessions.pop(server_name, None)
+            if session is not None:
+                await session.stop()
+        if self._loop is not None:
+            await self._run(close_on_loop())
+
+    async def aclose(self):
+        """Stop every session"""
+        if self._loop is not None and self.sessions:
+            await self._run(self._close_sessions())
+
+    def close_all(self, timeout: float = 10):
+        """Stop every session; safe to call from any thread that is not the pool's loop"""
+        if self._loop is None or not self.sessions:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_sessions(), self._loop).result(timeout)
+        except Exception as e:
+            print(f"Error closing MCP sessions: {e}")
+
+    def shutdown(self, timeout: float = 10):
+        """Stop every session, then the pool's loop and thread; for pools that are not process-wide,
+        such as a temporary pool for testing a server. Not to be called from the pool's loop"""
+        self.close_all(timeout)
+        atexit.unregister(self.close_all)
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+
+    def drain(self, timeout: float = 10):
+        """Refuse new calls, give calls in flight up to timeout seconds to finish, then stop every session"""
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self.in_flight:
+            print(f"Stopping MCP sessions with {self.in_flight} calls still running")
+        self.close_all(max(deadline - time.monotonic(), 1))
+
+    async def _close_sessions(self):
+        sessions, self.sessions = list(self.sessions.values()), {}
+        await asyncio.gather(*(session.stop() for session in sessions), return_exceptions=True)
+
+    async def _get(self, server: MCPServer) -> ClientSession:
+        if self.draining:
+            raise RuntimeError("MCP sessions are shutting down")
+        session = self.sessions.get(server.name)
+        if session is not None and (session.closed or session.config != server.config):
+            self.sessions.pop(server.name, None)
+            await session.stop()
+            session = None
+        if session is None:
+            session = self.sessions[server.name] = MCPSession(server, self._on_notification, self._on_crash)
+        try:
+            return await session.wait_ready()
+        except Exception:
+            if self.sessions.get(server.name) is session:
+                del self.sessions[server.name]
+            raise
+
+    def _on_notification(self, server_name: str, notification):
+        if isinstance(notification, types.ToolListChangedNotification):
+            print(f"MCP server {server_name} changed its tool list")
+            self._notify(self.tools_changed_listeners, server_name)
+
+    def _on_crash(self, session: MCPSession):
+        if self.sessions.get(session.name) is session:
+            del self.sessions[session.name]
+        if not self.draining:
+            self._notify(self.crash_listeners, session.name, time.time() - session.started)
+
+    def _notify(self, listeners: List[Callable], *args):
+        for listener in listeners:
+            result = listener(*args)
+            if asyncio.iscoroutine(result):
+                # Not awaited here: the listener may call back into the session whose
+                # receive loop or task is reporting the event
+                asyncio.create_task(result)
+
+    def _relay(self, progress_callback):
+        """Deliver progress notifications on the caller's event loop"""
+        caller_loop = asyncio.get_running_loop()
+
+        async def relay(progress, total, message):
+            asyncio.run_coroutine_threadsafe(progress_callback(progress, total, message), caller_loop)
+        return relay
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> MCPSessionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MCPSessionPool()
+            get_telemetry().register_gauge("agentx.mcp.sessions", _pool.live_sessions)
+        return _pool
+
+
+class MCPCLient:
+
+    def __init__(self, pool: Optional[MCPSessionPool] = None):
+        """Initialize the MCP client; sessions come from the shared pool unless one is given"""
         self.servers = []
         self.config = {}
+        self.tracer = get_tracer()
+        self.telemetry = get_telemetry()
+        self.pool = pool or get_session_pool()
 
     def load_servers(self, config_path: str) -> None:
         """Load server configuration from a JSON file (typically mcp_config.json)
@@ -53,87 +527,59 @@ class MCPCLient:
 
         return tools
 
+    @profiled("mcp_load_all_tools")
     async def load_all_tools(self):
         mcp_tools = {}
         for server in self.servers:
             print(f"Loading tools for server: {server.name}")
             all_tools = []
             command = server.config["command"]
-            if "args" in server.config:
-                args = server.config["args"]
-            else:
-                args = []
-
-            if "env" in server.config:
-                env = server.config["env"]
-            else:
-                env = None
-
-            if command == "remote":
-                tools_sse = await self.load_tools_sse(server.config["end_point"])
-                all_tools=tools_sse
-            elif command in ["npx", "uvx","uv","python3"]:
-                server_params = StdioServerParameters(
-                    command=command,
-                    args=args,
-                    env=env
-                )
-                async with AsyncExitStack() as exit_stack:
-                    stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
-                    stdio, write = stdio_transport
-                    session = await exit_stack.enter_async_context(ClientSession(stdio, write))
-                    await session.initialize()
-                    # List available tools
-                    response = await session.list_tools()
-                    available_tools = [{
-                        "name": tool.name,
-                        "description": tool.description,
-                        "input_schema": tool.inputSchema
-                    } for tool in response.tools]
-                    all_tools = available_tools
+            # Listing starts the server's persistent session, which later tool calls reuse
+            if command == "remote" or command in STDIO_COMMANDS:
+                all_tools = await self.pool.list_tools(server)
 
             mcp_tools[server.name] = all_tools
 
         return mcp_tools
 
-    async def call_tool(self, server_name: str, tool_name: str, input_data: dict[str, Any]) -> Any:
-
+    @profiled("mcp_call_tool")
+    async def call_tool(self, server_name: str, tool_name: str, input_data: dict[str, Any], progress_callback=None) -> Any:
+        """Call a tool; progress_callback(progress, total, message) receives the server's progress notifications"""
+        global _active_calls
+        _active_calls += 1
+        started = time.perf_counter()
+        error = None
+        try:
+            result = await self._call_tool(server_name, tool_name, input_data, progress_callback)
+            if getattr(result, "isError", False):
+                error = "tool returned an error"
+            return result
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            _active_calls -= 1
+            self.telemetry.record_tool_call(server_name, tool_name, time.perf_counter() - started, error)
+
+    async def _call_tool(self, server_name: str, tool_name: str, input_data: dict[str, Any], progress_callback=None) -> Any:
         server = next((s for s in self.servers if s.name == server_name), None)
         if not server:
             raise ValueError(f"Server {server_name} not found")
 
         command = server.config["command"]
-        if command == "remote":
-            async with sse_client(server.config["end_point"]) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    await session.send_ping()
-                    result =  await session.call_tool(tool_name, input_data)
-                    return result
-
-
-
-        elif command in ["npx", "uvx","uv","python3"]:
-            server_params = StdioServerParameters(
-                command=command,
-                args=server.config.get("args", []),
-                env=server.config.get("env")
-            )
-            async with AsyncExitStack() as exit_stack:
-                stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
-                stdio, write = stdio_transport
-                session = await exit_stack.enter_async_context(ClientSession(stdio, write))
-                await session.initialize()
-                result =  await session.call_tool(tool_name, input_data)
-                return result
-
+        if command != "remote" and command not in STDIO_COMMANDS:
+            raise ValueError(f"Unsupported server command: {command}")
 
+        # The pool starts the server on the first call, behind its circuit breaker, and reuses the session
+        with self.tracer.span(f"mcp call: {tool_name}", "mcp", server=server_name):
+            return await self.pool.call_tool(server, tool_name, input_data, progress_callback)
 
-        else:
-            raise ValueError(f"Unsupported server command: {command}")
 
+    async def load_tools_sse(self, url, timeout: float = MCP_CONNECT_TIMEOUT):
+        # Bounded so an endpoint that accepts the connection but never answers cannot hang the caller
+        return await asyncio.wait_for(self._load_tools_sse(url), timeout)
 
-    async def load_tools_sse(self, url):
+    async def _load_tools_sse(self, url):
         async with sse_client(url=url) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
@@ -0,0 +1,68 @@
+"""Start an MCP server under resource limits.
+
+    python mcp_launcher.py --memory-mb 1024 --cpu-seconds 600 -- npx -y some-mcp-server
+
+Sets the limits on its own process and then execs the server, so the server inherits
+them without an extra process in between. Kept to the standard library so the wrapper
+adds almost nothing to server start time.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LAUNCHER_PATH = os.path.abspath(__file__)
+
+# Defaults for every stdio server; a server's "limits" entry in mcp_config.json overrides them
+DEFAULT_MEMORY_MB = int(os.environ.get("AGENTX_MCP_MAX_MEMORY_MB", 0))
+DEFAULT_CPU_SECONDS = int(os.environ.get("AGENTX_MCP_MAX_CPU_SECONDS", 0))
+
+
+def server_limits(config: dict) -> dict:
+    limits = config.get("limits") or {}
+    return {
+        "memory_mb": int(limits.get("memory_mb", DEFAULT_MEMORY_MB) or 0),
+        "cpu_seconds": int(limits.get("cpu_seconds", DEFAULT_CPU_SECONDS) or 0),
+    }
+
+
+def wrap_command(command: str, args: List[str], config: dict) -> Tuple[str, List[str]]:
+    """Run the server through this launcher when the config or environment sets limits"""
+    limits = server_limits(config)
+    if resource is None or not any(limits.values()):
+        return command, args
+    return sys.executable, [LAUNCHER_PATH, "--memory-mb", str(limits["memory_mb"]),
+                            "--cpu-seconds", str(limits["cpu_seconds"]), "--", command, *args]
+
+
+def apply_limits(memory_mb: int = 0, cpu_seconds: int = 0):
+    if memory_mb:
+        # Address space, not RSS: runtimes that reserve large virtual ranges (Node) need headroom
+        memory = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    if cpu_seconds:
+        # SIGXCPU at the soft limit, SIGKILL shortly after
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 5))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memory-mb", type=int, default=0)
+    parser.add_argument("--cpu-seconds", type=int, default=0)
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    options = parser.parse_args(argv)
+    command = options.command[1:] if options.command[:1] == ["--"] else options.command
+    if not command:
+        parser.error("no server command given")
+    if resource is not None:
+        apply_limits(options.memory_mb, options.cpu_seconds)
+    os.execvp(command[0], command)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp_client import MCPCLient
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    # pct * n before dividing, so exact ranks such as p7 of 100 samples are not pushed up by float error
+    rank = max(math.ceil(pct * len(sorted_values) / 100) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class ResourceMonitor:
+    """Samples the MCP server processes started by this process while a load test runs.
+
+    Stdio servers are child processes, so their CPU time shows up in RUSAGE_CHILDREN once they
+    exit; with psutil installed live children are also sampled for peak RSS and process count.
+    Remote (SSE) servers run elsewhere and cannot be measured from here.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_processes = 0
+        self.cpu_samples: List[float] = []
+        self._task = None
+        self._start_usage = None
+        self._end_usage = None
+
+    async def _sample(self):
+        me = psutil.Process(os.getpid())
+        while True:
+            rss = 0
+            cpu = 0.0
+            children = me.children(recursive=True)
+            for child in children:
+                try:
+                    rss += child.memory_info().rss
+                    cpu += child.cpu_percent(interval=None)
+                except psutil.Error:
+                    continue
+            self.peak_rss = max(self.peak_rss, rss)
+            self.peak_processes = max(self.peak_processes, len(children))
+            self.cpu_samples.append(cpu)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._start_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        if psutil is not None:
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._end_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    def summary(self) -> Dict[str, Any]:
+        start, end = self._start_usage, self._end_usage
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        maxrss_scale = 1 if sys.platform == "darwin" else 1024
+        stats = {
+            "children_cpu_user_s": round(end.ru_utime - start.ru_utime, 3),
+            "children_cpu_system_s": round(end.ru_stime - start.ru_stime, 3),
+            "children_max_rss_bytes": end.ru_maxrss * maxrss_scale,
+        }
+        if psutil is not None:
+            stats["peak_live_rss_bytes"] = self.peak_rss
+            stats["peak_live_processes"] = self.peak_processes
+            stats["avg_live_cpu_percent"] = round(sum(self.cpu_samples) / len(self.cpu_samples), 1) if self.cpu_samples else 0.0
+        return stats
+
+
+class LoadTester:
+    """Run one MCP tool repeatedly at a fixed concurrency, optionally capped to a request rate.
+
+    Each call goes through MCPCLient.call_tool, so it measures what an agent or the MCP Tester
+    would see: calls share the server's persistent session, so latencies are warm-session
+    numbers (only a call that finds no open session pays for starting one), and concurrency
+    above the server's max_concurrency queues in the session pool.
+    """
+
+    def __init__(self, client: MCPCLient, server_name: str, tool_name: str, parameters: Dict[str, Any],
+                 concurrency: int = 4, rps: Optional[float] = None, duration: float = 10.0, timeout: float = 60.0):
+        self.client = client
+        self.server_name = server_name
+        self.tool_name = tool_name
+        self.parameters = parameters
+        self.concurrency = max(int(concurrency), 1)
+        self.rps = rps if rps and rps > 0 else None
+        self.duration = duration
+        self.timeout = timeout
+        self.latencies: List[float] = []
+        self.errors = Counter()
+        self.started = 0
+        self._next_index = 0
+
+    async def _call_once(self):
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                self.client.call_tool(self.server_name, self.tool_name, self.parameters),
+                timeout=self.timeout
+            )
+            if getattr(result, "isError", False):
+                self.errors["tool_error"] += 1
+            else:
+                self.latencies.append(time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            self.errors["timeout"] += 1
+        except Exception as e:
+            self.errors[type(e).__name__] += 1
+
+    async def _worker(self, run_start: float, deadline: float):
+        while True:
+            index = self._next_index
+            self._next_index += 1
+            if self.rps:
+                # Request i is due at run_start + i / rps, shared across all workers
+                due = run_start + index / self.rps
+                if due >= deadline:
+                    return
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif time.perf_counter() >= deadline:
+                return
+            self.started += 1
+            await self._call_once()
+
+    async def run(self, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  progress_interval: float = 1.0) -> Dict[str, Any]:
+        """Run the load test and return its summary; on_progress receives interim summaries"""
+        monitor = ResourceMonitor()
+        monitor.start()
+        run_start = time.perf_counter()
+        deadline = run_start + self.duration
+        workers = [asyncio.create_task(self._worker(run_start, deadline)) for _ in range(self.concurrency)]
+        try:
+            while not all(w.done() for w in workers):
+                await asyncio.wait(workers, timeout=progress_interval)
+                if on_progress:
+                    on_progress(self.summary(time.perf_counter() - run_start))
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await monitor.stop()
+        summary = self.summary(time.perf_counter() - run_start)
+        summary["resources"] = monitor.summary()
+        return summary
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        completed = len(latencies) + sum(self.errors.values())
+        return {
+            "server": self.server_name,
+            "tool": self.tool_name,
+            "concurrency": self.concurrency,
+            "target_rps": self.rps,
+            "elapsed_s": round(elapsed, 2),
+            "requests": completed,
+            "in_flight": self.started - completed,
+            "successes": len(latencies),
+            "errors": dict(self.errors),
+            "error_rate": round(sum(self.errors.values()) / completed, 4) if completed else 0.0,
+            "throughput_rps": round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "min": round(latencies[0] * 1000, 1) if latencies else 0.0,
+                "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+                "p50": round(percentile(latencies, 50) * 1000, 1),
+                "p90": round(percentile(latencies, 90) * 1000, 1),
+                "p95": round(percentile(latencies, 95) * 1000, 1),
+                "p99": round(percentile(latencies, 99) * 1000, 1),
+                "max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            },
+        }
+
+
+def format_report(summary: Dict[str, Any]) -> str:
+    """Render a load test summary as markdown"""
+    latency = summary["latency_ms"]
+    target = f"{summary['target_rps']} req/s" if summary["target_rps"] else "unlimited"
+    lines = [
+        f"### ⚡ Load test: `{summary['server']}` / `{summary['tool']}`",
+        f"**Concurrency:** {summary['concurrency']} • **Target rate:** {target} • **Elapsed:** {summary['elapsed_s']}s",
+        "",
+        "| Requests | Successes | Error rate | Throughput |",
+        "|---|---|---|---|",
+        f"| {summary['requests']} | {summary['successes']} | {summary['error_rate']:.1%} | {summary['throughput_rps']} req/s |",
+        "",
+        "| min | mean | p50 | p90 | p95 | p99 | max |",
+        "|---|---|---|---|---|---|---|",
+        "| " + " | ".join(f"{latency[k]} ms" for k in ("min", "mean", "p50", "p90", "p95", "p99", "max")) + " |",
+    ]
+    if summary["errors"]:
+        lines += ["", "**Errors:** " + ", ".join(f"{name} × {count}" for name, count in summary["errors"].items())]
+    resources = summary.get("resources")
+    if resources:
+        lines += ["", "**Server processes:** " + ", ".join(f"{key}: {value}" for key, value in resources.items())]
+    elif summary.get("in_flight"):
+        lines += ["", f"_{summary['in_flight']} calls in flight..._"]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a tool on a configured MCP server")
+    parser.add_argument("--config", default="mcp/mcp_config.json", help="MCP server configuration file")
+    parser.add_argument("--server", required=True, help="Server name from the configuration")
+    parser.add_argument("--tool", required=True, help="Tool to call")
+    parser.add_argument("--params", default="{}", help="Tool arguments as a JSON object")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent callers")
+    parser.add_argument("--rps", type=float, default=0, help="Target requests per second (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test duration in seconds")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-call timeout in seconds")
+    parser.add_argument("--json", dest="json_path", help="Also write the summary to this JSON file")
+    args = parser.parse_args()
+
+    client = MCPCLient()
+    client.load_servers(args.config)
+    tester = LoadTester(client, args.server, args.tool, json.loads(args.params),
+                        concurrency=args.concurrency, rps=args.rps, duration=args.duration, timeout=args.timeout)
+    summary = asyncio.run(tester.run(
+        on_progress=lambda s: print(f"  {s['elapsed_s']:>6}s  {s['requests']} done, {s['in_flight']} in flight, "
+                                    f"p50 {s['latency_ms']['p50']} ms", file=sys.stderr)
+    ))
+    print(format_report(summary))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
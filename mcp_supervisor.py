@@ -0,0 +1,101 @@
+import asyncio
+import atexit
+import os
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from mcp_client import MCPServer, error_text
+from telemetry import get_telemetry
+from tool_catalog import ToolCatalog, get_tool_catalog
+
+# Start every configured server in the background at startup
+PREWARM = os.environ.get("AGENTX_MCP_PREWARM", "1") != "0"
+RESTART_BACKOFF = float(os.environ.get("AGENTX_MCP_RESTART_BACKOFF", 1))
+RESTART_BACKOFF_MAX = float(os.environ.get("AGENTX_MCP_RESTART_BACKOFF_MAX", 60))
+# A server that stayed up this long before crashing starts its backoff over
+STABLE_SECONDS = 60
+DRAIN_TIMEOUT = float(os.environ.get("AGENTX_MCP_DRAIN_TIMEOUT", 10))
+
+
+class MCPSupervisor:
+    """Keeps the configured MCP servers running for the life of the process.
+
+    - prewarm: servers are started (and their tools listed) in the background at startup,
+      so the first tool call does not pay for spawning the server
+    - crashed servers are restarted with exponential backoff, unless they were removed
+      from the config or reconnected on demand in the meantime
+    - at exit, new calls are refused, calls in flight get DRAIN_TIMEOUT seconds to finish
+      and then every server is stopped
+
+    Per-process memory and CPU limits are applied by mcp_launcher when a server starts.
+    """
+
+    def __init__(self, catalog: ToolCatalog):
+        self.catalog = catalog
+        self.pool = catalog.client.pool
+        self.failures: Dict[str, int] = {}
+        self.restarts: Dict[str, int] = {}
+        self.started = False
+        self.telemetry = get_telemetry()
+        self._restarting: Set[str] = set()
+
+    def start(self, prewarm: bool = PREWARM):
+        if self.started:
+            return
+        self.started = True
+        self.pool.add_crash_listener(self._on_crash)
+        atexit.register(self.drain)
+        if prewarm:
+            threading.Thread(target=self.prewarm, name="agentx-mcp-prewarm", daemon=True).start()
+
+    def prewarm(self):
+        start = time.perf_counter()
+        self.catalog.ensure_loaded()
+        print(f"Prewarmed {self.pool.live_sessions()} MCP servers in {time.perf_counter() - start:.2f}s")
+
+    def drain(self, timeout: float = DRAIN_TIMEOUT):
+        self.pool.drain(timeout)
+
+    def _server(self, server_name: str) -> Optional[MCPServer]:
+        return next((server for server in self.catalog.client.servers if server.name == server_name), None)
+
+    async def _on_crash(self, server_name: str, uptime: float):
+        if server_name in self._restarting:
+            return
+        if uptime >= STABLE_SECONDS:
+            self.failures[server_name] = 0
+        self._restarting.add(server_name)
+        try:
+            while not self.pool.draining:
+                server = self._server(server_name)
+                if server is None or self.pool.is_connected(server):
+                    return
+                failures = self.failures.get(server_name, 0)
+                self.failures[server_name] = failures + 1
+                delay = min(RESTART_BACKOFF * 2 ** failures, RESTART_BACKOFF_MAX)
+                print(f"Restarting MCP server {server_name} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                try:
+                    await self.pool.connect(server)
+                except Exception as e:
+                    print(f"Restart of MCP server {server_name} failed: {error_text(e)}")
+                    continue
+                self.restarts[server_name] = self.restarts.get(server_name, 0) + 1
+                self.telemetry.record("counter", "agentx.mcp.restarts", server=server_name)
+                print(f"Restarted MCP server {server_name}")
+                return
+        finally:
+            self._restarting.discard(server_name)
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def get_mcp_supervisor() -> MCPSupervisor:
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = MCPSupervisor(get_tool_catalog())
+        return _supervisor
@@ -3,6 +3,7 @@ import asyncio
 import json
 import os
 import sys
+import time
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
@@ -10,28 +11,35 @@ from datetime import datetime
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "."))
 sys.path.append(project_root)
 
-from mcp_client import MCPCLient
+from mcp_client import MCPCLient, MCPSessionPool
+from payload_store import get_payload_store
+from result_viewer import get_page, human_size, outline
+from mcp_loadtest import LoadTester, format_report
+from tool_catalog import ToolRegistry, get_tool_catalog
 
 
 class MCPTesterInterface:
     def __init__(self):
-        self.mcp_client = MCPCLient()
-        self.all_tools = {}
-        self.servers_loaded = False
+        self.catalog = get_tool_catalog()
         self.temp_server_config = None  # Store temporary server config for testing
         self.temp_server_name = None
         self.temp_server_tools = []  # Store tools from tested online server
+        self.temp_registry = ToolRegistry()
         self.temp_client = None  # Store temporary client for online server
+        self.payload_store = get_payload_store()
+        self.last_result_ref = None  # Reference to the last large tool result on disk
+        self.last_result = None  # Last small result, or a spilled one loaded back for expanding
+        self.last_result_text = ""
+        self.last_result_outline = ""  # Top level of the last result, built before it was spilled
+        self.last_result_expandable = False
         
+    @property
+    def mcp_client(self):
+        return self.catalog.client
+
     async def load_servers(self):
-        """Load MCP servers from config file"""
-        config_path = "mcp/mcp_config.json"
-        if os.path.exists(config_path):
-            self.mcp_client.load_servers(config_path)
-            self.all_tools = await self.mcp_client.load_all_tools()
-            self.servers_loaded = True
-            return True
-        return False
+        """Load MCP servers from the shared catalog; servers are only listed on first use"""
+        return await self.catalog.ensure_loaded_async()
     
     async def test_online_server(self, server_config_text: str):
         """Test an online MCP server configuration"""
@@ -55,8 +63,11 @@ class MCPTesterInterface:
             self.temp_server_config = server_config
             self.temp_server_name = server_name
             
-            # Create a temporary MCP client to test this server
-            self.temp_client = MCPCLient()
+            # Create a temporary MCP client to test this server; its own session pool keeps it
+            # apart from a configured server of the same name
+            if self.temp_client:
+                await asyncio.to_thread(self.temp_client.pool.shutdown)
+            self.temp_client = MCPCLient(pool=MCPSessionPool())
             self.temp_client.load_single_server(server_name, server_config)
             
             # Try to load tools to verify the server works
@@ -64,6 +75,7 @@ class MCPTesterInterface:
             
             if server_name in tools and tools[server_name]:
                 self.temp_server_tools = tools[server_name]
+                self.temp_registry = ToolRegistry({server_name: tools[server_name]})
                 return True, {
                     "server_name": server_name,
                     "tools": tools[server_name],
@@ -77,13 +89,13 @@ class MCPTesterInterface:
         except Exception as e:
             return False, f"Error testing server: {str(e)}"
     
-    async def execute_temp_tool(self, tool_name: str, input_data: Dict[str, Any]):
+    async def execute_temp_tool(self, tool_name: str, input_data: Dict[str, Any], progress_callback=None):
         """Execute a tool from the temporary online server"""
         try:
             if not self.temp_client or not self.temp_server_name:
                 raise ValueError("No temporary server available")
             
-            result = await self.temp_client.call_tool(self.temp_server_name, tool_name, input_data)
+            result = await self.temp_client.call_tool(self.temp_server_name, tool_name, input_data, progress_callback)
             return True, result
         except Exception as e:
             return False, str(e)
@@ -114,13 +126,15 @@ class MCPTesterInterface:
             with open(config_path, 'w') as f:
                 json.dump(current_config, f, indent=2)
             
-            # Reload servers to include the new one
-            await self.load_servers()
+            # List only the new server; the others keep their tools
+            await self.catalog.reload_config_async()
             
             # Clear temp config
+            await asyncio.to_thread(self.temp_client.pool.shutdown)
             self.temp_server_config = None
             self.temp_server_name = None
             self.temp_server_tools = []
+            self.temp_registry = ToolRegistry()
             self.temp_client = None
             
             return True, f"Server added successfully to configuration."
@@ -130,32 +144,165 @@ class MCPTesterInterface:
     
     def get_server_list(self):
         """Get list of available servers"""
-        if hasattr(self.mcp_client, 'servers'):
-            return [server.name for server in self.mcp_client.servers]
-        return []
+        return self.catalog.servers()
     
     def get_tools_for_server(self, server_name: str):
         """Get tools for a specific server"""
-        if server_name and server_name in self.all_tools:
-            return self.all_tools[server_name]
-        return []
+        return self.catalog.get_tools(server_name)
+    
+    def get_tool(self, server_name: str, tool_name: str):
+        """Look up one tool of a configured server"""
+        return self.catalog.get_tool(server_name, tool_name)
     
     def get_temp_server_tools(self):
         """Get tools for the temporary online server"""
         return self.temp_server_tools
     
-    async def execute_tool(self, server_name: str, tool_name: str, input_data: Dict[str, Any]):
+    def get_temp_tool(self, tool_name: str):
+        """Look up one tool of the temporary online server"""
+        return self.temp_registry.get(self.temp_server_name, tool_name)
+    
+    def format_result(self, result):
+        """Keep a tool result for paginated display; large results are spilled to the payload
+        store and only read back a page at a time through mmap"""
+        if hasattr(result, "model_dump"):
+            result = result.model_dump(mode="json", exclude_none=True)
+        
+        # The same indented text is paged whether the result stays in memory or is spilled
+        text = json.dumps(result, indent=2, ensure_ascii=False, default=str) if isinstance(result, (dict, list)) else str(result)
+        encoded = text.encode("utf-8")
+        self.last_result_outline = outline(result)
+        self.last_result_expandable = isinstance(result, (dict, list))
+        if len(encoded) > self.payload_store.inline_limit:
+            self.last_result_ref = self.payload_store.put(result, encoded)
+            self.last_result = None
+            self.last_result_text = ""
+        else:
+            self.last_result_ref = None
+            self.last_result = result
+            self.last_result_text = text
+        return self.get_result_page(1), len(encoded)
+    
+    def get_result_page(self, page: int):
+        """Return (page_text, page_info) of the last result"""
+        return get_page(self.last_result_ref or self.last_result_text, page)
+    
+    def get_result_outline(self, path: str = ""):
+        """Outline one level of the last result; a spilled result is loaded from disk on the
+        first expand below the top level and kept for later expands"""
+        path = path.strip()
+        if not path and self.last_result_outline:
+            return self.last_result_outline
+        if self.last_result is None and self.last_result_ref:
+            if not self.last_result_expandable:
+                return f"❌ Path `{path}` not found"
+            self.last_result = self.payload_store.get(self.last_result_ref)
+        if self.last_result is None:
+            return "No result to explore"
+        return outline(self.last_result, path)
+    
+    async def execute_tool(self, server_name: str, tool_name: str, input_data: Dict[str, Any], progress_callback=None):
         """Execute a tool with given parameters"""
         try:
-            result = await self.mcp_client.call_tool(server_name, tool_name, input_data)
+            result = await self.mcp_client.call_tool(server_name, tool_name, input_data, progress_callback)
             return True, result
         except Exception as e:
             return False, str(e)
 
 
-def create_mcp_tester_interface():
+def create_mcp_tester_interface(initialize_now: bool = False):
+    """initialize_now loads the servers while building, for when the page has already loaded
+    (e.g. inside gr.render) and the interface's load event will not fire"""
     mcp_tester = MCPTesterInterface()
     
+    def create_server_info(server_name):
+        """Create server information display"""
+        if not server_name:
+            return "No server selected"
+        
+        tools = mcp_tester.get_tools_for_server(server_name)
+        tool_count = len(tools) if tools else 0
+        
+        return f"""
+        **Server:** `{server_name}`  
+        **Tools Available:** {tool_count}  
+        **Status:** ✅ Active
+        """
+    
+    def create_tool_details_html(server_name):
+        """Create detailed tool information for left panel"""
+        if not server_name:
+            return "Select a server to view tool details"
+        
+        tools = mcp_tester.get_tools_for_server(server_name)
+        if not tools:
+            return f"No tools available for server: **{server_name}**"
+        
+        html_content = f"""
+        <div style="max-height: 400px; overflow-y: auto;">
+            <p><strong>{len(tools)} tools available:</strong></p>
+        """
+        
+        for tool in tools:
+            description = tool.get('description', 'No description available')
+            # Truncate very long descriptions
+            if len(description) > 120:
+                description = description[:120] + "..."
+            
+            html_content += f"""
+            <div class="tool-details">
+                <div class="tool-name-detail">📋 {tool['name']}</div>
+                <div class="tool-desc-detail">{description}</div>
+            </div>
+            """
+        
+        html_content += "</div>"
+        return html_content
+    
+    def create_tool_choices(server_name):
+        """Create tool choices for radio selection"""
+        if not server_name:
+            return []
+        
+        tools = mcp_tester.get_tools_for_server(server_name)
+        if not tools:
+            return []
+        
+        return [f"📋 {tool['name']}" for tool in tools]
+    
+    def error_state(status, server_info):
+        return {
+            "servers": [], "server": None, "status": status, "server_info": server_info,
+            "tool_details": "Unable to load tool details", "tools": [], "placeholder": "Unable to load tools"
+        }
+    
+    def startup_state(success):
+        """Contents of the server and tool panels once the catalog has loaded"""
+        if not success:
+            return error_state("❌ **Failed to load servers** - Check if `mcp/mcp_config.json` exists.", "Configuration error")
+        servers = mcp_tester.get_server_list()
+        if not servers:
+            return {
+                "servers": [], "server": None, "status": "⚠️ **No servers found** - Check your MCP configuration.",
+                "server_info": "No servers configured", "tool_details": "No tool details available",
+                "tools": [], "placeholder": "No tools available"
+            }
+        return {
+            "servers": servers, "server": servers[0],
+            "status": "✅ **MCP servers loaded successfully!** Select a server to explore tools.",
+            "server_info": create_server_info(servers[0]),
+            "tool_details": create_tool_details_html(servers[0]),
+            "tools": create_tool_choices(servers[0]),
+            "placeholder": "**Select a tool from the list above to execute**"
+        }
+    
+    initial = None
+    if initialize_now:
+        try:
+            initial = startup_state(mcp_tester.catalog.ensure_loaded())
+        except Exception as e:
+            initial = error_state(f"❌ **Error:** {str(e)}", "Error occurred")
+    
     with gr.Blocks(title="MCP Tools Manager", theme=gr.themes.Soft(), css="""
         .header-container { 
             background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
@@ -244,7 +391,7 @@ def create_mcp_tester_interface():
         """)
         
         # Status display
-        status_display = gr.Markdown("🔄 Initializing MCP servers...", elem_classes=["loading"])
+        status_display = gr.Markdown(initial["status"] if initial else "🔄 Initializing MCP servers...", elem_classes=["loading"])
         
         with gr.Row():
             # Left Panel - Servers and Tool Details
@@ -256,17 +403,17 @@ def create_mcp_tester_interface():
                         with gr.Group():
                             server_radio = gr.Radio(
                                 label="Select Server",
-                                choices=[],
-                                value=None,
+                                choices=initial["servers"] if initial else [],
+                                value=initial["server"] if initial else None,
                                 interactive=True
                             )
                             
                             # Server info
-                            server_info = gr.Markdown("Select a server to view details")
+                            server_info = gr.Markdown(initial["server_info"] if initial else "Select a server to view details")
                             
                             # Tool details section
                             gr.Markdown("### 🔧 **Tool Details**")
-                            tool_details_container = gr.HTML("Select a server to view tool details", elem_classes=["server-panel"])
+                            tool_details_container = gr.HTML(initial["tool_details"] if initial else "Select a server to view tool details", elem_classes=["server-panel"])
                     
                     # Tab 2: Online Server Testing
                     with gr.TabItem("🌐 Test Online Server"):
@@ -315,13 +462,13 @@ def create_mcp_tester_interface():
                     # Tools list (shared between both modes)
                     tools_list = gr.Radio(
                         label="Select Tool to Execute",
-                        choices=[],
+                        choices=initial["tools"] if initial else [],
                         value=None,
                         interactive=True,
-                        visible=False
+                        visible=bool(initial and initial["servers"])
                     )
                     
-                    tools_placeholder = gr.Markdown("Select a server to view available tools")
+                    tools_placeholder = gr.Markdown(initial["placeholder"] if initial else "Select a server to view available tools")
                     
                     # Tool execution area (shared between both modes)
                     with gr.Group(visible=False) as tool_execution_group:
@@ -358,56 +505,61 @@ def create_mcp_tester_interface():
                         
                         # Results
                         execution_status = gr.Markdown("")
+                        # Result pagination and lazy structure exploration
+                        with gr.Group(visible=False) as result_nav_group:
+                            with gr.Row():
+                                result_page = gr.Number(
+                                    value=1,
+                                    label="Page",
+                                    precision=0,
+                                    minimum=1,
+                                    scale=1
+                                )
+                                result_page_btn = gr.Button("📄 Go", variant="secondary", size="sm", scale=1)
+                                result_page_info = gr.Markdown("")
+                            
+                            with gr.Accordion("🌳 Result Structure", open=False):
+                                with gr.Row():
+                                    result_path = gr.Textbox(
+                                        label="Path",
+                                        placeholder="e.g. content.0.text (empty for root)",
+                                        scale=4
+                                    )
+                                    expand_path_btn = gr.Button("🔍 Expand", variant="secondary", size="sm", scale=1)
+                                result_outline = gr.Markdown("")
+                        
                         execution_result = gr.Code(
                             label="Execution Result",
                             language="json",
                             interactive=False,
                             visible=False
                         )
+                        
+                        # Load test the selected tool with the parameters above
+                        with gr.Accordion("⚡ Load Test", open=False):
+                            gr.Markdown("_Calls reuse the server's open session, so latencies are warm-session numbers. Concurrency above the server's call limit queues._")
+                            with gr.Row():
+                                load_concurrency = gr.Slider(1, 64, value=4, step=1, label="Concurrency")
+                                load_rps = gr.Number(value=0, label="Target req/s (0 = unlimited)", minimum=0)
+                                load_duration = gr.Slider(1, 300, value=10, step=1, label="Duration (s)")
+                            load_test_btn = gr.Button("⚡ Run Load Test", variant="secondary")
+                            load_test_report = gr.Markdown("")
         
         # Initialize on load
         async def initialize_on_load():
             """Initialize servers automatically when the interface loads"""
             try:
-                success = await mcp_tester.load_servers()
-                if success:
-                    servers = mcp_tester.get_server_list()
-                    if servers:
-                        return (
-                            gr.Radio(choices=servers, value=servers[0]),
-                            "✅ **MCP servers loaded successfully!** Select a server to explore tools.",
-                            create_server_info(servers[0]),
-                            create_tool_details_html(servers[0]),
-                            gr.Radio(choices=create_tool_choices(servers[0]), value=None, visible=True),
-                            "**Select a tool from the list above to execute**"
-                        )
-                    else:
-                        return (
-                            gr.Radio(choices=[]),
-                            "⚠️ **No servers found** - Check your MCP configuration.",
-                            "No servers configured",
-                            "No tool details available",
-                            gr.Radio(choices=[], visible=False),
-                            "No tools available"
-                        )
-                else:
-                    return (
-                        gr.Radio(choices=[]),
-                        "❌ **Failed to load servers** - Check if `mcp/mcp_config.json` exists.",
-                        "Configuration error",
-                        "Unable to load tool details",
-                        gr.Radio(choices=[], visible=False),
-                        "Unable to load tools"
-                    )
+                state = startup_state(await mcp_tester.load_servers())
             except Exception as e:
-                return (
-                    gr.Radio(choices=[]),
-                    f"❌ **Error:** {str(e)}",
-                    "Error occurred",
-                    "Unable to load tool details",
-                    gr.Radio(choices=[], visible=False),
-                    "Unable to load tools"
-                )
+                state = error_state(f"❌ **Error:** {str(e)}", "Error occurred")
+            return (
+                gr.Radio(choices=state["servers"], value=state["server"]),
+                state["status"],
+                state["server_info"],
+                state["tool_details"],
+                gr.Radio(choices=state["tools"], value=None, visible=bool(state["servers"])),
+                state["placeholder"]
+            )
         
         async def test_online_server_handler(config_text):
             """Handle testing of online MCP server"""
@@ -484,6 +636,9 @@ def create_mcp_tester_interface():
             mcp_tester.temp_server_config = None
             mcp_tester.temp_server_name = None
             mcp_tester.temp_server_tools = []
+            mcp_tester.temp_registry = ToolRegistry()
+            if mcp_tester.temp_client:
+                mcp_tester.temp_client.pool.shutdown()
             mcp_tester.temp_client = None
             
             return (
@@ -527,61 +682,6 @@ def create_mcp_tester_interface():
                     gr.Group()
                 )
         
-        def create_server_info(server_name):
-            """Create server information display"""
-            if not server_name:
-                return "No server selected"
-            
-            tools = mcp_tester.get_tools_for_server(server_name)
-            tool_count = len(tools) if tools else 0
-            
-            return f"""
-            **Server:** `{server_name}`  
-            **Tools Available:** {tool_count}  
-            **Status:** ✅ Active
-            """
-        
-        def create_tool_details_html(server_name):
-            """Create detailed tool information for left panel"""
-            if not server_name:
-                return "Select a server to view tool details"
-            
-            tools = mcp_tester.get_tools_for_server(server_name)
-            if not tools:
-                return f"No tools available for server: **{server_name}**"
-            
-            html_content = f"""
-            <div style="max-height: 400px; overflow-y: auto;">
-                <p><strong>{len(tools)} tools available:</strong></p>
-            """
-            
-            for tool in tools:
-                description = tool.get('description', 'No description available')
-                # Truncate very long descriptions
-                if len(description) > 120:
-                    description = description[:120] + "..."
-                
-                html_content += f"""
-                <div class="tool-details">
-                    <div class="tool-name-detail">📋 {tool['name']}</div>
-                    <div class="tool-desc-detail">{description}</div>
-                </div>
-                """
-            
-            html_content += "</div>"
-            return html_content
-        
-        def create_tool_choices(server_name):
-            """Create tool choices for radio selection"""
-            if not server_name:
-                return []
-            
-            tools = mcp_tester.get_tools_for_server(server_name)
-            if not tools:
-                return []
-            
-            return [f"📋 {tool['name']}" for tool in tools]
-        
         def on_server_change(server_name):
             """Handle server selection change"""
             if server_name:
@@ -620,8 +720,7 @@ def create_mcp_tester_interface():
                 tool_name = tool_selection.replace("📋 ", "")
                 
                 # Get tool details from temp server tools
-                tools = mcp_tester.temp_server_tools
-                tool = next((t for t in tools if t['name'] == tool_name), None)
+                tool = mcp_tester.get_temp_tool(tool_name)
                 
                 if not tool:
                     return (
@@ -703,8 +802,7 @@ def create_mcp_tester_interface():
                 tool_name = tool_selection.replace("📋 ", "")
                 
                 # Get tool details
-                tools = mcp_tester.get_tools_for_server(server_name)
-                tool = next((t for t in tools if t['name'] == tool_name), None)
+                tool = mcp_tester.get_tool(server_name, tool_name)
                 
                 if not tool:
                     return (
@@ -771,15 +869,60 @@ def create_mcp_tester_interface():
                     *param_inputs
                 )
         
+        def build_parameters(form_data, param_values):
+            """Build tool arguments from the parameter form, converting values to their schema types"""
+            parameters = {}
+            if form_data:
+                for i, field_info in enumerate(form_data):
+                    if i < len(param_values):
+                        value = param_values[i]
+                        if value:  # Only include non-empty values
+                            field_name = field_info['name']
+                            field_type = field_info['type']
+                            
+                            # Convert value to appropriate type
+                            if field_type == 'integer':
+                                try:
+                                    parameters[field_name] = int(value)
+                                except ValueError:
+                                    raise ValueError(f"Invalid integer value for {field_name}: {value}")
+                            elif field_type == 'number':
+                                try:
+                                    parameters[field_name] = float(value)
+                                except ValueError:
+                                    raise ValueError(f"Invalid number value for {field_name}: {value}")
+                            elif field_type == 'boolean':
+                                parameters[field_name] = value.lower() in ('true', '1', 'yes', 'on')
+                            else:
+                                parameters[field_name] = value
+            return parameters
+        
+        def execution_state(status, result=None, running=False, page_info=None, result_outline=None):
+            """Build the outputs of the execution area; None leaves the result view untouched while running"""
+            if running:
+                button = gr.Button("⏳ Executing...", variant="secondary", interactive=False, elem_classes=["executing"])
+                loading = gr.HTML('<div class="spinner"></div> <span style="margin-left: 10px;">Tool is running...</span>', visible=True)
+            else:
+                button = gr.Button("🚀 Execute Tool", variant="primary", interactive=True)
+                loading = gr.HTML("", visible=False)
+            if result is None:
+                return (status, gr.Code(visible=False), button, loading, gr.update(), gr.update(), gr.update(), gr.Group(visible=False))
+            return (
+                status,
+                gr.Code(value=result, visible=True),
+                button,
+                loading,
+                gr.update(value=1),
+                page_info,
+                result_outline,
+                gr.Group(visible=True)
+            )
+        
         async def execute_tool_handler(server_name, tool_selection, form_data, *param_values):
-            """Handle tool execution with loading states for both existing and online servers"""
+            """Handle tool execution with loading states for both existing and online servers.
+            Progress notifications from the server are streamed into the status while the call runs."""
             if not tool_selection:
-                yield (
-                    "❌ Please select a tool first", 
-                    gr.Code(visible=False),
-                    gr.Button("🚀 Execute Tool", variant="primary", interactive=True),
-                    gr.HTML("", visible=False)
-                )
+                yield execution_state("❌ Please select a tool first")
                 return
             
             tool_name = tool_selection.replace("📋 ", "")
@@ -789,96 +932,101 @@ def create_mcp_tester_interface():
             current_server = mcp_tester.temp_server_name if is_online_server else server_name
             
             if not current_server:
-                yield (
-                    "❌ No server available for execution", 
-                    gr.Code(visible=False),
-                    gr.Button("🚀 Execute Tool", variant="primary", interactive=True),
-                    gr.HTML("", visible=False)
-                )
+                yield execution_state("❌ No server available for execution")
                 return
             
             # Show loading state
             server_type = "🌐 Online" if is_online_server else "📡 Configured"
-            yield (
-                f"🔄 **Executing tool on {server_type} server '{current_server}'...** Please wait.", 
-                gr.Code(visible=False),
-                gr.Button("⏳ Executing...", variant="secondary", interactive=False, elem_classes=["executing"]),
-                gr.HTML('<div class="spinner"></div> <span style="margin-left: 10px;">Tool is running...</span>', visible=True)
-            )
+            running_status = f"🔄 **Executing tool on {server_type} server '{current_server}'...** Please wait."
+            yield execution_state(running_status, running=True)
             
             try:
-                # Build parameters from form data and values
-                parameters = {}
-                if form_data:
-                    for i, field_info in enumerate(form_data):
-                        if i < len(param_values):
-                            value = param_values[i]
-                            if value:  # Only include non-empty values
-                                field_name = field_info['name']
-                                field_type = field_info['type']
-                                
-                                # Convert value to appropriate type
-                                if field_type == 'integer':
-                                    try:
-                                        parameters[field_name] = int(value)
-                                    except ValueError:
-                                        yield (
-                                            f"❌ Invalid integer value for {field_name}: {value}", 
-                                            gr.Code(visible=False),
-                                            gr.Button("🚀 Execute Tool", variant="primary", interactive=True),
-                                            gr.HTML("", visible=False)
-                                        )
-                                        return
-                                elif field_type == 'number':
-                                    try:
-                                        parameters[field_name] = float(value)
-                                    except ValueError:
-                                        yield (
-                                            f"❌ Invalid number value for {field_name}: {value}", 
-                                            gr.Code(visible=False),
-                                            gr.Button("🚀 Execute Tool", variant="primary", interactive=True),
-                                            gr.HTML("", visible=False)
-                                        )
-                                        return
-                                elif field_type == 'boolean':
-                                    parameters[field_name] = value.lower() in ('true', '1', 'yes', 'on')
-                                else:
-                                    parameters[field_name] = value
+                try:
+                    parameters = build_parameters(form_data, param_values)
+                except ValueError as e:
+                    yield execution_state(f"❌ {e}")
+                    return
+                
+                progress_queue = asyncio.Queue()
+                
+                async def on_progress(progress, total, message=None):
+                    await progress_queue.put((progress, total, message))
                 
-                # Execute tool based on server type
+                # Execute tool based on server type, reporting progress while it runs
                 if is_online_server:
-                    success, result = await mcp_tester.execute_temp_tool(tool_name, parameters)
+                    call = asyncio.create_task(mcp_tester.execute_temp_tool(tool_name, parameters, on_progress))
                 else:
-                    success, result = await mcp_tester.execute_tool(current_server, tool_name, parameters)
+                    call = asyncio.create_task(mcp_tester.execute_tool(current_server, tool_name, parameters, on_progress))
+                
+                started = time.monotonic()
+                progress_text = ""
+                while not call.done():
+                    try:
+                        progress, total, message = await asyncio.wait_for(progress_queue.get(), timeout=1.0)
+                        progress_text = f" • progress {progress / total:.0%}" if total else f" • progress {progress}"
+                        if message:
+                            progress_text += f": {message}"
+                    except asyncio.TimeoutError:
+                        pass
+                    elapsed = time.monotonic() - started
+                    yield execution_state(f"{running_status} ({elapsed:.0f}s{progress_text})", running=True)
+                success, result = await call
                 
                 if success:
-                    # Format result for display
-                    if isinstance(result, (dict, list)):
-                        formatted_result = json.dumps(result, indent=2)
-                    else:
-                        formatted_result = str(result)
+                    # Large results stay on disk and are rendered a page at a time
+                    (page_text, page_info), size = mcp_tester.format_result(result)
                     
-                    yield (
-                        f"✅ **Tool executed successfully on {server_type} server '{current_server}'!**\n\n**Parameters used:** {json.dumps(parameters, indent=2)}",
-                        gr.Code(value=formatted_result, visible=True),
-                        gr.Button("🚀 Execute Tool", variant="primary", interactive=True),
-                        gr.HTML("", visible=False)
+                    yield execution_state(
+                        f"✅ **Tool executed successfully on {server_type} server '{current_server}'!** ({human_size(size)} in {time.monotonic() - started:.1f}s)\n\n**Parameters used:** {json.dumps(parameters, indent=2)}",
+                        result=page_text,
+                        page_info=page_info,
+                        result_outline=mcp_tester.get_result_outline()
                     )
                 else:
-                    yield (
-                        f"❌ **Tool execution failed on {server_type} server '{current_server}':** {result}", 
-                        gr.Code(visible=False),
-                        gr.Button("🚀 Execute Tool", variant="primary", interactive=True),
-                        gr.HTML("", visible=False)
-                    )
+                    yield execution_state(f"❌ **Tool execution failed on {server_type} server '{current_server}':** {result}")
                     
             except Exception as e:
-                yield (
-                    f"❌ **Unexpected error:** {str(e)}", 
-                    gr.Code(visible=False),
-                    gr.Button("🚀 Execute Tool", variant="primary", interactive=True),
-                    gr.HTML("", visible=False)
-                )
+                yield execution_state(f"❌ **Unexpected error:** {str(e)}")
+        
+        async def load_test_handler(server_name, tool_selection, form_data, concurrency, rps, duration, *param_values):
+            """Run the selected tool under load, streaming interim results"""
+            if not tool_selection:
+                yield "❌ Please select a tool first", gr.Button(interactive=True)
+                return
+            
+            tool_name = tool_selection.replace("📋 ", "")
+            is_online_server = mcp_tester.temp_server_name and mcp_tester.temp_server_tools
+            client = mcp_tester.temp_client if is_online_server else mcp_tester.mcp_client
+            current_server = mcp_tester.temp_server_name if is_online_server else server_name
+            if not current_server:
+                yield "❌ No server available for load testing", gr.Button(interactive=True)
+                return
+            
+            try:
+                parameters = build_parameters(form_data, param_values)
+            except ValueError as e:
+                yield f"❌ {e}", gr.Button(interactive=True)
+                return
+            
+            tester = LoadTester(client, current_server, tool_name, parameters,
+                                concurrency=int(concurrency or 1), rps=rps, duration=float(duration or 10))
+            progress = []
+            run = asyncio.create_task(tester.run(on_progress=progress.append))
+            yield f"🔄 **Load testing `{tool_name}` for {tester.duration:.0f}s...**", gr.Button("⏳ Running...", interactive=False)
+            while not run.done():
+                await asyncio.wait([run], timeout=1.0)
+                if progress and not run.done():
+                    yield format_report(progress[-1]), gr.Button("⏳ Running...", interactive=False)
+            try:
+                summary = await run
+                yield format_report(summary), gr.Button("⚡ Run Load Test", interactive=True)
+            except Exception as e:
+                yield f"❌ **Load test failed:** {str(e)}", gr.Button("⚡ Run Load Test", interactive=True)
+        
+        def change_result_page(page):
+            """Render another page of the last result"""
+            page_text, page_info = mcp_tester.get_result_page(int(page or 1))
+            return gr.Code(value=page_text, visible=True), page_info
         
         def update_tools_display_for_online():
             """Update tools display when online server is tested"""
@@ -903,13 +1051,18 @@ def create_mcp_tester_interface():
         
         def clear_results():
             """Clear execution results"""
-            return "", gr.Code(value="", visible=False)
+            mcp_tester.last_result_ref = None
+            mcp_tester.last_result = None
+            mcp_tester.last_result_text = ""
+            mcp_tester.last_result_outline = ""
+            return "", gr.Code(value="", visible=False), gr.Group(visible=False)
         
-        # Initialize interface on load
-        interface.load(
-            fn=initialize_on_load,
-            outputs=[server_radio, status_display, server_info, tool_details_container, tools_list, tools_placeholder]
-        )
+        # Initialize interface on load; an interface built after the page loaded was initialized above
+        if initial is None:
+            interface.load(
+                fn=initialize_on_load,
+                outputs=[server_radio, status_display, server_info, tool_details_container, tools_list, tools_placeholder]
+            )
         
         # Handle server selection
         server_radio.change(
@@ -962,13 +1115,46 @@ def create_mcp_tester_interface():
         execute_btn.click(
             fn=execute_tool_handler,
             inputs=[server_radio, tools_list, form_inputs] + param_components,
-            outputs=[execution_status, execution_result, execute_btn, loading_indicator]
+            outputs=[execution_status, execution_result, execute_btn, loading_indicator,
+                     result_page, result_page_info, result_outline, result_nav_group]
+        )
+        
+        # Handle load testing
+        load_test_btn.click(
+            fn=load_test_handler,
+            inputs=[server_radio, tools_list, form_inputs, load_concurrency, load_rps, load_duration] + param_components,
+            outputs=[load_test_report, load_test_btn]
         )
         
         # Handle clear results
         clear_btn.click(
             fn=clear_results,
-            outputs=[execution_status, execution_result]
+            outputs=[execution_status, execution_result, result_nav_group]
+        )
+        
+        # Handle result pagination and structure exploration
+        result_page.submit(
+            fn=change_result_page,
+            inputs=[result_page],
+            outputs=[execution_result, result_page_info]
+        )
+        
+        result_page_btn.click(
+            fn=change_result_page,
+            inputs=[result_page],
+            outputs=[execution_result, result_page_info]
+        )
+        
+        expand_path_btn.click(
+            fn=mcp_tester.get_result_outline,
+            inputs=[result_path],
+            outputs=[result_outline]
+        )
+        
+        result_path.submit(
+            fn=mcp_tester.get_result_outline,
+            inputs=[result_path],
+            outputs=[result_outline]
         )
     
     return interface
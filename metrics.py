@@ -0,0 +1,194 @@
+import asyncio
+import bisect
+import threading
+from typing import Dict, List, Tuple
+
+from telemetry import get_telemetry
+
+
+# Latency buckets in seconds, from sub-millisecond event-loop lag to long model calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, key)} {value}" for key, value in items]
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, key)} {value}" for key, value in items]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Prometheus metrics for Agent X, fed by the telemetry facade"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.queries = self.add(Counter("agentx_queries_total", "Agent queries served", ("agent",)))
+        self.sessions = self.add(Counter("agentx_sessions_total", "Agent sessions started", ("agent",)))
+        self.stream_chunks = self.add(Counter("agentx_stream_chunks_total", "Streaming response chunks sent", ("agent",)))
+        self.model_duration = self.add(Histogram("agentx_model_duration_seconds", "Model call latency", ("model",)))
+        self.tokens = self.add(Counter("agentx_tokens_total", "Tokens by model and direction", ("model", "direction")))
+        self.tool_calls = self.add(Counter("agentx_tool_calls_total", "Tool calls by MCP server", ("server", "tool")))
+        self.tool_errors = self.add(Counter("agentx_tool_errors_total", "Failed tool calls by MCP server", ("server", "tool")))
+        self.tool_duration = self.add(Histogram("agentx_tool_duration_seconds", "Tool call latency", ("server",)))
+        self.cache_requests = self.add(Counter("agentx_prompt_cache_requests_total", "Model calls reporting usage", ("model",)))
+        self.cache_hits = self.add(Counter("agentx_prompt_cache_hits_total", "Model calls served partly from the prompt cache", ("model",)))
+        self.cache_hit_ratio = self.add(Gauge("agentx_prompt_cache_hit_ratio", "Share of model calls with cached prompt tokens", ("model",)))
+        self.mcp_restarts = self.add(Counter("agentx_mcp_restarts_total", "MCP servers restarted after a crash", ("server",)))
+        self.circuits_opened = self.add(Counter("agentx_mcp_circuit_opened_total", "MCP server circuit breakers opened", ("server",)))
+        self.loop_lag = self.add(Histogram("agentx_event_loop_lag_seconds", "Event loop scheduling delay",
+                                           buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)))
+        self.loop_lag_last = self.add(Gauge("agentx_event_loop_lag_last_seconds", "Most recent event loop scheduling delay"))
+        self._handlers = {
+            "agentx.queries": lambda v, a: self.queries.inc(v, agent=a.get("agent", "")),
+            "agentx.sessions": lambda v, a: self.sessions.inc(v, agent=a.get("agent", "")),
+            "agentx.stream.chunks": lambda v, a: self.stream_chunks.inc(v, agent=a.get("agent", "")),
+            "agentx.model.duration": lambda v, a: self.model_duration.observe(v, model=a.get("model", "")),
+            "agentx.tokens": lambda v, a: self.tokens.inc(v, model=a.get("model", ""), direction=a.get("direction", "")),
+            "agentx.tool.duration": self._on_tool_call,
+            "agentx.tool.errors": lambda v, a: self.tool_errors.inc(v, server=a.get("server", ""), tool=a.get("tool", "")),
+            "agentx.prompt_cache.requests": lambda v, a: self.cache_requests.inc(v, model=a.get("model", "")),
+            "agentx.prompt_cache.hits": lambda v, a: self.cache_hits.inc(v, model=a.get("model", "")),
+            "agentx.mcp.restarts": lambda v, a: self.mcp_restarts.inc(v, server=a.get("server", "")),
+            "agentx.mcp.circuit_opened": lambda v, a: self.circuits_opened.inc(v, server=a.get("server", "")),
+        }
+
+    def add(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def _on_tool_call(self, value: float, attrs: Dict[str, str]):
+        self.tool_calls.inc(1, server=attrs.get("server", ""), tool=attrs.get("tool", ""))
+        self.tool_duration.observe(value, server=attrs.get("server", ""))
+
+    def on_telemetry(self, kind: str, name: str, value: float, attrs: Dict[str, str]):
+        handler = self._handlers.get(name)
+        if handler:
+            handler(value, attrs)
+
+    def render(self) -> str:
+        """Text exposition format, with gauges and ratios computed at scrape time"""
+        for key, requests in list(self.cache_requests._values.items()):
+            if requests:
+                self.cache_hit_ratio.set(round(self.cache_hits._values.get(key, 0) / requests, 4), model=key[0])
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        # Gauges registered with telemetry (MCP calls in flight, session pool occupancy, ...)
+        for name, value in sorted(get_telemetry().observe_gauges().items()):
+            prom_name = name.replace(".", "_")
+            lines += [f"# TYPE {prom_name} gauge", f"{prom_name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+async def monitor_event_loop_lag(registry: "MetricsRegistry", interval: float = 0.5):
+    """Sleep on the event loop and record how late each wakeup is; blocking handlers show up as lag"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - start - interval, 0.0)
+        registry.loop_lag.observe(lag)
+        registry.loop_lag_last.set(round(lag, 6))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Process-wide registry, subscribed to telemetry on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+                get_telemetry().add_listener(_registry.on_telemetry)
+    return _registry
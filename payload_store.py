@@ -0,0 +1,160 @@
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+# Payloads whose JSON form is larger than this are kept on disk and referenced from logs
+PAYLOAD_INLINE_LIMIT = int(os.environ.get("AGENTX_PAYLOAD_INLINE_LIMIT", 4096))
+PAYLOAD_DIR = os.environ.get("AGENTX_PAYLOAD_DIR", "payloads")
+# Least recently written payloads are deleted once the directory passes this size, and any
+# payload older than the age limit; 0 turns either limit off
+PAYLOAD_MAX_BYTES = int(os.environ.get("AGENTX_PAYLOAD_MAX_BYTES", 1024 * 1024 * 1024))
+PAYLOAD_MAX_AGE_DAYS = float(os.environ.get("AGENTX_PAYLOAD_MAX_AGE_DAYS", 7))
+
+
+class PayloadRef:
+    """Reference to a payload spilled to disk, with a short preview for display"""
+
+    __slots__ = ("digest", "size", "preview")
+
+    def __init__(self, digest: str, size: int, preview: str):
+        self.digest = digest
+        self.size = size
+        self.preview = preview
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"$payload": self.digest, "size": self.size, "preview": self.preview}
+
+    def __repr__(self):
+        return f"<payload {self.digest[:12]} {self.size} bytes: {self.preview}>"
+
+
+class PayloadStore:
+    """Content-addressed files for large payloads; identical payloads are stored once.
+
+    Old payloads are pruned in the background: on the first write and again after every
+    tenth of max_bytes written, files past max_age_days are deleted, then the least
+    recently written ones until the directory fits in max_bytes.
+    """
+
+    def __init__(self, directory: str = PAYLOAD_DIR, inline_limit: int = PAYLOAD_INLINE_LIMIT,
+                 max_bytes: int = PAYLOAD_MAX_BYTES, max_age_days: float = PAYLOAD_MAX_AGE_DAYS):
+        self.directory = directory
+        self.inline_limit = inline_limit
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._written = None  # Bytes written since the last prune; None until the first one
+        self._pruning = threading.Lock()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def put(self, value: Any, encoded: Optional[bytes] = None) -> PayloadRef:
+        """Write a payload (if not already stored) and return its reference"""
+        if encoded is None:
+            encoded = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+        digest = hashlib.sha256(encoded).hexdigest()
+        path = self._path(digest)
+        try:
+            # Rewriting an existing payload marks it as recently used for pruning
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # A temp file per call, so threads spilling the same payload never share one
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(encoded)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            self._maybe_prune(len(encoded))
+        preview = encoded[:100].decode("utf-8", errors="ignore")
+        return PayloadRef(digest, len(encoded), preview)
+
+    def open_view(self, ref: PayloadRef) -> mmap.mmap:
+        """Memory-map a payload read-only; pages are only loaded as they are touched"""
+        with open(self._path(ref.digest), "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get(self, ref: PayloadRef) -> Any:
+        """Load a spilled payload back"""
+        with self.open_view(ref) as view:
+            return json.loads(view[:])
+
+    def _maybe_prune(self, written: int):
+        if not (self.max_bytes or self.max_age_days):
+            return
+        if self._written is not None:
+            self._written += written
+            if self._written < (self.max_bytes or float("inf")) // 10:
+                return
+        if self._pruning.acquire(blocking=False):
+            self._written = 0
+            threading.Thread(target=self._prune_in_background, daemon=True).start()
+
+    def _prune_in_background(self):
+        try:
+            self.prune()
+        except Exception as e:
+            print(f"Error pruning payload store {self.directory}: {e}")
+        finally:
+            self._pruning.release()
+
+    def prune(self) -> int:
+        """Delete payloads past the age limit, then the oldest until under max_bytes; returns the count deleted"""
+        files = []
+        with os.scandir(self.directory) as buckets:
+            for bucket in buckets:
+                if not bucket.is_dir():
+                    continue
+                with os.scandir(bucket.path) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".json"):
+                            stat = entry.stat()
+                            files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days else 0
+        deleted = 0
+        for mtime, size, path in files:
+            if mtime >= cutoff and (not self.max_bytes or total <= self.max_bytes):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            deleted += 1
+        return deleted
+
+    def maybe_spill(self, value: Any) -> Any:
+        """Return value unchanged if small, otherwise store it and return a PayloadRef"""
+        if value is None or isinstance(value, (bool, int, float, PayloadRef)):
+            return value
+        if isinstance(value, str) and len(value) <= self.inline_limit // 4:
+            return value
+        encoded = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+        if len(encoded) <= self.inline_limit:
+            return value
+        return self.put(value, encoded)
+
+
+_payload_store = None
+_payload_store_lock = threading.Lock()
+
+
+def get_payload_store() -> PayloadStore:
+    """Process-wide payload store, so every agent and the MCP Tester share one copy per payload"""
+    global _payload_store
+    if _payload_store is None:
+        with _payload_store_lock:
+            if _payload_store is None:
+                _payload_store = PayloadStore()
+    return _payload_store
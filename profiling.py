@@ -0,0 +1,215 @@
+import cProfile
+import functools
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from typing import Optional
+
+
+# off | cprofile | sample
+PROFILE_MODES = ("off", "cprofile", "sample")
+PROFILE_DIR = os.environ.get("AGENTX_PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("AGENTX_PROFILE_INTERVAL_MS", 5)) / 1000
+
+
+class SamplingProfiler:
+    """Samples one thread's stack on a timer and counts identical stacks.
+
+    Output is in collapsed-stack format ("frame;frame;frame count"), which flamegraph.pl,
+    speedscope and inferno read directly. Unlike cProfile it adds no per-call overhead.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        # Cleared while a profiled coroutine is suspended, so other tasks on the thread are not sampled
+        self.active = True
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="agentx-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.active:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    def __init__(self, name: str, mode: str):
+        self.name = name
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.profiler = None
+
+    def resume(self):
+        if self.mode == "cprofile":
+            self.profiler.enable()
+        else:
+            self.profiler.active = True
+
+    def pause(self):
+        if self.mode == "cprofile":
+            self.profiler.disable()
+        else:
+            self.profiler.active = False
+
+
+class Profiler:
+    """Profiles selected handlers per request when enabled, writing one file per request.
+
+    Mode comes from AGENTX_PROFILE and can be switched at runtime (e.g. from the UI). Only one
+    request is profiled at a time; calls that arrive while another is being profiled run normally.
+    Coroutines are only profiled while they run, not while they wait at an await, so other
+    tasks on the event loop do not show up in their profiles.
+    """
+
+    def __init__(self, mode: str = "off", directory: str = PROFILE_DIR):
+        self.mode = mode if mode in PROFILE_MODES else "off"
+        self.directory = directory
+        self.written = []
+        self._busy = threading.Lock()
+        self._counter = itertools.count(1)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def set_mode(self, mode: str):
+        self.mode = mode if mode in PROFILE_MODES else "off"
+        return self.mode
+
+    def start(self, name: str) -> Optional[ProfileSession]:
+        if not self.enabled or not self._busy.acquire(blocking=False):
+            return None
+        session = ProfileSession(name, self.mode)
+        if session.mode == "cprofile":
+            session.profiler = cProfile.Profile()
+            session.profiler.enable()
+        else:
+            session.profiler = SamplingProfiler(threading.get_ident())
+            session.profiler.start()
+        return session
+
+    def stop(self, session: Optional[ProfileSession]) -> Optional[str]:
+        if session is None:
+            return None
+        try:
+            if session.mode == "cprofile":
+                session.profiler.disable()
+            else:
+                session.profiler.stop()
+            os.makedirs(self.directory, exist_ok=True)
+            elapsed_ms = (time.perf_counter() - session.started) * 1000
+            stem = f"{session.name}_{time.strftime('%Y%m%d_%H%M%S')}_{next(self._counter)}_{elapsed_ms:.0f}ms"
+            if session.mode == "cprofile":
+                # Open with snakeviz, or flameprof/gprof2dot for a flamegraph
+                path = os.path.join(self.directory, stem + ".prof")
+                session.profiler.dump_stats(path)
+            else:
+                path = os.path.join(self.directory, stem + ".collapsed")
+                session.profiler.write(path)
+            self.written.append(path)
+            return path
+        finally:
+            self._busy.release()
+
+
+_profiler = Profiler(os.environ.get("AGENTX_PROFILE", "off").lower())
+
+
+def get_profiler() -> Profiler:
+    return _profiler
+
+
+@types.coroutine
+def _run_profiled(awaitable, session: Optional[ProfileSession]):
+    """Await awaitable with profiling on only while it runs, pausing it at each suspension"""
+    steps = awaitable.__await__()
+    if session is None:
+        return (yield from steps)
+    value, error = None, None
+    while True:
+        session.resume()
+        try:
+            yielded = steps.send(value) if error is None else steps.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            session.pause()
+        value, error = None, None
+        try:
+            value = yield yielded
+        except GeneratorExit:
+            steps.close()
+            raise
+        except BaseException as e:
+            error = e
+
+
+def profiled(name: Optional[str] = None):
+    """Decorator that profiles each call of a function, coroutine or async generator when enabled"""
+
+    def decorate(fn):
+        label = name or fn.__qualname__.replace(".<locals>", "")
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def asyncgen_wrapper(*args, **kwargs):
+                session = _profiler.start(label)
+                items = fn(*args, **kwargs)
+                try:
+                    while True:
+                        try:
+                            item = await _run_profiled(items.__anext__(), session)
+                        except StopAsyncIteration:
+                            break
+                        yield item
+                finally:
+                    _profiler.stop(session)
+            return asyncgen_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def coroutine_wrapper(*args, **kwargs):
+                session = _profiler.start(label)
+                try:
+                    return await _run_profiled(fn(*args, **kwargs), session)
+                finally:
+                    _profiler.stop(session)
+            return coroutine_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            session = _profiler.start(label)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _profiler.stop(session)
+        return wrapper
+
+    return decorate
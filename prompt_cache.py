@@ -0,0 +1,86 @@
+import hashlib
+from typing import Any, Dict
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+# Fraction of the normal input price that providers knock off cached prompt tokens
+CACHE_DISCOUNTS = {
+    "openai": 0.5,
+    "gemini": 0.75,
+}
+
+# Providers refuse to cache prefixes shorter than roughly this many tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """Count tokens locally, with tiktoken when installed and a 4 chars/token rule otherwise"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def instruction_cache_key(instructions: str) -> str:
+    """Stable key for an instruction, so identical instructions share one cache entry"""
+    return hashlib.sha256(instructions.encode("utf-8")).hexdigest()[:16]
+
+
+def get_cache_params(provider: str, instructions: str) -> Dict[str, Any]:
+    """Return extra LiteLlm arguments that mark the static system instruction as cacheable.
+
+    Gemini gets an explicit cache_control point on the system message, which LiteLLM
+    turns into a context cache. OpenAI caches identical prefixes on its own, so it only
+    gets a prompt_cache_key that routes requests with the same instruction to the same cache.
+    """
+    if estimate_tokens(instructions) < PROMPT_CACHE_MIN_TOKENS:
+        return {}
+
+    if provider == "gemini":
+        return {"cache_control_injection_points": [{"location": "message", "role": "system"}]}
+    elif provider == "openai":
+        return {"prompt_cache_key": f"agentx-{instruction_cache_key(instructions)}"}
+    return {}
+
+
+class PromptCacheStats:
+    """Cache hit accounting for one agent, fed from the model callback"""
+
+    def __init__(self, provider: str = ""):
+        self.provider = provider
+        self.requests = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def record(self, prompt_tokens: int, cached_tokens: int):
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens or 0
+        self.cached_tokens += cached_tokens or 0
+        if cached_tokens:
+            self.cache_hits += 1
+
+    def getStats(self):
+        """Return hit rate and estimated savings in input-token equivalents"""
+        discount = CACHE_DISCOUNTS.get(self.provider, 0.0)
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "hit_rate": self.cache_hits / self.requests if self.requests else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cached_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+            "saved_tokens": int(self.cached_tokens * discount),
+        }
+
+    def reset(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
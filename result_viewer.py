@@ -0,0 +1,105 @@
+from typing import Any, List, Tuple, Union
+
+from payload_store import PayloadRef, get_payload_store
+
+
+# Bytes of result text rendered per page in the MCP Tester
+RESULT_PAGE_BYTES = 64 * 1024
+
+# Strings longer than this are summarized instead of shown in the structure outline
+OUTLINE_INLINE_CHARS = 200
+
+
+def human_size(num_bytes: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+def page_count(size: int, page_size: int = RESULT_PAGE_BYTES) -> int:
+    return max((size + page_size - 1) // page_size, 1)
+
+
+def _char_start(data, pos: int) -> int:
+    """Move a byte offset back to the start of the UTF-8 character it falls inside"""
+    pos = min(pos, len(data))
+    while 0 < pos < len(data) and data[pos] & 0xC0 == 0x80:
+        pos -= 1
+    return pos
+
+
+def _page_text(data, page: int, page_size: int) -> str:
+    # Both ends move to character starts, so a character split by a page boundary is shown
+    # whole on the later page instead of being dropped
+    start = _char_start(data, (page - 1) * page_size)
+    end = _char_start(data, page * page_size)
+    return data[start:end].decode("utf-8", errors="replace")
+
+
+def get_page(source: Union[str, PayloadRef], page: int, page_size: int = RESULT_PAGE_BYTES) -> Tuple[str, str]:
+    """Return (page_text, page_info) for an inline string or a spilled payload.
+
+    Spilled payloads are read through mmap, so only the requested page is touched.
+    """
+    if isinstance(source, PayloadRef):
+        size = source.size
+        pages = page_count(size, page_size)
+        page = min(max(page, 1), pages)
+        with get_payload_store().open_view(source) as view:
+            text = _page_text(view, page, page_size)
+    else:
+        data = (source or "").encode("utf-8")
+        size = len(data)
+        pages = page_count(size, page_size)
+        page = min(max(page, 1), pages)
+        text = _page_text(data, page, page_size)
+    return text, f"**Page {page} of {pages}** • {human_size(size)} total"
+
+
+def _describe(value: Any) -> str:
+    if isinstance(value, dict):
+        return f"object ({len(value)} keys)"
+    if isinstance(value, list):
+        return f"array ({len(value)} items)"
+    if isinstance(value, str):
+        if len(value) > OUTLINE_INLINE_CHARS:
+            return f"string ({len(value):,} chars): {value[:OUTLINE_INLINE_CHARS]!r}..."
+        return repr(value)
+    return repr(value)
+
+
+def resolve_path(value: Any, path: str) -> Any:
+    """Follow a dotted path like `content.0.text` into nested dicts and lists"""
+    for key in [k for k in (path or "").split(".") if k]:
+        if isinstance(value, list):
+            value = value[int(key)]
+        elif isinstance(value, dict):
+            value = value[key]
+        else:
+            raise KeyError(key)
+    return value
+
+
+def outline(value: Any, path: str = "", max_children: int = 100) -> str:
+    """Markdown outline of one level of a nested result; children are expanded by path on demand"""
+    try:
+        node = resolve_path(value, path)
+    except (KeyError, IndexError, ValueError):
+        return f"❌ Path `{path}` not found"
+
+    title = f"`{path}`" if path else "`(root)`"
+    lines: List[str] = [f"**{title}**: {_describe(node)}", ""]
+    if isinstance(node, dict):
+        children = list(node.items())
+    elif isinstance(node, list):
+        children = list(enumerate(node))
+    else:
+        return "\n".join(lines)
+
+    for key, child in children[:max_children]:
+        child_path = f"{path}.{key}" if path else str(key)
+        lines.append(f"- `{child_path}`: {_describe(child)}")
+    if len(children) > max_children:
+        lines.append(f"- ... {len(children) - max_children} more")
+    return "\n".join(lines)
@@ -0,0 +1,89 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+try:
+    from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_tool import to_gemini_schema
+except ImportError:  # newer google-adk
+    from google.adk.tools._gemini_schema_util import _to_gemini_schema as to_gemini_schema
+
+from mcp_client import MCPSessionPool, MCPServer, error_text, get_session_pool
+from tracing import get_tracer
+
+# Seconds to wait for one server's tools while building an agent; a slower server is left out
+MCP_LOAD_TIMEOUT = float(os.environ.get("AGENTX_MCP_LOAD_TIMEOUT", 30))
+
+
+class SharedMCPTool(BaseTool):
+    """An MCP tool for ADK agents that calls through the process-wide session pool.
+
+    Unlike MCPToolset.from_server, which opens a connection (and for stdio a subprocess) per
+    agent, every agent using a server shares that server's one session; the pool multiplexes
+    their calls and caps how many run at once per server.
+    """
+
+    def __init__(self, server: MCPServer, tool: Dict[str, Any], pool: Optional[MCPSessionPool] = None):
+        super().__init__(name=tool["name"], description=tool.get("description") or "")
+        self.server = server
+        # Read by the callbacks to label tool telemetry with the server
+        self.server_name = server.name
+        self.mcp_tool = tool
+        self.pool = pool or get_session_pool()
+        self.tracer = get_tracer()
+
+    def _get_declaration(self) -> types.FunctionDeclaration:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=to_gemini_schema(self.mcp_tool.get("input_schema") or {}),
+        )
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: ToolContext) -> Any:
+        try:
+            # Same span MCPCLient.call_tool records, so agent tool calls show up in the waterfall
+            with self.tracer.span(f"mcp call: {self.name}", "mcp", server=self.server_name):
+                return await self.pool.call_tool(self.server, self.name, args)
+        except Exception as e:
+            # A down, hung or circuit-broken server becomes a tool error the model can react to,
+            # instead of an exception that ends the agent's turn
+            return {"error": f"Tool {self.name} failed: {error_text(e)}"}
+
+
+async def _load_server_tools(pool: MCPSessionPool, server: MCPServer, tool_names: Set[str],
+                             timeout: float) -> List[SharedMCPTool]:
+    try:
+        # Served by the server's existing session when one is open
+        server_tools = await asyncio.wait_for(pool.list_tools(server), timeout)
+    except asyncio.TimeoutError:
+        print(f"Timed out after {timeout:.0f}s loading tools for MCP server {server.name}; skipping its tools")
+        return []
+    except Exception as e:
+        print(f"Error loading tools for MCP server {server.name}: {error_text(e)}")
+        return []
+    return [SharedMCPTool(server, tool, pool) for tool in server_tools if tool["name"] in tool_names]
+
+
+async def load_shared_tools(mcp_tool_configs: List[Dict[str, str]], mcp_servers_config: Dict,
+                            timeout: float = MCP_LOAD_TIMEOUT) -> List[SharedMCPTool]:
+    """Wrap the agent's configured {"server", "tool"} entries as tools on the shared sessions.
+
+    All referenced servers are loaded concurrently, so the agent waits for the slowest server
+    rather than the sum of them; a server that fails or times out only loses its own tools.
+    """
+    pool = get_session_pool()
+    tools_by_server = {}
+    for tool in mcp_tool_configs:
+        tools_by_server.setdefault(tool["server"], set()).add(tool["tool"])
+
+    loads = []
+    for server_name, tool_names in tools_by_server.items():
+        server_config = mcp_servers_config.get("mcpServers", {}).get(server_name)
+        if not server_config:
+            print(f"MCP server {server_name} is not configured; skipping its tools")
+            continue
+        loads.append(_load_server_tools(pool, MCPServer(server_name, server_config), tool_names, timeout))
+    return [tool for server_tools in await asyncio.gather(*loads) for tool in server_tools]
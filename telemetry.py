@@ -0,0 +1,296 @@
+import atexit
+import contextvars
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from log_sink import LogSink, RotatingJsonlWriter
+
+try:
+    from opentelemetry import metrics as otel_metrics
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+except ImportError:
+    otel_trace = None
+
+
+# none | console | file | otlp
+TELEMETRY_EXPORTER = os.environ.get("AGENTX_OTEL_EXPORTER", "none").lower()
+TELEMETRY_FILE_DIR = os.environ.get("AGENTX_OTEL_DIR", "telemetry")
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "agentx")
+
+
+class StdoutJsonlWriter:
+    """Writer for LogSink that prints JSON lines instead of writing a file"""
+
+    def write(self, record: Dict[str, Any]):
+        sys.stdout.write(json.dumps(record, default=str) + "\n")
+
+    def flush(self):
+        sys.stdout.flush()
+
+    def close(self):
+        self.flush()
+
+
+class JsonlExporter:
+    """Offline exporter: OTLP-shaped span and metric records as JSON lines on a background thread"""
+
+    def __init__(self, writer):
+        self.sink = LogSink(writer, level="debug")
+        self._gauges: Dict[str, List[Callable[[], float]]] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def span(self, name: str, start_ns: int, end_ns: int, attrs: Dict[str, Any], error: Optional[str],
+             trace_id: str, span_id: str, parent_id: Optional[str]):
+        self.sink.submit({
+            "kind": "span",
+            "name": name,
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_span_id": parent_id,
+            "start_time_unix_nano": start_ns,
+            "end_time_unix_nano": end_ns,
+            "status": "ERROR" if error else "OK",
+            "attributes": {**attrs, **({"error.message": error} if error else {})},
+            "resource": {"service.name": SERVICE_NAME},
+        })
+
+    def metric(self, kind: str, name: str, value: float, attrs: Dict[str, Any]):
+        self.sink.submit({
+            "kind": kind,
+            "name": name,
+            "value": value,
+            "time_unix_nano": time.time_ns(),
+            "attributes": attrs,
+            "resource": {"service.name": SERVICE_NAME},
+        })
+
+    def gauge(self, name: str, callback: Callable[[], float]):
+        self._gauges.setdefault(name, []).append(callback)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._observe_gauges, name="agentx-telemetry-gauges", daemon=True)
+            self._thread.start()
+
+    def _observe_gauges(self, interval: float = 15.0):
+        while not self._stop.wait(interval):
+            for name, callbacks in list(self._gauges.items()):
+                try:
+                    self.metric("gauge", name, sum(cb() for cb in callbacks), {})
+                except Exception:
+                    continue
+
+    def close(self):
+        self._stop.set()
+        self.sink.close()
+
+
+class OtlpExporter:
+    """OpenTelemetry SDK with OTLP exporters, configured by the standard OTEL_EXPORTER_OTLP_* variables"""
+
+    def __init__(self):
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        resource = Resource.create({"service.name": SERVICE_NAME})
+        tracer_provider = TracerProvider(resource=resource)
+        tracer_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        otel_trace.set_tracer_provider(tracer_provider)
+        meter_provider = MeterProvider(resource=resource,
+                                       metric_readers=[PeriodicExportingMetricReader(OTLPMetricExporter())])
+        otel_metrics.set_meter_provider(meter_provider)
+        self.tracer = otel_trace.get_tracer("agentx")
+        self.meter = otel_metrics.get_meter("agentx")
+        self._providers = (tracer_provider, meter_provider)
+        self._instruments = {}
+        self._gauges: Dict[str, List[Callable[[], float]]] = {}
+
+    def span(self, name: str, start_ns: int, end_ns: int, attrs: Dict[str, Any], error: Optional[str],
+             trace_id: str, span_id: str, parent_id: Optional[str]):
+        span = self.tracer.start_span(name, start_time=start_ns, attributes=attrs)
+        if error:
+            span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, error))
+        span.end(end_time=end_ns)
+
+    def metric(self, kind: str, name: str, value: float, attrs: Dict[str, Any]):
+        instrument = self._instruments.get(name)
+        if instrument is None:
+            if kind == "histogram":
+                instrument = self.meter.create_histogram(name)
+            else:
+                instrument = self.meter.create_counter(name)
+            self._instruments[name] = instrument
+        if kind == "histogram":
+            instrument.record(value, attrs)
+        else:
+            instrument.add(value, attrs)
+
+    def gauge(self, name: str, callback: Callable[[], float]):
+        if name not in self._gauges:
+            self._gauges[name] = []
+            callbacks = self._gauges[name]
+            self.meter.create_observable_gauge(
+                name, callbacks=[lambda options: [otel_metrics.Observation(sum(cb() for cb in callbacks))]]
+            )
+        self._gauges[name].append(callback)
+
+    def close(self):
+        for provider in self._providers:
+            provider.shutdown()
+
+
+class Telemetry:
+    """Facade for spans and metrics from the callbacks, agents and MCP client.
+
+    With no exporter and no listeners every call returns immediately. Listeners receive each
+    metric as (kind, name, value, attributes) so in-process registries can be fed as well.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self.listeners: List[Callable[[str, str, float, Dict[str, Any]], None]] = []
+        self.gauges: Dict[str, List[Callable[[], float]]] = {}
+        # (trace_id, span_id) of the enclosing span, per asyncio task / thread
+        self._current = contextvars.ContextVar("agentx_span", default=None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None or bool(self.listeners)
+
+    def add_listener(self, listener: Callable[[str, str, float, Dict[str, Any]], None]):
+        self.listeners.append(listener)
+
+    def _metric(self, kind: str, name: str, value: float, attrs: Dict[str, Any]):
+        if self.exporter:
+            self.exporter.metric(kind, name, value, attrs)
+        for listener in self.listeners:
+            listener(kind, name, value, attrs)
+
+    def record_span(self, name: str, start_ns: int, end_ns: int, error: Optional[str] = None, **attrs):
+        """Export a span whose start and end were observed by separate callbacks"""
+        if not self.exporter:
+            return
+        parent = self._current.get()
+        trace_id = parent[0] if parent else f"{random.getrandbits(128):032x}"
+        self.exporter.span(name, start_ns, end_ns, attrs, error, trace_id, f"{random.getrandbits(64):016x}",
+                           parent[1] if parent else None)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a block as a span; spans recorded inside it in the same task become its children"""
+        if not self.exporter:
+            yield
+            return
+        if isinstance(self.exporter, OtlpExporter):
+            # The SDK tracks the active span itself, so spans recorded inside are parented to this one
+            with self.exporter.tracer.start_as_current_span(name, attributes=attrs):
+                yield
+            return
+        parent = self._current.get()
+        trace_id = parent[0] if parent else f"{random.getrandbits(128):032x}"
+        span_id = f"{random.getrandbits(64):016x}"
+        self._current.set((trace_id, span_id))
+        start = time.time_ns()
+        error = None
+        try:
+            yield
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            self._current.set(parent)
+            self.exporter.span(name, start, time.time_ns(), attrs, error, trace_id, span_id,
+                               parent[1] if parent else None)
+
+    def record_model_call(self, model: str, agent: str, duration_s: float, error: Optional[str] = None):
+        if not self.enabled:
+            return
+        end_ns = time.time_ns()
+        self.record_span("model.call", end_ns - int(duration_s * 1e9), end_ns, error, model=model, agent=agent)
+        self._metric("histogram", "agentx.model.duration", duration_s, {"model": model, "agent": agent})
+
+    def record_tool_call(self, server: str, tool: str, duration_s: float, error: Optional[str] = None):
+        if not self.enabled:
+            return
+        end_ns = time.time_ns()
+        self.record_span("tool.call", end_ns - int(duration_s * 1e9), end_ns, error, server=server, tool=tool)
+        attrs = {"server": server, "tool": tool}
+        self._metric("histogram", "agentx.tool.duration", duration_s, attrs)
+        if error:
+            self._metric("counter", "agentx.tool.errors", 1, attrs)
+
+    def record_tokens(self, model: str, agent: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0):
+        if not self.enabled:
+            return
+        for direction, count in (("input", input_tokens), ("output", output_tokens), ("cached", cached_tokens)):
+            if count:
+                self._metric("counter", "agentx.tokens", count, {"model": model, "agent": agent, "direction": direction})
+
+    def session_started(self, agent: str):
+        if not self.enabled:
+            return
+        self._metric("counter", "agentx.sessions", 1, {"agent": agent})
+
+    def record(self, kind: str, name: str, value: float = 1, **attrs):
+        """Record any other counter or histogram value"""
+        if self.enabled:
+            self._metric(kind, name, value, attrs)
+
+    def register_gauge(self, name: str, callback: Callable[[], float]):
+        """Observe a value (e.g. MCP session pool size) whenever metrics are collected"""
+        self.gauges.setdefault(name, []).append(callback)
+        if self.exporter:
+            self.exporter.gauge(name, callback)
+
+    def observe_gauges(self) -> Dict[str, float]:
+        values = {}
+        for name, callbacks in self.gauges.items():
+            try:
+                values[name] = sum(cb() for cb in callbacks)
+            except Exception:
+                continue
+        return values
+
+    def close(self):
+        if self.exporter:
+            self.exporter.close()
+
+
+def _create_exporter(name: str):
+    if name == "otlp":
+        if otel_trace is None:
+            print("AGENTX_OTEL_EXPORTER=otlp needs opentelemetry-sdk and opentelemetry-exporter-otlp; telemetry disabled")
+            return None
+        return OtlpExporter()
+    if name == "console":
+        return JsonlExporter(StdoutJsonlWriter())
+    if name == "file":
+        return JsonlExporter(RotatingJsonlWriter(TELEMETRY_FILE_DIR, "agentx-otel"))
+    return None
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Process-wide telemetry configured from AGENTX_OTEL_EXPORTER"""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry(_create_exporter(TELEMETRY_EXPORTER))
+                atexit.register(_telemetry.close)
+    return _telemetry
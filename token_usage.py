@@ -0,0 +1,122 @@
+import csv
+import time
+from typing import Any, Dict, List, Optional
+
+from prompt_cache import CACHE_DISCOUNTS
+
+
+# USD per million tokens as (input, output). Local models are free.
+MODEL_PRICING = {
+    "gemini:gemini-1.5-flash-8b": (0.0375, 0.15),
+    "gemini:gemini-1.5-flash": (0.075, 0.30),
+    "gemini:gemini-1.5-pro": (1.25, 5.00),
+    "gemini:gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini:gemini-2.0-flash": (0.10, 0.40),
+    "gemini:gemini-2.5-flash-preview-04-17": (0.15, 0.60),
+    "gemini:gemini-2.5-pro-preview-03-25": (1.25, 10.00),
+    "openai:gpt-4.1-nano": (0.10, 0.40),
+    "openai:gpt-4.1-mini": (0.40, 1.60),
+    "openai:o4-mini": (1.10, 4.40),
+    "openai:gpt-4": (30.00, 60.00),
+    "openai:o1": (15.00, 60.00),
+    "openai:o3": (2.00, 8.00),
+    "openai:o1-pro": (150.00, 600.00),
+}
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """Estimate the USD cost of one model call, applying the provider's cached-token discount"""
+    input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    discount = CACHE_DISCOUNTS.get(model.split(":")[0], 0.0)
+    billable_input = input_tokens - cached_tokens * discount
+    return (billable_input * input_price + output_tokens * output_price) / 1_000_000
+
+
+def _empty_totals():
+    return {
+        "requests": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cached_tokens": 0,
+        "total_tokens": 0,
+        "cost": 0.0,
+    }
+
+
+class TokenUsageTracker:
+    """Token and cost accounting per model, agent, session and tool-bearing turn"""
+
+    EXPORT_FIELDS = ["timestamp", "session", "agent", "model", "input_tokens", "output_tokens",
+                     "cached_tokens", "total_tokens", "tool_call", "estimated", "cost"]
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self.totals = _empty_totals()
+        self.by_model: Dict[str, Dict] = {}
+        self.by_agent: Dict[str, Dict] = {}
+        self.by_session: Dict[str, Dict] = {}
+        self.tool_turns = _empty_totals()
+
+    def record(self, model: str, agent: str, session: str, input_tokens: int, output_tokens: int,
+               cached_tokens: int = 0, tool_call: bool = False, estimated: bool = False) -> Dict[str, Any]:
+        """Record one model call and update every aggregate"""
+        entry = {
+            "timestamp": time.time(),
+            "session": session,
+            "agent": agent,
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cached_tokens": cached_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "tool_call": tool_call,
+            "estimated": estimated,
+            "cost": estimate_cost(model, input_tokens, output_tokens, cached_tokens),
+        }
+        self.records.append(entry)
+
+        buckets = [
+            self.totals,
+            self.by_model.setdefault(model, _empty_totals()),
+            self.by_agent.setdefault(agent, _empty_totals()),
+            self.by_session.setdefault(session, _empty_totals()),
+        ]
+        if tool_call:
+            buckets.append(self.tool_turns)
+        for bucket in buckets:
+            bucket["requests"] += 1
+            bucket["input_tokens"] += input_tokens
+            bucket["output_tokens"] += output_tokens
+            bucket["cached_tokens"] += cached_tokens
+            bucket["total_tokens"] += entry["total_tokens"]
+            bucket["cost"] += entry["cost"]
+        return entry
+
+    def getTotals(self) -> Dict[str, Any]:
+        return dict(self.totals)
+
+    def getSummary(self) -> Dict[str, Any]:
+        """Return all aggregates, suitable for JSON export"""
+        return {
+            "totals": dict(self.totals),
+            "by_model": {k: dict(v) for k, v in self.by_model.items()},
+            "by_agent": {k: dict(v) for k, v in self.by_agent.items()},
+            "by_session": {k: dict(v) for k, v in self.by_session.items()},
+            "tool_turns": dict(self.tool_turns),
+        }
+
+    def export_csv(self, path: str, records: Optional[List[Dict[str, Any]]] = None) -> str:
+        """Write per-call usage records as CSV and return the path"""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self.EXPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(records if records is not None else self.records)
+        return path
+
+    def clear(self):
+        self.records.clear()
+        self.totals = _empty_totals()
+        self.by_model.clear()
+        self.by_agent.clear()
+        self.by_session.clear()
+        self.tool_turns = _empty_totals()
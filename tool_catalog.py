@@ -0,0 +1,285 @@
+import asyncio
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config_watcher import ConfigWatcher
+from mcp_client import MCPCLient, MCPServer, get_session_pool
+
+MCP_CONFIG_PATH = "mcp/mcp_config.json"
+
+ToolKey = Tuple[str, str]
+
+
+def keywords(text: str) -> Set[str]:
+    """Lower-case words of a name or description; snake_case and camelCase are split"""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text or "")
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def selection_keys(selected_tools) -> Set[ToolKey]:
+    """(server, tool) keys of a UI selection list, for constant-time "is selected" checks"""
+    return {(t["server"], t["tool"]) for t in selected_tools or []
+            if isinstance(t, dict) and "server" in t and "tool" in t}
+
+
+class ToolRegistry:
+    """Tools indexed by (server, name), with an inverted keyword index for search.
+
+    Keywords come from tool names, descriptions and input parameter names. A query matches
+    tools containing every query word, where each word may be a prefix ("wea" finds "weather").
+    """
+
+    def __init__(self, tools_by_server: Optional[Dict[str, List[dict]]] = None):
+        self._servers: Dict[str, Dict[str, dict]] = {}
+        self._index: Dict[str, Set[ToolKey]] = {}
+        self._vocabulary: List[str] = []
+        for server_name, tools in (tools_by_server or {}).items():
+            self.set_server(server_name, tools)
+
+    def __contains__(self, key: ToolKey) -> bool:
+        server_name, tool_name = key
+        return tool_name in self._servers.get(server_name, {})
+
+    def __len__(self) -> int:
+        return sum(len(tools) for tools in self._servers.values())
+
+    def servers(self) -> List[str]:
+        return list(self._servers)
+
+    def copy(self) -> "ToolRegistry":
+        registry = ToolRegistry()
+        registry._servers = {name: dict(tools) for name, tools in self._servers.items()}
+        registry._index = {word: set(postings) for word, postings in self._index.items()}
+        registry._vocabulary = list(self._vocabulary)
+        return registry
+
+    def tools(self, server_name: str) -> List[dict]:
+        return list(self._servers.get(server_name, {}).values())
+
+    def get(self, server_name: str, tool_name: str) -> Optional[dict]:
+        return self._servers.get(server_name, {}).get(tool_name)
+
+    def set_server(self, server_name: str, tools: Iterable[dict]):
+        """Add or replace one server's tools"""
+        self.remove_server(server_name)
+        self._servers[server_name] = {tool["name"]: tool for tool in tools if "name" in tool}
+        for tool in self._servers[server_name].values():
+            for word in self._tool_keywords(tool):
+                self._index.setdefault(word, set()).add((server_name, tool["name"]))
+        self._vocabulary = sorted(self._index)
+
+    def remove_server(self, server_name: str):
+        tools = self._servers.pop(server_name, None)
+        if not tools:
+            return
+        for tool in tools.values():
+            for word in self._tool_keywords(tool):
+                postings = self._index.get(word)
+                if postings is not None:
+                    postings.discard((server_name, tool["name"]))
+                    if not postings:
+                        del self._index[word]
+        self._vocabulary = sorted(self._index)
+
+    def search(self, query: str, server_name: Optional[str] = None) -> List[ToolKey]:
+        """(server, tool) keys matching every word of the query, in catalog order"""
+        words = keywords(query)
+        if not words:
+            return []
+        matches = None
+        for word in words:
+            hits = set()
+            start = bisect.bisect_left(self._vocabulary, word)
+            for vocab_word in self._vocabulary[start:]:
+                if not vocab_word.startswith(word):
+                    break
+                hits |= self._index[vocab_word]
+            matches = hits if matches is None else matches & hits
+            if not matches:
+                return []
+        servers = [server_name] if server_name else self._servers
+        return [(server, name) for server in servers for name in self._servers.get(server, {})
+                if (server, name) in matches]
+
+    @staticmethod
+    def _tool_keywords(tool: dict) -> Set[str]:
+        words = keywords(tool.get("name", "")) | keywords(tool.get("description") or "")
+        properties = (tool.get("input_schema") or {}).get("properties") or {}
+        for param_name in properties:
+            words |= keywords(param_name)
+        return words
+
+
+class ToolCatalog:
+    """Process-wide list of MCP servers and their tools, shared by every tab and page load.
+
+    Tools are listed once and then served from memory. Concurrent refreshes are coalesced:
+    callers that arrive while a refresh is running wait for it instead of spawning the
+    servers again. After the first load the config file is watched, and only servers whose
+    entry was added, changed or removed are re-listed. A server that reports
+    notifications/tools/list_changed on its persistent session has just its own entry refreshed.
+    """
+
+    def __init__(self, config_path: str = MCP_CONFIG_PATH):
+        self.config_path = config_path
+        self.client = MCPCLient()
+        self.registry = ToolRegistry()
+        self.loaded = False
+        self.loaded_at = None
+        self.error = None
+        self.watcher: Optional[ConfigWatcher] = None
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        # Held only while copying and swapping the registry, never across server I/O
+        self._registry_lock = threading.Lock()
+        self._inflight: Optional[threading.Event] = None
+        get_session_pool().add_tools_changed_listener(self.refresh_server)
+
+    def servers(self) -> List[str]:
+        return [server.name for server in self.client.servers]
+
+    def get_tools(self, server_name: str) -> List[dict]:
+        return self.registry.tools(server_name) if server_name else []
+
+    def get_tool(self, server_name: str, tool_name: str) -> Optional[dict]:
+        return self.registry.get(server_name, tool_name)
+
+    def search(self, query: str, server_name: Optional[str] = None) -> List[ToolKey]:
+        return self.registry.search(query, server_name)
+
+    def ensure_loaded(self) -> bool:
+        """Load the catalog on first use; returns False when there is no config to load"""
+        if not self.loaded:
+            self.refresh()
+        return self.error is None
+
+    def refresh(self) -> bool:
+        """Re-list every server's tools, or wait for the refresh already in progress"""
+        with self._lock:
+            flight = self._inflight
+            leader = flight is None
+            if leader:
+                flight = self._inflight = threading.Event()
+        if not leader:
+            flight.wait()
+            return self.error is None
+
+        try:
+            self._load()
+        finally:
+            with self._lock:
+                self._inflight = None
+            flight.set()
+        return self.error is None
+
+    async def ensure_loaded_async(self) -> bool:
+        return await asyncio.to_thread(self.ensure_loaded)
+
+    async def refresh_async(self) -> bool:
+        return await asyncio.to_thread(self.refresh)
+
+    def reload_config(self):
+        """Apply edits to the config file now instead of waiting for the watcher"""
+        if self.watcher is None:
+            return self.refresh()
+        return self.watcher.check()
+
+    async def reload_config_async(self):
+        return await asyncio.to_thread(self.reload_config)
+
+    def apply_changes(self, config: dict, changes: Dict[str, List[str]]):
+        """Re-list only the added and changed servers and drop the removed ones"""
+        servers = config.get("mcpServers", {})
+        with self._update_lock:
+            to_list = {name: servers[name] for name in changes["added"] + changes["changed"]}
+            tools = asyncio.run(self._list_tools(to_list)) if to_list else {}
+            with self._registry_lock:
+                registry = self.registry.copy()
+                for name in changes["removed"]:
+                    registry.remove_server(name)
+                for name, server_tools in tools.items():
+                    registry.set_server(name, server_tools)
+                self._set_servers(config)
+                self.registry = registry
+        for name in changes["removed"]:
+            asyncio.run(self.client.pool.close(name))
+
+    async def refresh_server(self, server_name: str):
+        """Re-list one configured server's tools, e.g. after it reported a tool list change"""
+        server = next((s for s in self.client.servers if s.name == server_name), None)
+        if server is None:
+            return
+        try:
+            tools = await self.client.pool.list_tools(server)
+        except Exception as e:
+            print(f"Error refreshing tools for MCP server {server_name}: {e}")
+            return
+        with self._registry_lock:
+            registry = self.registry.copy()
+            registry.set_server(server_name, tools)
+            self.registry = registry
+        print(f"Refreshed {len(tools)} tools for MCP server {server_name}")
+
+    async def _list_tools(self, servers: Dict[str, dict]) -> Dict[str, List[dict]]:
+        """List tools server by server, so one broken server does not hide the others"""
+        tools = {}
+        for name, server_config in servers.items():
+            client = MCPCLient()
+            client.load_single_server(name, server_config)
+            try:
+                tools.update(await client.load_all_tools())
+            except Exception as e:
+                print(f"Error loading tools for MCP server {name}: {e}")
+                tools[name] = []
+        return tools
+
+    def _set_servers(self, config: dict):
+        self.client.config = config
+        self.client.servers = [MCPServer(name, server_config) for name, server_config in config.get("mcpServers", {}).items()]
+
+    def _load(self):
+        with self._update_lock:
+            if not os.path.exists(self.config_path):
+                self.registry, self.loaded, self.error = ToolRegistry(), True, f"{self.config_path} not found"
+                return
+            try:
+                mtime = os.path.getmtime(self.config_path)
+                with open(self.config_path, "r") as f:
+                    config = json.load(f)
+                servers = config.get("mcpServers", {})
+                tools = asyncio.run(self._list_tools(servers))
+                # Swap in the new state in one step so readers never see a half-loaded catalog
+                with self._registry_lock:
+                    self.registry, self.error = ToolRegistry(tools), None
+                    self._set_servers(config)
+                self._watch(servers, mtime)
+                print(f"Loaded {len(tools)} MCP servers: {list(tools)}")
+            except Exception as e:
+                print(f"Error loading MCP servers: {e}")
+                self.error = str(e)
+            self.loaded = True
+            self.loaded_at = time.time()
+
+    def _watch(self, servers: Dict[str, dict], mtime: float):
+        if self.watcher is None:
+            self.watcher = ConfigWatcher(self.config_path, self.apply_changes, servers, mtime)
+            self.watcher.start()
+        else:
+            self.watcher.servers, self.watcher.mtime = dict(servers), mtime
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_tool_catalog() -> ToolCatalog:
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = ToolCatalog()
+        return _catalog
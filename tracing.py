@@ -0,0 +1,258 @@
+import contextvars
+import html
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+# Completed turns kept for the waterfall and trace export
+TRACE_MAX_TURNS = int(os.environ.get("AGENTX_TRACE_MAX_TURNS", 50))
+
+SPAN_COLORS = {
+    "turn": "#adb5bd",
+    "model": "#6f42c1",
+    "tool": "#198754",
+    "mcp": "#0d6efd",
+    "ui": "#fd7e14",
+}
+
+
+class Span:
+    """One timed section of a turn; times are perf_counter seconds"""
+
+    __slots__ = ("name", "category", "start", "end", "attrs", "thread_id")
+
+    def __init__(self, name: str, category: str, start: float, attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = None
+        self.attrs = attrs or {}
+        self.thread_id = threading.get_ident()
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Turn:
+    """Spans recorded between start_turn and end_turn, plus instant marks like the first token"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.wall_start = time.time()
+        self.root = Span(label, "turn", time.perf_counter())
+        self.spans: List[Span] = []
+        self.marks: List[Span] = []
+        # Spans opened by begin(key) and not yet closed by end(key)
+        self.open: Dict[Any, Span] = {}
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+
+class TurnTracer:
+    """Collects per-turn spans from the callbacks, MCP client and UI handlers.
+
+    Recording is a no-op outside a turn, so instrumented code paths cost almost nothing when
+    nobody is tracing. Spans that start and end in different callbacks are paired by key.
+    The current turn is kept per asyncio task / thread, like telemetry spans, so concurrent
+    sessions each record into their own turn; tasks and MCP pool calls started from a turn
+    inherit it.
+    """
+
+    def __init__(self, max_turns: int = TRACE_MAX_TURNS):
+        self.turns = deque(maxlen=max_turns)
+        self.in_progress: List[Turn] = []
+        self._current = contextvars.ContextVar("agentx_turn", default=None)
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[Turn]:
+        """The caller's turn in progress, if any"""
+        return self._current.get()
+
+    def start_turn(self, label: str) -> Turn:
+        self.end_turn()
+        turn = Turn(label)
+        with self._lock:
+            self.in_progress.append(turn)
+        self._current.set(turn)
+        return turn
+
+    def end_turn(self):
+        turn = self.current
+        if turn is None:
+            return None
+        self._current.set(None)
+        now = time.perf_counter()
+        with self._lock:
+            for span in turn.open.values():
+                span.end = now
+                span.attrs["unfinished"] = True
+            turn.open.clear()
+            if turn not in self.in_progress:
+                # Dropped by clear() while it ran
+                return turn
+            self.in_progress.remove(turn)
+            turn.root.end = now
+            self.turns.append(turn)
+        return turn
+
+    def begin(self, key: Any, name: str, category: str, **attrs):
+        """Open a span that a later end(key) closes"""
+        turn = self.current
+        if turn is None:
+            return
+        span = Span(name, category, time.perf_counter(), attrs)
+        with self._lock:
+            turn.open[key] = span
+            turn.spans.append(span)
+
+    def end(self, key: Any, **attrs):
+        turn = self.current
+        if turn is None:
+            return
+        with self._lock:
+            span = turn.open.pop(key, None)
+        if span is not None:
+            span.end = time.perf_counter()
+            span.attrs.update(attrs)
+
+    def is_open(self, key: Any) -> bool:
+        turn = self.current
+        return turn is not None and key in turn.open
+
+    def mark(self, name: str, category: str, **attrs):
+        """Record an instant event such as the first streamed token"""
+        turn = self.current
+        if turn is None:
+            return
+        span = Span(name, category, time.perf_counter(), attrs)
+        span.end = span.start
+        turn.marks.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str, **attrs):
+        turn = self.current
+        if turn is None:
+            yield None
+            return
+        span = Span(name, category, time.perf_counter(), attrs)
+        with self._lock:
+            turn.spans.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+
+    def last_turn(self) -> Optional[Turn]:
+        """The caller's turn in progress, otherwise the most recently started or finished one"""
+        if self.current:
+            return self.current
+        with self._lock:
+            if self.in_progress:
+                return self.in_progress[-1]
+            return self.turns[-1] if self.turns else None
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event JSON (load in chrome://tracing or Perfetto)"""
+        events = []
+        pid = os.getpid()
+        with self._lock:
+            turns = list(self.turns) + list(self.in_progress)
+        for turn in turns:
+            offset = turn.wall_start * 1e6 - turn.root.start * 1e6
+            for span in [turn.root] + turn.spans:
+                events.append({
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round(span.start * 1e6 + offset, 1),
+                    "dur": round(span.duration * 1e6, 1),
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {k: str(v) for k, v in span.attrs.items()},
+                })
+            for mark in turn.marks:
+                events.append({
+                    "name": mark.name,
+                    "cat": mark.category,
+                    "ph": "i",
+                    "s": "p",
+                    "ts": round(mark.start * 1e6 + offset, 1),
+                    "pid": pid,
+                    "tid": mark.thread_id,
+                    "args": {k: str(v) for k, v in mark.attrs.items()},
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+    def clear(self):
+        with self._lock:
+            self.turns.clear()
+            self.in_progress.clear()
+
+
+def render_waterfall_html(turn: Optional[Turn]) -> str:
+    """Horizontal bars per span, positioned relative to the turn start"""
+    if turn is None:
+        return "<div>Send a message to see its latency breakdown...</div>"
+    total = max(turn.duration, 1e-6)
+    totals: Dict[str, float] = {}
+    for span in turn.spans:
+        totals[span.category] = totals.get(span.category, 0.0) + span.duration
+
+    rows = []
+    for span in [turn.root] + sorted(turn.spans, key=lambda s: s.start):
+        left = (span.start - turn.root.start) / total * 100
+        width = max(span.duration / total * 100, 0.3)
+        color = SPAN_COLORS.get(span.category, "#6c757d")
+        rows.append(
+            f"<div style='display: flex; align-items: center; margin: 2px 0;'>"
+            f"<div style='width: 30%; overflow: hidden; white-space: nowrap; text-overflow: ellipsis;' "
+            f"title='{html.escape(span.name)}'>{html.escape(span.name)}</div>"
+            f"<div style='width: 55%; position: relative; height: 12px; background: #f1f3f5;'>"
+            f"<div style='position: absolute; left: {left:.2f}%; width: {width:.2f}%; height: 100%; background: {color};'></div>"
+            f"</div>"
+            f"<div style='width: 15%; text-align: right;'>{span.duration * 1000:.1f} ms</div>"
+            f"</div>"
+        )
+    marks = " • ".join(
+        f"{html.escape(mark.name)} at {(mark.start - turn.root.start) * 1000:.1f} ms" for mark in turn.marks
+    )
+    summary = " • ".join(
+        f"<span style='color: {SPAN_COLORS.get(category, '#6c757d')};'>{category}</span> {seconds * 1000:.0f} ms"
+        for category, seconds in sorted(totals.items(), key=lambda item: -item[1])
+    )
+    return (
+        "<div style='font-family: monospace; font-size: 12px;'>"
+        f"<div><b>{html.escape(turn.label)}</b> — {turn.duration * 1000:.1f} ms total</div>"
+        f"<div style='margin-bottom: 6px;'>{summary}{' • ' + marks if marks else ''}</div>"
+        + "".join(rows)
+        + "</div>"
+    )
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> TurnTracer:
+    """Process-wide tracer shared by the callbacks, MCP client and UI"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = TurnTracer()
+    return _tracer